@@ -0,0 +1,7 @@
+"""
+Helper modules used by the setup-firebase-emulator-win action.
+
+Each module is runnable with ``python -m emulator_tools.<module>`` from the
+action's steps and only depends on the Python standard library, so it works
+with whatever interpreter the Windows runner provides.
+"""
@@ -0,0 +1,147 @@
+"""
+Per-artifact cache keys and parallel prefetch for the emulator downloads.
+
+The Firestore, Realtime Database, Pub/Sub, Storage and UI emulators are
+separate downloads the Firebase CLI keeps in ``~/.cache/firebase/emulators``
+(or ``$FIREBASE_EMULATORS_PATH``). The CLI pins the version of every
+artifact, so a build of the CLI identifies the exact files it will fetch.
+Each artifact is cached on its own under a key made of the artifact name
+and the resolved CLI version (see ``release.py``): editing firebase.json no
+longer misses the cache, and a new CLI never restores JARs from an older one.
+
+Artifacts still missing after the cache restore are fetched with
+``firebase setup:emulators:<name>``, all at once, during setup rather than
+lazily by ``emulators:start`` while the readiness wait is running.
+
+Usage:
+    python -m emulator_tools.artifacts keys --cli-version 14.1.0 --prefix Windows-firebase-emulator
+    python -m emulator_tools.artifacts prefetch --firebase-bin firebase.exe
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .install import run_commands
+from .ledger import LEDGER_ENV, record
+from .topology import Topology, load
+
+STEP = "Prefetch Emulator Artifacts"
+
+# Emulator -> file name prefix of its download in the cache directory. The
+# zip downloads (Pub/Sub, UI) are unpacked next to the archive.
+ARTIFACTS = {
+    "firestore": "cloud-firestore-emulator-",
+    "database": "firebase-database-emulator-",
+    "pubsub": "pubsub-emulator-",
+    "storage": "cloud-storage-rules-runtime-",
+    "ui": "ui-v",
+}
+ARCHIVES = {"pubsub", "ui"}
+
+
+def cache_dir() -> str:
+    """Where the CLI stores emulator downloads (same rule as firebase-tools)."""
+    return os.environ.get("FIREBASE_EMULATORS_PATH") or os.path.join(
+        os.path.expanduser("~"), ".cache", "firebase", "emulators")
+
+
+def needed(topology: Topology) -> List[str]:
+    """Artifacts of the emulators this run will start, in ``ARTIFACTS`` order."""
+    return [name for name in ARTIFACTS
+            if name in topology.emulators and topology.emulators[name].selected]
+
+
+def present(name: str, directory: Optional[str] = None) -> bool:
+    """True if the artifact (and, for archives, its unpacked directory) is on disk."""
+    entries = glob.glob(os.path.join(directory or cache_dir(), ARTIFACTS[name] + "*"))
+    files = [e for e in entries if os.path.isfile(e)]
+    if not files:
+        return False
+    return name not in ARCHIVES or any(os.path.isdir(e) for e in entries)
+
+
+def size(name: str, directory: Optional[str] = None) -> int:
+    total = 0
+    for entry in glob.glob(os.path.join(directory or cache_dir(), ARTIFACTS[name] + "*")):
+        if os.path.isfile(entry):
+            total += os.path.getsize(entry)
+    return total
+
+
+def keys(names: List[str], cli_version: str, prefix: str) -> Dict[str, str]:
+    """Cache key per artifact; the CLI version pins the artifact's version."""
+    return {name: f"{prefix}-{name}-cli-{cli_version}" for name in names}
+
+
+def prefetch(firebase_bin: str, names: List[str],
+             jobs: Optional[int] = None) -> List[Tuple[str, float, float, int, List[str]]]:
+    """Run ``setup:emulators:<name>`` for every artifact concurrently."""
+    def fetch(name: str) -> Tuple[str, float, float, int, List[str]]:
+        start = time.time()
+        returncode, output = run_commands([[firebase_bin, f"setup:emulators:{name}"]])
+        return name, start, time.time(), returncode, output
+
+    if not names:
+        return []
+    with ThreadPoolExecutor(max_workers=jobs or len(names)) as pool:
+        return list(pool.map(fetch, names))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--topology", help="Manifest path (default: $FIREBASE_EMULATOR_TOPOLOGY)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    key_parser = sub.add_parser("keys", help="Print the cache key of every needed artifact as JSON")
+    key_parser.add_argument("--cli-version", required=True, help="Resolved firebase-tools version")
+    key_parser.add_argument("--prefix", default="firebase-emulator", help="Key prefix (runner OS, suffix input)")
+    fetch_parser = sub.add_parser("prefetch", help="Download the needed artifacts that are not cached")
+    fetch_parser.add_argument("--firebase-bin", required=True)
+    fetch_parser.add_argument("--jobs", type=int, help="Maximum concurrent downloads")
+    fetch_parser.add_argument("--step", default=STEP, help="Ledger step the downloads are recorded under")
+    args = parser.parse_args(argv)
+
+    names = needed(load(args.topology))
+    if args.command == "keys":
+        print(json.dumps(keys(names, args.cli_version, args.prefix)))
+        return 0
+
+    ledger_path = os.environ.get(LEDGER_ENV)
+    missing = []
+    for name in names:
+        if present(name):
+            print(f"[OK] {name}: restored from cache")
+        else:
+            missing.append(name)
+    if not missing:
+        return 0
+
+    print(f"[INFO] Prefetching {', '.join(missing)} into {cache_dir()}")
+    ok = True
+    for name, start, end, returncode, output in prefetch(args.firebase_bin, missing, args.jobs):
+        print(f"::group::setup:emulators:{name}")
+        print("\n".join(output))
+        print("::endgroup::")
+        if returncode != 0:
+            # emulators:start will still try to download it; report but do not fail here
+            print(f"[WARN] {name}: prefetch failed (exit code {returncode})")
+            ok = False
+            continue
+        downloaded = size(name)
+        print(f"[OK] {name}: downloaded")
+        print(f"[TIMING] {name} prefetch Duration: {end - start:.3f}s ({downloaded / 1024 / 1024:.2f} MB)")
+        record(ledger_path, args.step, start, end, phase=f"{name} prefetch", cache_hit=False,
+               bytes_downloaded=downloaded)
+    if not ok:
+        print("[WARN] Missing artifacts will be downloaded when the emulators start")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""
+Load and latency benchmark for emulator-hosted functions and emulator APIs.
+
+Each target (an HTTP function, a callable function, or a raw Firestore/Auth
+emulator endpoint) is driven on its own, one after another, from an asyncio
+client that keeps one HTTP/1.1 connection per concurrent request open:
+
+- closed loop (the default): ``--concurrency`` requests are in flight at all
+  times, each sent as soon as the previous one on its connection finished;
+- open loop (``--rate``): requests are started at a fixed rate, at most
+  ``--concurrency`` at a time. Latency is measured from when a request was
+  due, so a slow target cannot hide its queueing delay by slowing the
+  client down.
+
+A few unmeasured ``--warmup`` requests go first, so a function's cold start
+does not end up in its percentiles (see ``warmup.py`` for that number).
+
+Targets come from ``--function``/``--callable``/``--emulator`` or from a
+spec file:
+
+    {"concurrency": 8, "duration": 10,
+     "targets": [{"function": "hello_world"},
+                 {"function": "echo", "method": "POST", "body": "hi"},
+                 {"callable": "add_message", "data": {"text": "x"}, "uid": "user-1"},
+                 {"emulator": "firestore"},
+                 {"name": "lookup", "emulator": "auth", "method": "POST",
+                  "path": "/identitytoolkit.googleapis.com/v1/projects/{project}/accounts:lookup",
+                  "body": {"localId": ["user-1"]}, "admin": true}]}
+
+The results (throughput, p50/p95/p99 latency, status and error counts per
+target) are printed, recorded to the timing ledger and written as JSON with
+``--output``. Given a previous run as ``--baseline``, a target whose p95
+latency or error rate grew, or whose throughput dropped, by more than
+``--tolerance`` fails the run.
+
+Usage:
+    python -m emulator_tools.bench --spec bench.json --output bench-results.json
+    python -m emulator_tools.bench --function hello_world --rate 50 --duration 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .ledger import LEDGER_ENV, record
+from .seed import project_id
+from .tokens import mint
+from .topology import addresses
+
+STEP = "Benchmark"
+
+DEFAULTS = {"concurrency": 8, "duration": 10.0, "requests": None, "rate": None,
+            "warmup": 3, "timeout": 30.0, "region": "us-central1"}
+
+# Emulator APIs worth measuring without any fixture: both answer 200 on an
+# empty project. "Bearer owner" is the emulators' admin credential.
+BUILTIN = {
+    "firestore": {"method": "GET", "admin": True,
+                  "path": "/v1/projects/{project}/databases/(default)/documents/bench?pageSize=1"},
+    "auth": {"method": "POST", "path": "/identitytoolkit.googleapis.com/v1/projects/{project}/accounts:query",
+             "body": {"returnUserInfo": False}, "admin": True},
+}
+
+
+class BenchError(Exception):
+    """The spec is invalid or a target cannot be built."""
+
+
+@dataclass
+class Target:
+    name: str
+    emulator: str
+    method: str = "GET"
+    path: str = "/"
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_entry(cls, entry: dict, project: str, region: str) -> "Target":
+        entry = dict(entry)
+        if "function" in entry or "callable" in entry:
+            function = entry.get("function") or entry["callable"]
+            entry.setdefault("emulator", "functions")
+            entry.setdefault("path", f"/{project}/{region}/{function}")
+            entry.setdefault("name", function)
+            if "callable" in entry:
+                # Callable functions take their argument as {"data": ...}, always by POST
+                entry.setdefault("method", "POST")
+                entry.setdefault("body", {"data": entry.get("data", {})})
+        elif entry.get("emulator") in BUILTIN:
+            for key, value in BUILTIN[entry["emulator"]].items():
+                entry.setdefault(key, value)
+            entry.setdefault("name", entry["emulator"])
+        if not entry.get("emulator") or not entry.get("path"):
+            raise BenchError(f"target needs 'function', 'callable' or 'emulator' and 'path': {entry}")
+
+        headers = dict(entry.get("headers") or {})
+        body = entry.get("body", b"")
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if entry.get("admin"):
+            headers.setdefault("Authorization", "Bearer owner")
+        elif entry.get("uid"):
+            # The emulators accept unsigned ID tokens, so no sign-in is needed per run
+            headers.setdefault("Authorization", f"Bearer {mint(entry['uid'], project, entry.get('claims'))}")
+        method = entry.get("method") or ("POST" if body else "GET")
+        return cls(entry.get("name") or entry["path"], entry["emulator"], method.upper(),
+                   entry["path"].replace("{project}", project), body, headers)
+
+
+@dataclass
+class BenchResult:
+    name: str
+    url: str
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    latency_ms: Dict[str, float]
+    statuses: Dict[str, int]
+    error_types: Dict[str, int]
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection driven with asyncio streams."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: bytes = b"",
+                      headers: Optional[Dict[str, str]] = None) -> Tuple[int, int]:
+        """Send one request; returns the status and the size of the body read."""
+        for attempt in range(2):
+            fresh = self.writer is None
+            try:
+                if fresh:
+                    self.reader, self.writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout)
+                return await asyncio.wait_for(self._exchange(method, path, body, headers or {}), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                # A reused connection may have been closed by the server while idle: retry once
+                if fresh or attempt:
+                    raise
+            except BaseException:
+                self.close()
+                raise
+        raise AssertionError("unreachable")
+
+    async def _exchange(self, method: str, path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, int]:
+        assert self.reader is not None and self.writer is not None
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        response: Dict[str, str] = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response[name.strip().lower()] = value.strip()
+
+        size = 0
+        if response.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                chunk = int((await self.reader.readline()).split(b";")[0], 16)
+                if chunk == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                size += len(await self.reader.readexactly(chunk + 2)) - 2
+        elif "content-length" in response:
+            size = len(await self.reader.readexactly(int(response["content-length"])))
+        elif int(status) not in (204, 304) and method != "HEAD":
+            size = len(await self.reader.read())
+            response["connection"] = "close"
+
+        connection = response.get("connection", "").lower()
+        if connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive"):
+            self.close()
+        return int(status), size
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted ``values``."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def summarize(target: Target, url: str, latencies: List[float], statuses: Counter, error_types: Counter,
+              seconds: float) -> BenchResult:
+    latencies = sorted(latencies)
+    latency = {"min": latencies[0] if latencies else 0.0,
+               "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+               "p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+               "p99": percentile(latencies, 99), "max": latencies[-1] if latencies else 0.0}
+    requests = sum(statuses.values()) + sum(error_types.values())
+    return BenchResult(target.name, url, requests, requests - len(latencies), round(seconds, 3),
+                       round(len(latencies) / seconds, 2) if seconds > 0 else 0.0,
+                       {k: round(v, 3) for k, v in latency.items()},
+                       {str(k): v for k, v in sorted(statuses.items())}, dict(error_types))
+
+
+async def run_target(target: Target, host: str, port: int, concurrency: int = 8, duration: float = 10.0,
+                     requests: Optional[int] = None, rate: Optional[float] = None, warmup: int = 3,
+                     timeout: float = 30.0) -> BenchResult:
+    """Drive one target; stops after ``requests`` requests if given, else after ``duration`` seconds."""
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(concurrency):
+        pool.put_nowait(Connection(host, port, timeout))
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    error_types: Counter = Counter()
+
+    async def one(due: Optional[float] = None, measure: bool = True) -> None:
+        connection = await pool.get()
+        start = time.perf_counter() if due is None else due
+        try:
+            status, _ = await connection.request(target.method, target.path, target.body, target.headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            if measure:
+                error_types[type(e).__name__] += 1
+            return
+        finally:
+            pool.put_nowait(connection)
+        if measure:
+            statuses[status] += 1
+            if status < 400:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    for _ in range(warmup):
+        await one(measure=False)
+
+    start = time.perf_counter()
+    deadline = None if requests is not None else start + duration
+    if rate:
+        tasks = []
+        for i in range(requests if requests is not None else sys.maxsize):
+            due = start + i / rate
+            if deadline is not None and due >= deadline:
+                break
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            tasks.append(asyncio.ensure_future(one(due)))
+        await asyncio.gather(*tasks)
+    else:
+        remaining = [requests if requests is not None else sys.maxsize]
+
+        async def worker() -> None:
+            while remaining[0] > 0 and (deadline is None or time.perf_counter() < deadline):
+                remaining[0] -= 1
+                await one()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    while not pool.empty():
+        pool.get_nowait().close()
+    return summarize(target, f"http://{host}:{port}{target.path}", latencies, statuses, error_types, seconds)
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float = 0.2) -> List[str]:
+    """Regressions of ``results`` against ``baseline`` (both as written by ``--output``)."""
+    previous = {r["name"]: r for r in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result["name"])
+        if not base:
+            continue
+        name = result["name"]
+        p95, base_p95 = result["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        if base_p95 and p95 > base_p95 * (1 + tolerance):
+            regressions.append(f"{name}: p95 {p95:.1f} ms, baseline {base_p95:.1f} ms")
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['throughput']:.1f} req/s, "
+                               f"baseline {base['throughput']:.1f} req/s")
+        rate, base_rate = (r["errors"] / r["requests"] if r["requests"] else 0.0 for r in (result, base))
+        if rate > base_rate + tolerance / 10:
+            regressions.append(f"{name}: error rate {rate:.1%}, baseline {base_rate:.1%}")
+    return regressions
+
+
+def load_spec(path: Optional[str]) -> dict:
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BenchError(f"cannot read {path}: {e}") from e
+    if not isinstance(spec, dict) or not isinstance(spec.get("targets", []), list):
+        raise BenchError(f"{path}: expected an object with a 'targets' list")
+    return spec
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spec", help="JSON file with targets and settings")
+    parser.add_argument("--function", action="append", default=[], help="HTTP function to benchmark")
+    parser.add_argument("--callable", action="append", default=[], help="Callable function to benchmark")
+    parser.add_argument("--emulator", action="append", default=[], choices=sorted(BUILTIN),
+                        help="Emulator API to benchmark")
+    parser.add_argument("--project", help="Project ID (default: spec, then $GCLOUD_PROJECT)")
+    parser.add_argument("--region", help=f"Functions region (default: {DEFAULTS['region']})")
+    parser.add_argument("--host", action="append", default=[], metavar="NAME=HOST:PORT",
+                        help="Where an emulator listens (default: exported variables, topology, defaults)")
+    parser.add_argument("--concurrency", type=int,
+                        help=f"Requests in flight (default: {DEFAULTS['concurrency']})")
+    parser.add_argument("--rate", type=float, help="Requests per second per target (default: closed loop)")
+    parser.add_argument("--duration", type=float,
+                        help=f"Seconds per target (default: {DEFAULTS['duration']:g})")
+    parser.add_argument("--requests", type=int, help="Requests per target instead of a duration")
+    parser.add_argument("--warmup", type=int, help=f"Unmeasured requests first (default: {DEFAULTS['warmup']})")
+    parser.add_argument("--timeout", type=float, help=f"Seconds per request (default: {DEFAULTS['timeout']:g})")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression against the baseline")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec)
+        settings = {key: getattr(args, key) if getattr(args, key) is not None else spec.get(key, default)
+                    for key, default in DEFAULTS.items()}
+        project = args.project or spec.get("project") or project_id()
+        entries = (list(spec.get("targets", [])) + [{"function": f} for f in args.function]
+                   + [{"callable": c} for c in args.callable] + [{"emulator": e} for e in args.emulator])
+        if not entries:
+            raise BenchError("no targets: pass --spec, --function, --callable or --emulator")
+        targets = [Target.from_entry(entry, project, settings["region"]) for entry in entries]
+        hosts = addresses(sorted({t.emulator for t in targets} - {h.split("=")[0] for h in args.host}))
+        for option in args.host:
+            name, _, address = option.partition("=")
+            host, _, port = address.rpartition(":")
+            hosts[name] = (host, int(port))
+    except (BenchError, KeyError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+
+    load = {key: settings[key] for key in ("concurrency", "duration", "requests", "rate", "warmup", "timeout")}
+    mode = f"{settings['rate']:g} req/s" if settings["rate"] else "closed loop"
+    print(f"[INFO] Benchmarking {len(targets)} target(s), concurrency {settings['concurrency']}, {mode}")
+    ledger_path = os.environ.get(LEDGER_ENV)
+    results = []
+    for target in targets:
+        start = time.time()
+        result = asyncio.run(run_target(target, *hosts[target.emulator], **load))
+        record(ledger_path, STEP, start, time.time(), phase=result.name, requests=result.requests,
+               errors=result.errors, throughput=result.throughput, p50_ms=result.latency_ms["p50"],
+               p95_ms=result.latency_ms["p95"], p99_ms=result.latency_ms["p99"])
+        latency = result.latency_ms
+        print(f"[{'OK' if not result.errors else 'WARN'}] {result.name}: {result.requests} requests, "
+              f"{result.errors} errors, {result.throughput:.1f} req/s, p50 {latency['p50']:.1f} ms, "
+              f"p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms")
+        if result.error_types or any(int(s) >= 400 for s in result.statuses):
+            print(f"       statuses {result.statuses}, errors {result.error_types}")
+        results.append(asdict(result))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"project": project, "settings": load, "results": results}, f, indent=2)
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] Cannot read baseline {args.baseline}: {e}")
+            return 0
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"[ERROR] Regression: {regression}")
+        if regressions:
+            return 1
+        print(f"[OK] No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Readiness deadline learned from how long earlier runs took to start.
+
+``wait-time`` is an upper bound sized for the slowest start anyone has seen.
+A hung start waits all of it and then goes on to the health check. This
+module keeps the readiness durations of successful runs in a small history
+file, which the action caches per firebase.json, emulator set, CLI version
+and runner image. Once it holds ``MIN_SAMPLES`` runs, the deadline becomes
+
+    p95 of the history * FACTOR + MARGIN   (at least FLOOR, at most wait-time)
+
+A start that exceeds a learned deadline is treated as hung and fails the
+step. Without enough history the fixed ``wait-time`` applies as before.
+
+Usage:
+    python -m emulator_tools.deadline key --cli-version 14.1.0 --prefix Windows-firebase-startup
+    python -m emulator_tools.deadline compute --ceiling 120
+    python -m emulator_tools.deadline record
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import sys
+import time
+from typing import List, Optional
+
+from .ledger import LEDGER_ENV, read
+from .topology import load
+
+DEFAULT_HISTORY = os.path.join(os.path.expanduser("~"), ".firebase-emulator-startup", "history.json")
+READINESS_STEP = "Wait for Emulators to be Ready"
+
+MAX_SAMPLES = 30
+MIN_SAMPLES = 5
+PERCENTILE = 95
+FACTOR = 1.5
+MARGIN = 15.0
+FLOOR = 30.0
+
+
+def runner_image(environ: Optional[dict] = None) -> str:
+    """The hosted runner image (``ImageOS``/``ImageVersion``), else the platform."""
+    environ = os.environ if environ is None else environ
+    if environ.get("ImageOS"):
+        return f"{environ['ImageOS']}-{environ.get('ImageVersion', '')}"
+    return f"{platform.system()}-{platform.release()}"
+
+
+def history_key(topology_path: Optional[str], cli_version: str, prefix: str,
+                image: Optional[str] = None) -> str:
+    """Key that changes with firebase.json, the started emulators, the CLI and the runner image."""
+    topology = load(topology_path)
+    digest = hashlib.sha256()
+    started = sorted(name for name, emulator in topology.emulators.items() if emulator.selected)
+    fields = [cli_version, image or runner_image(), ",".join(started)]
+    digest.update(("\n".join(fields) + "\n").encode())
+    if topology.config_found:
+        with open(topology.config_path, "rb") as f:
+            digest.update(f.read())
+    return f"{prefix}-{digest.hexdigest()[:16]}"
+
+
+def load_samples(path: str) -> List[float]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [float(s["seconds"]) for s in json.load(f).get("samples", [])]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return []
+
+
+def add_sample(path: str, seconds: float, now: Optional[float] = None) -> List[float]:
+    """Append one readiness duration, keeping the newest ``MAX_SAMPLES``."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            samples = json.load(f).get("samples", [])
+    except (OSError, ValueError, AttributeError):
+        samples = []
+    samples.append({"seconds": round(seconds, 3), "at": int(time.time() if now is None else now)})
+    samples = samples[-MAX_SAMPLES:]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"samples": samples}, f)
+    return [s["seconds"] for s in samples]
+
+
+def deadline(samples: List[float], ceiling: float) -> Optional[float]:
+    """The learned deadline in seconds, or None while the history is too short."""
+    if len(samples) < MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    high = ordered[max(0, math.ceil(PERCENTILE / 100 * len(ordered)) - 1)]
+    return min(ceiling, max(FLOOR, math.ceil(high * FACTOR + MARGIN)))
+
+
+def last_readiness(ledger_path: Optional[str]) -> Optional[float]:
+    """Duration of the latest successful readiness wait in the ledger."""
+    if not ledger_path:
+        return None
+    for entry in reversed(read(ledger_path)):
+        if entry.get("step") == READINESS_STEP and entry.get("phase") == "readiness":
+            return float(entry["duration"]) if entry.get("ready") else None
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="History file (cached by the action)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    key_parser = sub.add_parser("key", help="Print the cache key of the history")
+    key_parser.add_argument("--topology", help="Manifest path (default: $FIREBASE_EMULATOR_TOPOLOGY)")
+    key_parser.add_argument("--cli-version", required=True, help="Resolved firebase-tools version")
+    key_parser.add_argument("--prefix", default="firebase-startup", help="Key prefix (runner OS, suffix input)")
+    compute_parser = sub.add_parser("compute", help="Print the deadline to wait with as JSON")
+    compute_parser.add_argument("--ceiling", type=float, required=True, help="The wait-time input")
+    record_parser = sub.add_parser("record", help="Add the latest readiness duration to the history")
+    record_parser.add_argument("--seconds", type=float, help="Duration (default: from the timing ledger)")
+    args = parser.parse_args(argv)
+
+    if args.command == "key":
+        print(history_key(args.topology, args.cli_version, args.prefix))
+        return 0
+
+    if args.command == "compute":
+        samples = load_samples(args.history)
+        learned = deadline(samples, args.ceiling)
+        print(json.dumps({
+            "deadline": learned if learned is not None else args.ceiling,
+            "adaptive": learned is not None,
+            "samples": len(samples),
+            "slowest": max(samples) if samples else None,
+        }))
+        return 0
+
+    seconds = args.seconds if args.seconds is not None else last_readiness(os.environ.get(LEDGER_ENV))
+    if seconds is None:
+        print("[INFO] No successful readiness wait to record")
+        return 0
+    samples = add_sample(args.history, seconds)
+    print(f"[INFO] Recorded readiness in {seconds:.3f}s ({len(samples)} run(s) in the startup history)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Download a file over HTTPS and record it in the timing ledger.
+
+Used for the Firebase CLI standalone binary (~160 MB). When the server
+answers ``Range`` requests the file is preallocated and fetched in parts
+over several concurrent connections. Finished parts are listed in a small
+state file next to the download, so a retry only fetches what is still
+missing. Servers without range support get a single stream.
+
+The body is written to ``<path>.partial`` and renamed into place only once
+complete and, when a checksum is given, after its SHA-256 matched, so an
+interrupted or corrupted download never becomes ``firebase.exe``.
+
+Usage:
+    python -m emulator_tools.download https://firebase.tools/bin/win/latest firebase.exe
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
+
+from .ledger import LEDGER_ENV, record
+
+CHUNK_SIZE = 1024 * 1024
+PART_SIZE = 8 * 1024 * 1024
+CONNECTIONS = 4
+ATTEMPTS = 3
+
+USER_AGENT = "setup-firebase-emulator-win"
+CONTENT_RANGE = re.compile(r"bytes\s+\d+-\d+/(?P<size>\d+)")
+
+
+class ChecksumError(Exception):
+    """The downloaded file does not have the expected SHA-256."""
+
+
+@dataclass
+class Probe:
+    """What the server said about the file before the download starts."""
+
+    url: str
+    size: Optional[int]
+    ranges: bool
+    validator: Optional[str]
+
+
+@dataclass
+class DownloadResult:
+    size: int
+    fetched: int
+    resumed: int
+    connections: int
+
+
+def sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _request(url: str, byte_range: Optional[Tuple[int, int]] = None) -> urllib.request.Request:
+    headers = {"User-Agent": USER_AGENT}
+    if byte_range is not None:
+        headers["Range"] = f"bytes={byte_range[0]}-{byte_range[1]}"
+    return urllib.request.Request(url, headers=headers)
+
+
+def probe(url: str, timeout: float = 30.0) -> Probe:
+    """
+    Ask for the first byte: a 206 with ``Content-Range`` means ranges work.
+    Redirects (GitHub release assets) are followed once, here, and the parts
+    are fetched from the final URL.
+    """
+    with urllib.request.urlopen(_request(url, (0, 0)), timeout=timeout) as response:
+        validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        match = CONTENT_RANGE.match(response.headers.get("Content-Range") or "")
+        if response.status == 206 and match:
+            return Probe(response.geturl(), int(match.group("size")), True, validator)
+        length = response.headers.get("Content-Length")
+        return Probe(response.geturl(), int(length) if length else None, False, validator)
+
+
+class _State:
+    """Parts already on disk, saved after every part so a retry can resume."""
+
+    def __init__(self, path: str, info: Probe, part_size: int):
+        self.path = path
+        self.key = {"size": info.size, "validator": info.validator, "part_size": part_size}
+        self.done: Set[int] = set()
+        self.lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Restore the finished parts if the state describes the same file."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        # Redirect URLs are signed per request, so only size and validator identify the file
+        if any(data.get(k) != v for k, v in self.key.items()):
+            return False
+        self.done = set(data.get("done", []))
+        return True
+
+    def mark(self, index: int) -> None:
+        with self.lock:
+            self.done.add(index)
+            partial = self.path + ".tmp"
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump(dict(self.key, done=sorted(self.done)), f)
+            os.replace(partial, self.path)
+
+
+def _fetch_part(url: str, path: str, start: int, end: int, timeout: float) -> int:
+    with urllib.request.urlopen(_request(url, (start, end)), timeout=timeout) as response:
+        if response.status != 206:
+            raise OSError(f"Server ignored Range bytes={start}-{end} (HTTP {response.status})")
+        written = 0
+        with open(path, "r+b") as f:
+            f.seek(start)
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                f.write(chunk)
+                written += len(chunk)
+    if written != end - start + 1:
+        raise OSError(f"Short read for bytes={start}-{end}: got {written} bytes")
+    return written
+
+
+def _ranged(info: Probe, partial: str, connections: int, part_size: int, timeout: float,
+            attempts: int) -> Tuple[int, int, int]:
+    """Fetch the missing parts; returns (bytes fetched now, bytes resumed from disk, connections used)."""
+    size = info.size or 0
+    state = _State(partial + ".json", info, part_size)
+    if not (os.path.exists(partial) and state.load()):
+        with open(partial, "wb") as f:
+            f.truncate(size)  # preallocate; every part writes at its own offset
+    parts = [(i, start, min(start + part_size, size) - 1) for i, start in enumerate(range(0, size, part_size))]
+    resumed = sum(end - start + 1 for i, start, end in parts if i in state.done)
+
+    def fetch(part: Tuple[int, int, int]) -> int:
+        index, start, end = part
+        try:
+            written = _fetch_part(info.url, partial, start, end, timeout)
+        except (OSError, http.client.HTTPException):
+            return 0  # retried in the next round
+        state.mark(index)
+        return written
+
+    fetched = used = 0
+    for _ in range(attempts):
+        pending = [p for p in parts if p[0] not in state.done]
+        if not pending:
+            break
+        used = max(used, min(connections, len(pending)))
+        with ThreadPoolExecutor(max_workers=min(connections, len(pending))) as pool:
+            fetched += sum(pool.map(fetch, pending))
+
+    missing = len(parts) - len(state.done)
+    if missing:
+        raise OSError(f"{missing} of {len(parts)} parts failed after {attempts} attempts; "
+                      f"{partial} is kept to resume")
+    return fetched, resumed, used
+
+
+def _stream(info: Probe, partial: str, timeout: float) -> int:
+    with urllib.request.urlopen(_request(info.url), timeout=timeout) as response, open(partial, "wb") as f:
+        shutil.copyfileobj(response, f, CHUNK_SIZE)
+    written = os.path.getsize(partial)
+    # read(amt) returns what arrived when the connection drops before Content-Length bytes
+    if info.size is not None and written != info.size:
+        raise OSError(f"Short read: got {written} of {info.size} bytes")
+    return written
+
+
+def _discard(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def download(url: str, path: str, timeout: float = 60.0, expected_sha256: Optional[str] = None,
+             connections: int = CONNECTIONS, part_size: int = PART_SIZE,
+             attempts: int = ATTEMPTS) -> DownloadResult:
+    """
+    Fetch ``url`` into ``path``.
+
+    With ``expected_sha256`` the file is only moved into place if it matches;
+    a mismatch discards the partial download so the next try starts over.
+    A ranged download that fails otherwise keeps it, to be resumed.
+    """
+    partial = path + ".partial"
+    state = partial + ".json"
+    info = probe(url, timeout)
+    if info.ranges and info.size:
+        fetched, resumed, used = _ranged(info, partial, connections, part_size, timeout, attempts)
+    else:
+        _discard(state)
+        try:
+            fetched, resumed, used = _stream(info, partial, timeout), 0, 1
+        except (OSError, http.client.HTTPException):
+            _discard(partial)
+            raise
+
+    if expected_sha256:
+        actual = sha256(partial)
+        if actual != expected_sha256.lower():
+            _discard(partial, state)
+            raise ChecksumError(f"SHA-256 mismatch for {url}: expected {expected_sha256}, got {actual}")
+    size = os.path.getsize(partial)
+    os.replace(partial, path)
+    _discard(state)
+    return DownloadResult(size, fetched, resumed, used)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("url")
+    parser.add_argument("path")
+    parser.add_argument("--sha256", help="Expected checksum; the download fails on a mismatch")
+    parser.add_argument("--connections", type=int, default=CONNECTIONS,
+                        help="Concurrent range requests when the server supports them")
+    parser.add_argument("--step", default="Download Firebase CLI Standalone Binary",
+                        help="Ledger step the download is recorded under")
+    args = parser.parse_args(argv)
+
+    print(f"Downloading from: {args.url}")
+    start = time.time()
+    try:
+        result = download(args.url, args.path, expected_sha256=args.sha256, connections=args.connections)
+    except (OSError, http.client.HTTPException, ChecksumError) as e:
+        print(f"[ERROR] Download failed: {e}")
+        return 1
+    end = time.time()
+    throughput = result.fetched / 1024 / 1024 / (end - start) if end > start else 0.0
+    print("[OK] Binary downloaded successfully")
+    if result.resumed:
+        print(f"[INFO] Resumed {result.resumed / 1024 / 1024:.2f} MB from an earlier attempt")
+    print(f"[TIMING] Download Time: {end - start:.3f}s ({result.size / 1024 / 1024:.2f} MB, "
+          f"{throughput:.2f} MB/s over {result.connections} connection(s))")
+    record(os.environ.get(LEDGER_ENV), args.step, start, end, phase="download",
+           cache_hit=False, bytes_downloaded=result.fetched, throughput_mb_s=round(throughput, 2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Health check of every emulator the Hub reports, with per-emulator latency.
+
+The Hub's ``/emulators`` map is fetched once and every emulator in it is
+probed concurrently with a plain TCP connect plus that emulator's own HTTP
+check (see ``probes.py``: Firestore's root must answer "Ok", the Auth
+emulator must serve the project config, ...). The check takes about as long
+as the slowest emulator takes to answer, and the summary reports for each
+emulator how long the connect and the first response took.
+
+The summary is a JSON list with one entry per emulator:
+
+    {"Name": "firestore", "Host": "127.0.0.1", "Port": 8080, "Running": true,
+     "ConnectMs": 0.4, "ResponseMs": 3.1, "Status": 200, "Probe": "HTTP 200"}
+
+Cold starts recorded by ``warmup.py`` are added to the ``functions`` entry
+as ``ColdStarts``.
+
+Usage:
+    python -m emulator_tools.health --hub-port 4400 --project demo-project --output health.json
+
+Exit codes: 0 checked (emulators that do not answer are reported), 1 the Hub is not reachable.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+from .ledger import LEDGER_ENV, record
+from .probes import DEFAULT_PROJECT, Endpoint, ProbeResult, probe_all
+from .readiness import fetch_hub
+
+STEP = "Health Check"
+
+
+def summarize(results: List[ProbeResult], cold_starts: Optional[list] = None) -> List[dict]:
+    summary = []
+    for r in results:
+        entry = {"Name": r.name, "Host": r.host, "Port": r.port, "Running": r.ok,
+                 "ConnectMs": None if r.connect_ms is None else round(r.connect_ms, 1),
+                 "ResponseMs": None if r.response_ms is None else round(r.response_ms, 1),
+                 "Status": r.status, "Probe": r.detail}
+        if r.name == "functions" and cold_starts is not None:
+            entry["ColdStarts"] = [{"Function": c.get("id"), "Warm": c.get("ok"),
+                                    "ColdStartMs": c.get("cold_start_ms")} for c in cold_starts]
+        summary.append(entry)
+    return summary
+
+
+def read_cold_starts(path: Optional[str]) -> Optional[list]:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Cannot read function warmup results {path}: {e}")
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hub-host", default="127.0.0.1")
+    parser.add_argument("--hub-port", type=int, default=4400)
+    parser.add_argument("--project", help=f"Project the Auth config is read for (default: {DEFAULT_PROJECT})")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Seconds to wait for one emulator")
+    parser.add_argument("--warmup", help="Function warmup results to add as ColdStarts")
+    parser.add_argument("--output", help="Write the summary JSON here")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    hub = fetch_hub(args.hub_host, args.hub_port, timeout=args.timeout)
+    if hub is None:
+        print(f"[ERROR] Failed to connect to Emulator Hub on port {args.hub_port}")
+        return 1
+    print(f"[OK] Emulator Hub is responding ({len(hub)} emulator(s) registered)")
+    print("")
+
+    endpoints = [Endpoint.from_hub(name, info) for name, info in hub.items()
+                 if isinstance(info, dict) and info.get("port")]
+    results = probe_all(endpoints, timeout=args.timeout, project=args.project or DEFAULT_PROJECT)
+    end = time.time()
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    width = max((len(r.name) for r in results), default=4)
+    print(f"  {'Emulator':<{width}}  {'Address':<21}  {'Connect ms':>10}  {'Response ms':>11}  Result")
+    ledger_path = os.environ.get(LEDGER_ENV)
+    for r in results:
+        status = "[OK]" if r.ok else "[WARN]"
+        print(f"  {r.name:<{width}}  {f'{r.host}:{r.port}':<21}  {ms(r.connect_ms):>10}  "
+              f"{ms(r.response_ms):>11}  {status} {r.detail}")
+        record(ledger_path, STEP, start, start + (r.response_ms or r.connect_ms or 0) / 1000, phase=r.name,
+               ok=r.ok, connect_ms=r.connect_ms, response_ms=r.response_ms)
+    print("")
+
+    running = [r for r in results if r.ok]
+    if len(running) == len(results):
+        print(f"[SUCCESS] All {len(results)} emulator(s) are running!")
+    else:
+        print(f"[WARNING] {len(running)}/{len(results)} emulator(s) accessible")
+    answered = [r for r in running if r.response_ms is not None]
+    if answered:
+        slowest = max(answered, key=lambda r: r.response_ms)
+        print(f"[INFO] Slowest to answer: {slowest.name} ({slowest.response_ms:.1f} ms)")
+    print(f"[TIMING] Emulator probes: {end - start:.3f}s for {len(results)} emulator(s)")
+
+    summary = summarize(results, read_cold_starts(args.warmup))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, separators=(",", ":"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
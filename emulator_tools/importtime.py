@@ -0,0 +1,170 @@
+"""
+Summarize where Python function workers spend their import time.
+
+Every function worker the emulator starts imports the codebase's
+``main.py`` and everything it pulls in (``firebase_functions``,
+``firebase_admin``, ``google.cloud.firestore``, ...) before it can answer
+the first request. With the action's ``profile-imports`` input each worker
+writes its imports to ``imports-<pid>.txt`` (see
+``importtime_site/sitecustomize.py``); plain ``python -X importtime``
+stderr captures are read too.
+
+Workers are grouped into codebases by their working directory (the
+codebase's source directory, from the topology manifest). Per codebase the
+report shows the import time of the slowest worker and the modules with the
+highest cumulative time (what an ``import`` of them costs, dependencies
+included) and self time (the module's own top-level code).
+
+Usage:
+    python -m emulator_tools.importtime <profile dir or files> [--top 15]
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .ledger import LEDGER_ENV, record
+from .topology import TOPOLOGY_ENV, Topology, load
+
+STEP = "Import Time Profile"
+PROFILE_ENV = "FIREBASE_IMPORT_PROFILE_DIR"
+
+# "import time:       668 |      14489 |   email.message"
+LINE = re.compile(
+    r"import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<indent>\s*)(?P<name>\S+)")
+HEADER = re.compile(r"^# (?P<key>cwd|argv): (?P<value>.*)$")
+
+
+@dataclass
+class Import:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class Process:
+    path: str
+    cwd: Optional[str] = None
+    argv: str = ""
+    imports: List[Import] = field(default_factory=list)
+
+    @property
+    def total_us(self) -> int:
+        """Time spent importing at all: the sum over the top-level imports."""
+        return sum(i.cumulative_us for i in self.imports if i.depth == 0)
+
+
+def parse(path: str, lines: Iterable[str]) -> Process:
+    process = Process(path)
+    for line in lines:
+        header = HEADER.match(line.rstrip("\r\n"))
+        if header:
+            setattr(process, header.group("key"), header.group("value"))
+            continue
+        match = LINE.search(line)
+        if match:
+            # The "-X importtime" output uses one space before the name, plus two per level
+            depth = max(0, len(match.group("indent")) - 1) // 2
+            process.imports.append(Import(match.group("name"), int(match.group("self")),
+                                          int(match.group("cumulative")), depth))
+    return process
+
+
+def read(paths: List[str]) -> List[Process]:
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.txt")) +
+                                glob.glob(os.path.join(path, "*.log"))))
+        elif os.path.exists(path):
+            files.append(path)
+    processes = []
+    for path in files:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            process = parse(path, f)
+        if process.imports:
+            processes.append(process)
+    return processes
+
+
+def codebase_of(process: Process, topology: Optional[Topology]) -> str:
+    """The codebase whose source directory the worker ran in."""
+    if process.cwd and topology:
+        cwd = os.path.normcase(os.path.abspath(process.cwd))
+        for codebase in sorted(topology.functions, key=lambda c: len(c.dir), reverse=True):
+            directory = os.path.normcase(os.path.abspath(codebase.dir))
+            if cwd == directory or cwd.startswith(directory + os.sep):
+                return codebase.codebase
+    return process.cwd or "unknown"
+
+
+def group(processes: List[Process], topology: Optional[Topology] = None) -> Dict[str, List[Process]]:
+    groups: Dict[str, List[Process]] = {}
+    for process in processes:
+        groups.setdefault(codebase_of(process, topology), []).append(process)
+    return groups
+
+
+def slowest(processes: List[Process], key: str, top: int) -> List[Import]:
+    """Modules by ``key`` (self_us/cumulative_us), the worst worker's figure for each."""
+    worst: Dict[str, Import] = {}
+    for process in processes:
+        for entry in process.imports:
+            if entry.name not in worst or getattr(entry, key) > getattr(worst[entry.name], key):
+                worst[entry.name] = entry
+    return sorted(worst.values(), key=lambda i: getattr(i, key), reverse=True)[:top]
+
+
+def format_report(name: str, processes: List[Process], top: int = 15) -> str:
+    totals = sorted(p.total_us for p in processes)
+    lines = [f"Codebase {name}: {len(processes)} Python process(es), import time "
+             f"max {totals[-1] / 1e6:.3f}s, median {totals[len(totals) // 2] / 1e6:.3f}s"]
+    width = min(60, max(len(i.name) for p in processes for i in p.imports))
+    lines.append(f"  {'module':<{width}}  {'cumulative':>10}  {'self':>9}")
+    for entry in slowest(processes, "cumulative_us", top):
+        lines.append(f"  {entry.name:<{width}}  {entry.cumulative_us / 1000:8.1f}ms  "
+                     f"{entry.self_us / 1000:7.1f}ms")
+    lines.append("  Highest self time:")
+    for entry in slowest(processes, "self_us", min(top, 5)):
+        lines.append(f"  {entry.name:<{width}}  {'':>10}  {entry.self_us / 1000:7.1f}ms")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*", help=f"Profile directories or files (default: ${PROFILE_ENV})")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list per codebase")
+    parser.add_argument("--topology", help="Manifest path (default: $FIREBASE_EMULATOR_TOPOLOGY)")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [p for p in [os.environ.get(PROFILE_ENV)] if p]
+    processes = read(paths)
+    if not processes:
+        print("[INFO] No import-time profiles found (no Python function worker has started yet)")
+        return 0
+    manifest = args.topology or os.environ.get(TOPOLOGY_ENV)
+    topology = load(manifest) if manifest and os.path.exists(manifest) else None
+
+    now = time.time()
+    ledger_path = os.environ.get(LEDGER_ENV)
+    for name, members in sorted(group(processes, topology).items()):
+        print(format_report(name, members, args.top))
+        print("")
+        worst = max(p.total_us for p in members) / 1e6
+        print(f"[TIMING] {name} import time: {worst:.3f}s (slowest of {len(members)} process(es))")
+        print("")
+        record(ledger_path, STEP, now - worst, now, phase=name, processes=len(members),
+               top_modules=[i.name for i in slowest(members, "cumulative_us", 5)])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
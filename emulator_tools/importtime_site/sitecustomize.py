@@ -0,0 +1,56 @@
+"""
+Import-time tracing for Python processes started by the emulators.
+
+This directory is put on the PYTHONPATH of the emulator service when the
+action's ``profile-imports`` input is set, so every Python function worker
+loads this module before any of its own code. With
+``FIREBASE_IMPORT_PROFILE_DIR`` set, each module import is timed and
+written to ``<dir>/imports-<pid>.txt`` in the format of
+``python -X importtime`` (which only writes to stderr, where the emulator
+would mix it into the function's output). ``emulator_tools.importtime``
+summarizes the files.
+
+Only builtin modules are used here, so the tracer itself adds next to
+nothing to what it measures.
+"""
+import os
+
+
+def _install(directory):
+    import _thread
+    import importlib._bootstrap as bootstrap
+    import sys
+    import time
+
+    os.makedirs(directory, exist_ok=True)
+    out = open(os.path.join(directory, "imports-%d.txt" % os.getpid()), "a", encoding="utf-8", buffering=1)
+    out.write("# cwd: %s\n# argv: %s\n" % (os.getcwd(), " ".join(getattr(sys, "argv", []))))
+    out.write("import time: self [us] | cumulative | imported package\n")
+    original = bootstrap._find_and_load
+    local = _thread._local()
+
+    def _find_and_load(name, import_):
+        # The import machinery looks this function up on importlib._bootstrap
+        # for every import that is not in sys.modules yet
+        stack = local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, import_)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            out.write("import time: %9d | %10d | %s%s\n" % (
+                (cumulative - children) * 1e6, cumulative * 1e6, "  " * len(stack), name))
+
+    bootstrap._find_and_load = _find_and_load
+
+
+if os.environ.get("FIREBASE_IMPORT_PROFILE_DIR"):
+    try:
+        _install(os.environ["FIREBASE_IMPORT_PROFILE_DIR"])
+    except OSError:
+        # Profiling must never keep a function from starting
+        pass
@@ -0,0 +1,328 @@
+"""
+Install the dependencies of every functions codebase, concurrently.
+
+The codebases come from the topology manifest (see ``topology.py``). Each
+one gets its own worker: ``npm install`` for Node codebases, ``uv`` (or
+``venv`` + ``pip`` when uv is not on PATH) for Python codebases. Codebases
+do not share a directory, so the installs are independent and the step
+takes as long as the slowest codebase rather than the sum of all of them.
+
+Output of each install is buffered and printed as one block when it
+finishes, so logs of parallel installs do not interleave. Every codebase is
+recorded in the timing ledger as a phase of the install step.
+
+The built environments (``venv`` and ``node_modules``) are cached by
+``actions/cache`` under a key derived from the lockfiles, the interpreter
+each environment is built with and the platform. After a cache hit an
+environment that still works is used as is and its install is skipped.
+
+Usage:
+    python -m emulator_tools.install cache-key [--topology topology.json]
+    python -m emulator_tools.install run [--cache-hit] [--jobs 4]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .ledger import LEDGER_ENV, record
+from .topology import Codebase, load
+
+STEP = "Install Firebase Functions dependencies"
+
+# firebase-functions for Python requires 3.10+
+MIN_PYTHON = (3, 10)
+
+# Interpreter requested when uv creates a new venv
+UV_PYTHON = "3.12"
+
+# Files whose content decides what gets installed, in order of preference
+LOCKFILES = {
+    "node": ["package-lock.json", "npm-shrinkwrap.json", "package.json"],
+    "python": ["requirements.txt"],
+}
+
+# Directory each runtime installs into, relative to the codebase
+ENVIRONMENTS = {"node": "node_modules", "python": "venv"}
+
+
+@dataclass
+class Install:
+    codebase: Codebase
+    tool: str
+    commands: List[List[str]]
+
+
+@dataclass
+class Result:
+    install: Install
+    start: float
+    end: float
+    returncode: int
+    output: List[str] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+def _venv_python(directory: str) -> str:
+    scripts = "Scripts" if os.name == "nt" else "bin"
+    return os.path.join(directory, "venv", scripts, "python")
+
+
+def plan(codebase: Codebase, uv: Optional[str] = None, python: Optional[str] = None,
+         npm: Optional[str] = None) -> Optional[Install]:
+    """
+    Commands that install one codebase, or None if its runtime is unknown.
+
+    The Firebase CLI expects Python codebases to have a ``venv`` directory
+    next to ``requirements.txt``; an existing venv is reused.
+    """
+    has_venv = os.path.isdir(os.path.join(codebase.dir, "venv"))
+    if codebase.runtime == "node":
+        return Install(codebase, "npm", [[npm or "npm", "install"]])
+    if codebase.runtime != "python":
+        return None
+    if uv:
+        commands = [] if has_venv else [[uv, "venv", "venv", "--python", UV_PYTHON]]
+        commands.append([uv, "pip", "install", "--python", "venv", "-r", "requirements.txt"])
+        return Install(codebase, "uv", commands)
+    venv_python = _venv_python(codebase.dir)
+    commands = [] if has_venv else [[python or sys.executable, "-m", "venv", "venv"]]
+    commands += [[venv_python, "-m", "pip", "install", "--upgrade", "pip"],
+                 [venv_python, "-m", "pip", "install", "-r", "requirements.txt"]]
+    return Install(codebase, "pip", commands)
+
+
+def lockfile(codebase: Codebase) -> Optional[str]:
+    for name in LOCKFILES.get(codebase.runtime or "", []):
+        path = os.path.join(codebase.dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _version(command: List[str]) -> Optional[str]:
+    try:
+        proc = subprocess.run(command, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    output = (proc.stdout or proc.stderr).strip()
+    return output if proc.returncode == 0 and output else None
+
+
+def interpreter(tool: str, uv: Optional[str] = None) -> Optional[str]:
+    """
+    Path and version of the interpreter an environment is built with.
+
+    A venv points at its base interpreter by absolute path, so a venv
+    restored on a runner with a different interpreter is not usable.
+    """
+    if tool == "npm":
+        return _version(["node", "--version"])
+    if tool == "uv" and uv:
+        path = _version([uv, "python", "find", UV_PYTHON])
+        version = path and _version([path, "--version"])
+        return f"{path} {version}" if version else None
+    return f"{sys.executable} {sys.version.split()[0]}"
+
+
+def cache_key(installs: List[Install], interpreters: Dict[str, Optional[str]], prefix: str) -> str:
+    """Key that changes when any lockfile, interpreter or the platform changes."""
+    digest = hashlib.sha256()
+    digest.update(f"{platform.system()}-{platform.machine()}\n".encode())
+    for install in sorted(installs, key=lambda i: i.codebase.dir):
+        path = lockfile(install.codebase)
+        fields = [install.codebase.source, install.tool, str(interpreters.get(install.tool))]
+        digest.update(("\n".join(fields) + "\n").encode())
+        if path:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return f"{prefix}-{digest.hexdigest()[:32]}"
+
+
+def environment(install: Install) -> str:
+    return os.path.join(install.codebase.dir, ENVIRONMENTS[install.codebase.runtime])
+
+
+def restored(install: Install) -> bool:
+    """True if the environment restored from cache can be used without reinstalling."""
+    path = environment(install)
+    if install.codebase.runtime == "node":
+        return os.path.isdir(path) and bool(os.listdir(path))
+    return _version([_venv_python(install.codebase.dir), "--version"]) is not None
+
+
+def run_commands(commands: List[List[str]], cwd: Optional[str] = None) -> Tuple[int, List[str]]:
+    """Run commands in order, stopping at the first failure; returns (exit code, output)."""
+    output: List[str] = []
+    returncode = 0
+    for command in commands:
+        output.append(f"> {' '.join(command)}")
+        try:
+            proc = subprocess.run(command, cwd=cwd, capture_output=True, text=True,
+                                  encoding="utf-8", errors="replace")
+        except OSError as e:
+            output.append(str(e))
+            return 1, output
+        output += (proc.stdout + proc.stderr).splitlines()
+        returncode = proc.returncode
+        if returncode != 0:
+            break
+    return returncode, output
+
+
+def run(install: Install) -> Result:
+    """Run one codebase's commands in order, stopping at the first failure."""
+    start = time.time()
+    returncode, output = run_commands(install.commands, cwd=install.codebase.dir)
+    return Result(install, start, time.time(), returncode, output)
+
+
+def run_all(installs: List[Install], jobs: Optional[int] = None) -> List[Result]:
+    """Run the installs concurrently; results keep the order of ``installs``."""
+    if not installs:
+        return []
+    with ThreadPoolExecutor(max_workers=jobs or len(installs)) as pool:
+        return list(pool.map(run, installs))
+
+
+def _label(codebase: Codebase) -> str:
+    if codebase.codebase == "default" or codebase.codebase == codebase.source:
+        return codebase.source
+    return f"{codebase.codebase} ({codebase.source})"
+
+
+def installs_for(topology_path: Optional[str], verbose: bool = True) -> List[Install]:
+    """One install per functions codebase with a detected runtime."""
+    topology = load(topology_path)
+    uv = shutil.which("uv")
+    installs = []
+    seen = set()
+    for codebase in topology.functions:
+        # Two codebases may point at the same source directory
+        if codebase.dir in seen:
+            continue
+        seen.add(codebase.dir)
+        install = plan(codebase, uv=uv, npm=shutil.which("npm"))
+        if install is None:
+            if verbose:
+                print(f"[INFO] {_label(codebase)}: no package.json or requirements.txt, skipping")
+            continue
+        installs.append(install)
+    return installs
+
+
+def _cache_key(args: argparse.Namespace) -> int:
+    installs = installs_for(args.topology, verbose=False)
+    if not installs:
+        print(json.dumps({"key": "", "paths": []}))
+        return 0
+    uv = shutil.which("uv")
+    interpreters = {tool: interpreter(tool, uv) for tool in {i.tool for i in installs}}
+    print(json.dumps({
+        "key": cache_key(installs, interpreters, args.prefix),
+        "paths": [environment(i) for i in installs],
+    }))
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    installs = installs_for(args.topology)
+    if not installs:
+        print("[INFO] No functions codebases to install, skipping...")
+        return 0
+
+    ledger_path = os.environ.get(LEDGER_ENV)
+    if args.cache_hit is not None and args.lookup_start:
+        # actions/cache runs between the key step and this one
+        now = time.time()
+        status = "hit" if args.cache_hit else "miss"
+        restore = now - args.lookup_start
+        print(f"[TIMING] Functions dependencies cache {status}, restore Duration: {restore:.3f}s")
+        record(ledger_path, args.step, args.lookup_start, now, phase="cache restore", cache_hit=args.cache_hit)
+    if args.cache_hit:
+        pending = []
+        for install in installs:
+            if restored(install):
+                print(f"[OK] {_label(install.codebase)}: {ENVIRONMENTS[install.codebase.runtime]} "
+                      f"restored from cache, skipping install")
+            else:
+                print(f"[WARN] {_label(install.codebase)}: cached environment is not usable, reinstalling")
+                pending.append(install)
+        installs = pending
+        if not installs:
+            return 0
+
+    if any(i.tool == "pip" for i in installs) and sys.version_info < MIN_PYTHON:
+        print(f"[ERROR] Python {sys.version.split()[0]} is too old and 'uv' is not available.")
+        print("[ERROR] Please use one of these actions in your workflow before this action:")
+        print("  - astral-sh/setup-uv@v7 with python-version: '3.12' (recommended, faster)")
+        print("  - actions/setup-python@v5 with python-version: '3.12'")
+        return 1
+    if any(i.tool == "pip" for i in installs):
+        print("[INFO] Using pip for installation (consider using astral-sh/setup-uv action for faster builds)")
+
+    for install in installs:
+        print(f"[INFO] {_label(install.codebase)}: {install.tool} install in {install.codebase.dir}")
+    results = run_all(installs, args.jobs)
+
+    for result in results:
+        label = _label(result.install.codebase)
+        print(f"::group::{label} ({result.install.tool} install)")
+        print("\n".join(result.output))
+        print("::endgroup::")
+        status = "[OK]" if result.ok else "[ERROR]"
+        outcome = "dependencies installed" if result.ok else f"install failed (exit code {result.returncode})"
+        print(f"{status} {label}: {outcome}")
+        print(f"[TIMING] {label} {result.install.tool} install Duration: {result.duration:.3f}s")
+        # Anything installed after a cache lookup was not served from the cache
+        cache_hit = None if args.cache_hit is None else False
+        record(ledger_path, args.step, result.start, result.end,
+               phase=f"{label} {result.install.tool} install", cache_hit=cache_hit)
+
+    wall = max(r.end for r in results) - min(r.start for r in results)
+    total = sum(r.duration for r in results)
+    print(f"[TIMING] All codebases: {wall:.3f}s wall clock ({total:.3f}s sequential)")
+    return 0 if all(r.ok for r in results) else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--topology", help="Manifest path (default: $FIREBASE_EMULATOR_TOPOLOGY)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    key = sub.add_parser("cache-key", help="Print the cache key and paths of the built environments as JSON")
+    key.add_argument("--prefix", default="functions-deps", help="Key prefix (runner OS, suffix input)")
+    run_parser = sub.add_parser("run", help="Install the codebases")
+    run_parser.add_argument("--jobs", type=int, help="Maximum concurrent installs (default: one per codebase)")
+    run_parser.add_argument("--cache-hit", choices=["true", "false"],
+                            help="Whether actions/cache restored the environments")
+    run_parser.add_argument("--step", default=STEP, help="Ledger step the installs are recorded under")
+    run_parser.add_argument("--lookup-start", type=float,
+                            help="Unix time the cache lookup started, to record the restore time")
+    args = parser.parse_args(argv)
+
+    if args.command == "cache-key":
+        return _cache_key(args)
+    if args.cache_hit is not None:
+        args.cache_hit = args.cache_hit == "true"
+    return _run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
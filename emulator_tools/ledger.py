@@ -0,0 +1,140 @@
+"""
+JSON-lines timing ledger shared by all steps of the action.
+
+Every step (and sub-phase) appends one record to the file named by
+``FIREBASE_EMULATOR_TIMING_LEDGER``:
+
+    {"step": "Install NSSM", "phase": null, "start": "...", "end": "...",
+     "duration": 0.412, "cache_hit": null, "bytes_downloaded": null}
+
+PowerShell steps write the same shape with ``ConvertTo-Json -Compress``.
+
+Usage:
+    python -m emulator_tools.ledger summary <ledger.jsonl>
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+LEDGER_ENV = "FIREBASE_EMULATOR_TIMING_LEDGER"
+
+
+def _iso(timestamp: float) -> str:
+    stamp = datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds")
+    return stamp.replace("+00:00", "Z")
+
+
+def record(path: Optional[str], step: str, start: float, end: float, phase: Optional[str] = None,
+           cache_hit: Optional[bool] = None, bytes_downloaded: Optional[int] = None, **extra) -> dict:
+    """
+    Append one timing record; ``start``/``end`` are ``time.time()`` values.
+
+    A missing ``path`` (action not running, env var unset) is not an error:
+    the record is returned but not written.
+    """
+    entry = {
+        "step": step,
+        "phase": phase,
+        "start": _iso(start),
+        "end": _iso(end),
+        "duration": round(end - start, 3),
+        "cache_hit": cache_hit,
+        "bytes_downloaded": bytes_downloaded,
+    }
+    entry.update(extra)
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+@contextmanager
+def timed(step: str, phase: Optional[str] = None, path: Optional[str] = None,
+          **fields) -> Iterator[dict]:
+    """
+    Time the body of a ``with`` block and append it to the ledger.
+
+    The yielded dict can be updated inside the block to add fields such as
+    ``cache_hit`` or ``bytes_downloaded`` once they are known.
+    """
+    path = path if path is not None else os.environ.get(LEDGER_ENV)
+    start = time.time()
+    try:
+        yield fields
+    finally:
+        record(path, step, start, time.time(), phase=phase, **fields)
+
+
+def read(path: str) -> List[dict]:
+    """Load all records, skipping lines that are not valid JSON."""
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def grouped(entries: List[dict]) -> List[dict]:
+    """
+    Order records step by step, each step's own record before its phases.
+
+    Phases are appended while a step runs, so they precede the step record
+    in the file.
+    """
+    order: Dict[str, int] = {}
+    for e in entries:
+        order.setdefault(e.get("step") or "", len(order))
+    return sorted(entries, key=lambda e: (order[e.get("step") or ""], e.get("phase") is not None))
+
+
+def format_summary(entries: List[dict]) -> str:
+    """Render the ledger as a fixed-width table, sub-phases indented."""
+    rows = []
+    for e in grouped(entries):
+        name = e.get("step") or "?"
+        if e.get("phase"):
+            name = f"  {e['phase']}"
+        flags = []
+        if e.get("cache_hit") is not None:
+            flags.append("cache hit" if e["cache_hit"] else "cache miss")
+        if e.get("bytes_downloaded"):
+            flags.append(f"{e['bytes_downloaded'] / 1024 / 1024:.2f} MB")
+        rows.append((name, f"{e.get('duration') or 0:.3f}s", ", ".join(flags)))
+    width = max([len(r[0]) for r in rows] + [4])
+    lines = [f"{'Step':<{width}}  {'Duration':>9}  Notes", f"{'-' * width}  {'-' * 9}  -----"]
+    lines += [f"{name:<{width}}  {duration:>9}  {notes}".rstrip() for name, duration, notes in rows]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize the action's timing ledger")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="Print the ledger as a table")
+    summary.add_argument("path")
+    args = parser.parse_args(argv)
+
+    entries = read(args.path)
+    if not entries:
+        print(f"[WARN] No timing records in {args.path}")
+        return 0
+    print(format_summary(entries))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Incremental follower for the emulator log written by NSSM.
+
+NSSM redirects the Firebase CLI's stdout to ``emulator-stdout.log``. The CLI
+prints a definitive "All emulators ready" banner there, so following the file
+gives readiness the moment it happens without any HTTP traffic. The same
+follower spots fatal startup errors (port taken, Java too old, bad rules) in
+stdout and ``emulator-stderr.log`` so a crashed start fails immediately.
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+READY_PATTERN = re.compile(r"All emulators ready")
+
+# "+  firestore: Firestore Emulator UI websocket is running on 9150."
+# "✔  functions[us-central1-hello]: http function initialized (http://...)."
+STARTED_PATTERN = re.compile(
+    r"^[+✔]\s+(?P<name>[a-z]+)(?:\[[^\]]*\])?:\s.*(?:started|running on|initialized|ready)",
+    re.IGNORECASE)
+
+# Lines after which the emulators will never become ready on their own
+FATAL_PATTERNS = [
+    # "Could not start Firestore Emulator, port taken."
+    re.compile(r"could not start .*port taken", re.IGNORECASE),
+    # "Port 8080 is not open on localhost (127.0.0.1), could not start Firestore Emulator."
+    re.compile(r"port \d+ is not open on .*could not start", re.IGNORECASE),
+    re.compile(r"EADDRINUSE|address already in use", re.IGNORECASE),
+    # Java missing or too old
+    re.compile(r"could not spawn `java -version`", re.IGNORECASE),
+    re.compile(r"no longer supports Java|UnsupportedClassVersionError|"
+               r"Unsupported class file major version", re.IGNORECASE),
+    re.compile(r"^Exception in thread \"main\""),
+    # The CLI's final message before exiting, e.g. on an invalid rules file
+    re.compile(r"^Error: "),
+    re.compile(r"An unexpected error has occurred", re.IGNORECASE),
+]
+
+# Lines kept per log so a failure can be reported with its context
+EXCERPT_LINES = 8
+
+
+def strip_ansi(text: str) -> str:
+    """Remove terminal colour codes the CLI writes even when redirected."""
+    return ANSI_ESCAPE.sub("", text)
+
+
+class LogFollower:
+    """
+    Read only the bytes appended to a file since the previous call.
+
+    Partial trailing lines are kept until their newline arrives. If the file
+    shrinks (rotated or recreated), reading restarts from the beginning.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._partial = b""
+
+    def poll(self) -> List[str]:
+        """Return the complete lines appended since the last poll."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            self.offset = 0
+            self._partial = b""
+        if size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        self.offset += len(chunk)
+
+        data = self._partial + chunk
+        *lines, self._partial = data.split(b"\n")
+        return [strip_ansi(line.decode("utf-8", errors="replace")).rstrip("\r") for line in lines]
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+
+class LogWatcher:
+    """Track readiness milestones and fatal errors from emulator log lines."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.start = clock()
+        self.ready = False
+        self.ready_at: Optional[float] = None
+        self.started: Dict[str, float] = {}
+        self.fatal: Optional[str] = None
+        self.excerpt: List[str] = []
+        self._recent: Dict[str, Deque[str]] = {}
+
+    def feed(self, line: str, source: str = "stdout") -> None:
+        line = line.strip()
+        if not line:
+            return
+        recent = self._recent.setdefault(source, deque(maxlen=EXCERPT_LINES))
+        recent.append(line)
+
+        if self.fatal is None and any(p.search(line) for p in FATAL_PATTERNS):
+            self.fatal = f"{source}: {line}"
+            self.excerpt = list(recent)
+            return
+        # The banner is drawn inside a box: "│ ✔  All emulators ready! ... │"
+        if READY_PATTERN.search(line):
+            if not self.ready:
+                self.ready = True
+                self.ready_at = self.clock() - self.start
+            return
+        match = STARTED_PATTERN.match(line)
+        if match:
+            self.started.setdefault(match.group("name").lower(), self.clock() - self.start)
@@ -0,0 +1,206 @@
+"""
+Locate or provision NSSM (the Non-Sucking Service Manager) without paying for
+Chocolatey on every run.
+
+Resolution order, cheapest first:
+
+1. ``nssm`` on PATH
+2. Known install locations (Chocolatey's package and shim directories,
+   Program Files). Hosted runners often have the Chocolatey package
+   installed without its shim on PATH, and ``choco install`` then spends
+   several seconds only to report "already installed".
+3. The copy kept in the action's cache directory (restored by
+   ``actions/cache``), verified against the pinned SHA-256
+4. The pinned NSSM release (``NSSM_URL``), downloaded and verified
+5. ``choco install nssm`` as a last resort
+
+Only the pinned build, NSSM 2.24.101 win64, is ever cached: a binary found
+on PATH or in a known location is copied into the empty cache directory if
+it has the pinned SHA-256, so the next run can use it even on a runner
+image without NSSM. The directory holding ``nssm.exe`` is appended to
+``GITHUB_PATH`` for the following steps.
+
+Usage:
+    python -m emulator_tools.nssm --cache-dir ~/.nssm
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import http.client
+import os
+import shutil
+import subprocess
+import sys
+import time
+import zipfile
+from typing import List, Optional, Tuple
+
+from .download import ChecksumError, download, sha256
+from .ledger import LEDGER_ENV, record
+
+STEP = "Install NSSM"
+
+# The build the action's cache key (nssm-2.24.101) stands for. Both digests
+# are the published ones of NSSM_URL; while either is empty nothing is
+# downloaded or cached and NSSM comes from the runner or Chocolatey.
+NSSM_VERSION = "2.24.101"
+NSSM_URL = "https://nssm.cc/ci/nssm-2.24-101-g897c7ad.zip"
+NSSM_MEMBER = "nssm-2.24-101-g897c7ad/win64/nssm.exe"
+NSSM_ARCHIVE_SHA256 = ""
+NSSM_SHA256 = ""
+
+
+def _choco_dir(environ: Optional[dict] = None) -> str:
+    environ = os.environ if environ is None else environ
+    return environ.get("ChocolateyInstall") or r"C:\ProgramData\chocolatey"
+
+
+def is_shim(path: str, environ: Optional[dict] = None) -> bool:
+    """Chocolatey's bin/ holds launchers that point back into lib/, not NSSM itself."""
+    shims = os.path.normcase(os.path.join(_choco_dir(environ), "bin"))
+    return os.path.normcase(os.path.dirname(os.path.abspath(path))) == shims
+
+
+def known_locations(environ: Optional[dict] = None) -> List[str]:
+    """
+    Places NSSM ends up when installed by Chocolatey or by hand, 64-bit builds
+    first and Chocolatey's shim last.
+    """
+    environ = os.environ if environ is None else environ
+    choco = _choco_dir(environ)
+    program_files = environ.get("ProgramFiles") or r"C:\Program Files"
+    patterns = [
+        os.path.join(choco, "lib", "nssm*", "tools", "**", "win64", "nssm.exe"),
+        os.path.join(choco, "lib", "nssm*", "tools", "**", "nssm.exe"),
+        os.path.join(program_files, "nssm*", "win64", "nssm.exe"),
+        os.path.join(program_files, "nssm*", "nssm.exe"),
+        os.path.join(choco, "bin", "nssm.exe"),
+    ]
+    found = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            if path not in found:
+                found.append(path)
+    return found
+
+
+def pinned() -> bool:
+    return bool(NSSM_SHA256 and NSSM_ARCHIVE_SHA256)
+
+
+def cached(cache_dir: str) -> Optional[str]:
+    """The cached binary if it is the pinned build; anything else is removed."""
+    path = os.path.join(cache_dir, "nssm.exe")
+    if not os.path.exists(path):
+        return None
+    if pinned() and sha256(path) == NSSM_SHA256.lower():
+        return path
+    print(f"[WARN] Cached NSSM at {path} is not NSSM {NSSM_VERSION} win64, discarding it")
+    os.remove(path)
+    return None
+
+
+def store(path: str, cache_dir: str) -> Optional[str]:
+    """Copy ``path`` into the cache directory if it is the pinned build; returns the cached copy."""
+    if not pinned() or sha256(path) != NSSM_SHA256.lower():
+        print(f"[INFO] {path} is not NSSM {NSSM_VERSION} win64, not caching it")
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    target = os.path.join(cache_dir, "nssm.exe")
+    if os.path.abspath(path) != os.path.abspath(target):
+        shutil.copy2(path, target)
+    return target
+
+
+def fetch_pinned(cache_dir: str, timeout: float = 60.0) -> Optional[str]:
+    """Download the pinned release into the cache directory; None if it is unavailable."""
+    if not pinned():
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    archive = os.path.join(cache_dir, "nssm.zip")
+    try:
+        download(NSSM_URL, archive, timeout=timeout, expected_sha256=NSSM_ARCHIVE_SHA256)
+        with zipfile.ZipFile(archive) as zf, zf.open(NSSM_MEMBER) as src, \
+                open(os.path.join(cache_dir, "nssm.exe"), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    except (OSError, http.client.HTTPException, ChecksumError, zipfile.BadZipFile, KeyError) as e:
+        print(f"[WARN] Cannot download NSSM {NSSM_VERSION}: {e}")
+        return None
+    finally:
+        if os.path.exists(archive):
+            os.remove(archive)
+    return cached(cache_dir)
+
+
+def choco_install() -> bool:
+    choco = shutil.which("choco")
+    if not choco:
+        return False
+    proc = subprocess.run([choco, "install", "nssm", "-y", "--no-progress"])
+    return proc.returncode == 0
+
+
+def resolve(cache_dir: str, allow_choco: bool = True) -> Tuple[Optional[str], str]:
+    """Return (path to nssm.exe, where it came from)."""
+    on_path = shutil.which("nssm")
+    if on_path:
+        return on_path, "PATH"
+    locations = known_locations()
+    if locations:
+        return locations[0], "known location"
+    path = cached(cache_dir)
+    if path:
+        return path, "action cache"
+    path = fetch_pinned(cache_dir)
+    if path:
+        return path, "pinned release"
+    if allow_choco and choco_install():
+        path = shutil.which("nssm") or next(iter(known_locations()), None)
+        if path:
+            return path, "chocolatey"
+    return None, "not found"
+
+
+def add_to_path(directory: str) -> None:
+    """Make ``nssm`` resolvable in this process and in the following steps."""
+    os.environ["PATH"] = directory + os.pathsep + os.environ.get("PATH", "")
+    github_path = os.environ.get("GITHUB_PATH")
+    if github_path:
+        with open(github_path, "a", encoding="utf-8") as f:
+            f.write(directory + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cache-dir", required=True, help="Directory saved by actions/cache")
+    parser.add_argument("--no-choco", action="store_true", help="Fail instead of falling back to Chocolatey")
+    parser.add_argument("--step", default=STEP, help="Ledger step the lookup is recorded under")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    path, source = resolve(args.cache_dir, allow_choco=not args.no_choco)
+    end = time.time()
+    if path is None:
+        print("[ERROR] NSSM not found and could not be installed")
+        return 1
+
+    print(f"[OK] NSSM {source}: {path}")
+    print(f"[TIMING] NSSM resolve Duration: {end - start:.3f}s")
+    record(os.environ.get(LEDGER_ENV), args.step, start, end, phase=f"nssm from {source}",
+           cache_hit=source == "action cache")
+
+    if source not in ("action cache", "pinned release") and not os.path.exists(
+            os.path.join(args.cache_dir, "nssm.exe")):
+        # Keep the real binary for runners that have no NSSM at all
+        binary = path if not is_shim(path) else next(
+            (p for p in known_locations() if not is_shim(p)), None)
+        if binary:
+            store(binary, args.cache_dir)
+    if source != "PATH":
+        add_to_path(os.path.dirname(path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
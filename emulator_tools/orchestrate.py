@@ -0,0 +1,164 @@
+"""
+Run the action's independent setup phases concurrently.
+
+Downloading and verifying the Firebase CLI (followed by the emulator
+artifact prefetch), installing the functions dependencies and locating or
+installing NSSM do not depend on each other; run one after the other they
+add up to most of a cold start. Here each phase runs as a background job
+and the step joins on all of them before the service is started, so setup
+takes as long as the slowest phase.
+
+Each phase is a list of commands run in order. Output is buffered per phase
+and printed as one group once the phase finishes. Every phase is recorded
+in the timing ledger as a phase of the "Parallel Setup" step with its own
+start and end, so the overlap shows in the timing report.
+
+Usage:
+    python -m emulator_tools.orchestrate --firebase-bin firebase.exe \
+        --download-url <url> --sha256 <sha256> [--functions-cache-hit true]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .install import run_commands
+from .ledger import LEDGER_ENV, record
+
+STEP = "Parallel Setup"
+
+
+@dataclass
+class Phase:
+    name: str
+    commands: List[List[str]]
+
+
+@dataclass
+class PhaseResult:
+    phase: Phase
+    start: float
+    end: float
+    returncode: int
+    output: List[str] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+def run_phase(phase: Phase) -> PhaseResult:
+    start = time.time()
+    returncode, output = run_commands(phase.commands)
+    return PhaseResult(phase, start, time.time(), returncode, output)
+
+
+def run_phases(phases: List[Phase]) -> List[PhaseResult]:
+    """Start every phase at once and wait for all of them (the join point)."""
+    if not phases:
+        return []
+    with ThreadPoolExecutor(max_workers=len(phases)) as pool:
+        return list(pool.map(run_phase, phases))
+
+
+def plan(firebase_bin: str, download_url: str, functions_args: List[str], nssm_cache_dir: str,
+         sha256: Optional[str] = None, release_index: Optional[str] = None,
+         release_version: Optional[str] = None) -> List[Phase]:
+    """The setup phases still needed on this runner."""
+    python = sys.executable
+    phases = []
+
+    cli = []
+    if not os.path.exists(firebase_bin):
+        download = [python, "-m", "emulator_tools.download", download_url, firebase_bin, "--step", STEP]
+        cli.append(download + (["--sha256", sha256] if sha256 else []))
+        if not sha256 and release_index and release_version:
+            # Resolved without a checksum: pin the one just downloaded
+            cli.append([python, "-m", "emulator_tools.release", "--index", release_index,
+                        "record", release_version, firebase_bin])
+    cli.append([firebase_bin, "--version"])
+    # Emulator downloads need the CLI, so they follow it in the same phase
+    cli.append([python, "-m", "emulator_tools.artifacts", "prefetch", "--firebase-bin", firebase_bin,
+                "--step", STEP])
+    phases.append(Phase("firebase cli", cli))
+
+    install = [python, "-m", "emulator_tools.install", "run", "--step", STEP] + functions_args
+    phases.append(Phase("functions dependencies", [install]))
+
+    if not shutil.which("nssm"):
+        phases.append(Phase("nssm", [[python, "-m", "emulator_tools.nssm", "--cache-dir", nssm_cache_dir,
+                                      "--step", STEP]]))
+    return phases
+
+
+def format_overlap(results: List[PhaseResult]) -> str:
+    """One bar per phase on a shared time axis, to show how the phases overlap."""
+    origin = min(r.start for r in results)
+    wall = max(r.end for r in results) - origin
+    width = max(len(r.phase.name) for r in results)
+    lines = []
+    for r in results:
+        offset = int(round((r.start - origin) / wall * 40)) if wall else 0
+        length = max(1, int(round(r.duration / wall * 40))) if wall else 1
+        bar = " " * offset + "#" * length
+        lines.append(f"{r.phase.name:<{width}}  |{bar:<40}|  +{r.start - origin:.3f}s  {r.duration:.3f}s")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--firebase-bin", required=True, help="Where firebase.exe is (or is downloaded to)")
+    parser.add_argument("--download-url", required=True, help="Resolved by 'release resolve'")
+    parser.add_argument("--sha256", help="Expected checksum of the download")
+    parser.add_argument("--release-index", help="Version index to record an unknown checksum in")
+    parser.add_argument("--release-version", help="Version the download URL was resolved to")
+    parser.add_argument("--nssm-cache-dir", default=os.path.join(os.path.expanduser("~"), ".nssm"),
+                        help="Passed on to 'nssm --cache-dir'")
+    parser.add_argument("--functions-cache-hit", choices=["true", "false"],
+                        help="Passed on to 'install run --cache-hit'")
+    parser.add_argument("--functions-lookup-start", help="Passed on to 'install run --lookup-start'")
+    args = parser.parse_args(argv)
+
+    functions_args = []
+    if args.functions_cache_hit:
+        functions_args += ["--cache-hit", args.functions_cache_hit]
+    if args.functions_lookup_start:
+        functions_args += ["--lookup-start", args.functions_lookup_start]
+
+    phases = plan(args.firebase_bin, args.download_url, functions_args, args.nssm_cache_dir,
+                  sha256=args.sha256, release_index=args.release_index, release_version=args.release_version)
+    print(f"[INFO] Running {len(phases)} setup phases in parallel: {', '.join(p.name for p in phases)}")
+    results = run_phases(phases)
+
+    ledger_path = os.environ.get(LEDGER_ENV)
+    for result in results:
+        print(f"::group::{result.phase.name}")
+        print("\n".join(result.output))
+        print("::endgroup::")
+        status = "[OK]" if result.ok else "[ERROR]"
+        outcome = "done" if result.ok else f"failed (exit code {result.returncode})"
+        print(f"{status} {result.phase.name}: {outcome}")
+        print(f"[TIMING] {result.phase.name} Duration: {result.duration:.3f}s")
+        record(ledger_path, STEP, result.start, result.end, phase=result.phase.name)
+
+    wall = max(r.end for r in results) - min(r.start for r in results)
+    total = sum(r.duration for r in results)
+    print("")
+    print(format_overlap(results))
+    print(f"[TIMING] Parallel setup: {wall:.3f}s wall clock "
+          f"({total:.3f}s sequential, {total - wall:.3f}s saved)")
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
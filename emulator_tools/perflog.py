@@ -0,0 +1,314 @@
+"""
+Timeline reconstruction and run-to-run comparison for GitHub job logs.
+
+The input is the tab-separated format written by ``gh run view --log`` (and
+kept in ``performance-logs*.txt``): ``job<TAB>step<TAB>timestamp line``. Each
+job/step is split into the action's sub-steps (``##[group]Run ...``) and the
+``[TIMING] Label: 1.234s`` markers they print, giving one duration per phase:
+
+    Performance Test - Default Ports > Setup Firebase Emulator (Default Ports)
+    Performance Test - Default Ports > Setup ... > Installing NSSM ... > choco install Duration
+
+The file is read line by line, so log size only affects run time.
+
+Usage:
+    python -m emulator_tools.perflog timeline performance-logs.txt
+    python -m emulator_tools.perflog compare baseline.txt candidate.txt \
+        --phase "* > Setup Firebase Emulator*" --threshold 25 --min-delta 5
+
+Exit codes for ``compare``: 0 no gated phase regressed, 1 at least one did.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Optional
+
+from .logwatch import strip_ansi
+
+SEPARATOR = " > "
+
+TIMESTAMP = re.compile(r"^(?P<date>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(?P<frac>\d+))?Z ?")
+
+# "[TIMING] choco install Duration: 4.618s" / "[TIMING] Download Time: 1.137s (158.96 MB)"
+MARKER_PATTERN = re.compile(r"^\[TIMING\]\s+(?P<label>[^:]+):\s+(?P<seconds>\d+(?:\.\d+)?)s\b")
+
+# Script lines GitHub echoes between "##[group]Run ..." and "##[endgroup]"
+SCRIPT_ECHO = "\x1b[36;1m"
+
+# Boilerplate every timed step starts with; useless as a sub-step name
+PRELUDE = re.compile(r"^(\$stepStart = Get-Date|\. .*timing\.ps1.*|#.*|)$")
+WRITE_HOST = re.compile(r"^Write-Host \"(?P<text>[^\"]*)\"")
+UNINFORMATIVE_TEXT = re.compile(r"^(\[TIMING\].*|=+|\s*)$")
+
+
+@dataclass
+class Marker:
+    label: str
+    seconds: float
+
+
+@dataclass
+class Span:
+    """A job step or an action sub-step, bounded by its first and last log line."""
+    name: str
+    start: datetime
+    end: datetime
+    markers: List[Marker] = field(default_factory=list)
+    substeps: List["Span"] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start).total_seconds()
+
+
+def parse_timestamp(text: str) -> Optional[datetime]:
+    """Parse GitHub's 100ns-precision UTC timestamps (``...41.1665392Z``)."""
+    match = TIMESTAMP.match(text)
+    if not match:
+        return None
+    stamp = datetime.strptime(match.group("date"), "%Y-%m-%dT%H:%M:%S")
+    micros = int((match.group("frac") or "0")[:6].ljust(6, "0"))
+    return stamp.replace(microsecond=micros, tzinfo=timezone.utc)
+
+
+def _unique(name: str, taken: Iterable[str]) -> str:
+    taken = set(taken)
+    if name not in taken:
+        return name
+    n = 2
+    while f"{name} #{n}" in taken:
+        n += 1
+    return f"{name} #{n}"
+
+
+class _StepBuilder:
+    def __init__(self, name: str, at: datetime):
+        self.span = Span(name, at, at)
+        self.current: Optional[Span] = None
+        self.header: Optional[str] = None
+        self.label: Optional[str] = None
+
+    def feed(self, at: datetime, text: str) -> None:
+        self.span.end = at
+        if self.current is not None:
+            self.current.end = at
+
+        if text.startswith("##[group]Run "):
+            self._close()
+            self.header = text[len("##[group]Run "):].strip()
+            self.label = None if PRELUDE.match(self.header) else self.header
+            self.current = Span("", at, at)
+            return
+        if self.header is not None:
+            # Still inside the echoed script: pick a stable, readable name
+            if text.startswith("##[endgroup]"):
+                self._name_current()
+            elif text.startswith(SCRIPT_ECHO) and self.label is None:
+                self._consider(strip_ansi(text).strip())
+            return
+
+        match = MARKER_PATTERN.match(strip_ansi(text).strip())
+        if match:
+            target = self.current or self.span
+            label = _unique(match.group("label").strip(), (m.label for m in target.markers))
+            target.markers.append(Marker(label, float(match.group("seconds"))))
+
+    def _consider(self, line: str) -> None:
+        if PRELUDE.match(line):
+            return
+        write = WRITE_HOST.match(line)
+        if write:
+            if not UNINFORMATIVE_TEXT.match(write.group("text")):
+                self.label = write.group("text").strip()
+            return
+        self.label = line
+
+    def _name_current(self) -> None:
+        name = self.label or self.header or "?"
+        self.current.name = _unique(name, (s.name for s in self.span.substeps))
+        self.span.substeps.append(self.current)
+        self.header = None
+
+    def _close(self) -> None:
+        if self.current is not None and self.header is not None:
+            self._name_current()
+
+    def finish(self) -> Span:
+        self._close()
+        return self.span
+
+
+def parse(lines: Iterable[str]) -> Dict[str, List[Span]]:
+    """Build ``{job: [step spans in order]}`` from job log lines."""
+    jobs: Dict[str, List[Span]] = {}
+    builders: Dict[tuple, _StepBuilder] = {}
+    for raw in lines:
+        parts = raw.rstrip("\r\n").split("\t", 2)
+        if len(parts) != 3:
+            continue
+        job, step, rest = (p.lstrip("\ufeff") for p in parts)
+        at = parse_timestamp(rest)
+        if at is None:
+            continue
+        text = TIMESTAMP.sub("", rest, count=1)
+
+        key = (job, step)
+        builder = builders.get(key)
+        if builder is None:
+            builder = builders[key] = _StepBuilder(step, at)
+            jobs.setdefault(job, []).append(builder.span)
+        builder.feed(at, text)
+
+    for builder in builders.values():
+        builder.finish()
+    return jobs
+
+
+def parse_file(path: str) -> Dict[str, List[Span]]:
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        return parse(f)
+
+
+def phases(timeline: Dict[str, List[Span]]) -> Dict[str, float]:
+    """Flatten a timeline to ``{"job > step > sub-step > marker": seconds}``."""
+    result: Dict[str, float] = {}
+
+    def add(prefix: str, span: Span) -> None:
+        key = prefix + SEPARATOR + span.name
+        result[key] = round(span.duration, 3)
+        for marker in span.markers:
+            result[key + SEPARATOR + marker.label] = marker.seconds
+        for sub in span.substeps:
+            add(key, sub)
+
+    for job, steps in timeline.items():
+        for step in steps:
+            add(job, step)
+    return result
+
+
+@dataclass
+class Change:
+    phase: str
+    baseline: Optional[float]
+    candidate: Optional[float]
+
+    @property
+    def delta(self) -> Optional[float]:
+        if self.baseline is None or self.candidate is None:
+            return None
+        return self.candidate - self.baseline
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.delta is None or not self.baseline:
+            return None
+        return self.delta / self.baseline * 100
+
+    def regressed(self, threshold: float, min_delta: float) -> bool:
+        """Slower by more than ``threshold`` percent and ``min_delta`` seconds."""
+        if self.delta is None or self.delta < min_delta:
+            return False
+        return self.percent is None or self.percent > threshold
+
+
+def compare(baseline: Dict[str, float], candidate: Dict[str, float]) -> List[Change]:
+    """Pair up phases from two runs, in candidate order then baseline-only ones."""
+    names = list(candidate) + [name for name in baseline if name not in candidate]
+    return [Change(name, baseline.get(name), candidate.get(name)) for name in names]
+
+
+def matches(phase: str, pattern: str) -> bool:
+    """
+    Glob-match one level at a time: ``"* > Setup*"`` selects job steps only,
+    never their sub-steps or markers.
+    """
+    names, globs = phase.split(SEPARATOR), pattern.split(SEPARATOR)
+    return len(names) == len(globs) and all(fnmatchcase(n, g) for n, g in zip(names, globs))
+
+
+def select(changes: List[Change], patterns: List[str]) -> List[Change]:
+    if not patterns:
+        return changes
+    return [c for c in changes if any(matches(c.phase, p) for p in patterns)]
+
+
+def _seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}s"
+
+
+def format_timeline(timeline: Dict[str, List[Span]]) -> str:
+    lines = []
+    for job, steps in timeline.items():
+        lines.append(job)
+        for step in steps:
+            lines.append(f"  {step.duration:9.3f}s  {step.name}")
+            for marker in step.markers:
+                lines.append(f"  {marker.seconds:9.3f}s      [TIMING] {marker.label}")
+            for sub in step.substeps:
+                lines.append(f"  {sub.duration:9.3f}s    {sub.name}")
+                for marker in sub.markers:
+                    lines.append(f"  {marker.seconds:9.3f}s      [TIMING] {marker.label}")
+    return "\n".join(lines)
+
+
+def format_changes(changes: List[Change], regressions: Iterable[Change] = ()) -> str:
+    flagged = {c.phase for c in regressions}
+    lines = [f"{'Baseline':>10}  {'Candidate':>10}  {'Delta':>9}  {'%':>7}  Phase"]
+    for c in changes:
+        delta = "-" if c.delta is None else f"{c.delta:+.3f}s"
+        percent = "-" if c.percent is None else f"{c.percent:+.1f}%"
+        flag = "  [REGRESSION]" if c.phase in flagged else ""
+        lines.append(f"{_seconds(c.baseline):>10}  {_seconds(c.candidate):>10}  {delta:>9}  "
+                     f"{percent:>7}  {c.phase}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+    timeline = sub.add_parser("timeline", help="Print the per-job, per-step timeline of a log")
+    timeline.add_argument("log")
+    diff = sub.add_parser("compare", help="Diff two runs and gate on regressions")
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+    diff.add_argument("--phase", action="append", default=[],
+                      help="'job > step[ > sub-step[ > marker]]' glob, one per level, to gate on (repeatable)")
+    diff.add_argument("--threshold", type=float, default=20.0,
+                      help="Allowed slowdown of a gated phase, in percent")
+    diff.add_argument("--min-delta", type=float, default=1.0,
+                      help="Ignore slowdowns smaller than this many seconds (runner noise)")
+    args = parser.parse_args(argv)
+
+    if args.command == "timeline":
+        print(format_timeline(parse_file(args.log)))
+        return 0
+
+    changes = compare(phases(parse_file(args.baseline)), phases(parse_file(args.candidate)))
+    gated = select(changes, args.phase) if args.phase else []
+    regressions = [c for c in gated if c.regressed(args.threshold, args.min_delta)]
+    print(format_changes(changes, regressions))
+    if not args.phase:
+        return 0
+
+    print("")
+    if not gated:
+        print(f"[WARN] No phase matches {', '.join(args.phase)}")
+        return 0
+    if regressions:
+        for c in regressions:
+            growth = "new time" if c.percent is None else f"{c.percent:+.1f}%"
+            print(f"[ERROR] {c.phase}: {_seconds(c.baseline)} -> {_seconds(c.candidate)} "
+                  f"({growth}, limit {args.threshold:g}%)")
+        return 1
+    print(f"[OK] {len(gated)} gated phases within {args.threshold:g}% of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Check every port the emulators will bind before the service starts, and move the taken ones.
+
+The service name is unique per run and job, but the ports come from
+firebase.json: two jobs on one self-hosted runner both start Firestore on
+8080 and the Hub on 4400, and the second one only fails when the readiness
+wait gives up. The preflight tries to bind every port this run needs (each
+started emulator, the Hub, the logging emulator, the UI and Firestore's
+WebSocket port) and any duplicates within the config itself.
+
+Ports that are taken are moved to free ports from one block of
+``--block-size`` ports in ``--range``. The block is picked from the run and
+job IDs, so parallel jobs on one machine start their search in different
+places. The remapped ports are written to a derived config next to
+firebase.json (rules files and functions sources stay relative to the same
+directory), and the manifest is updated: its ``config_path`` points at the
+derived config, and its ports, connection variables and ``remapped``
+reflect the move. The derived config is left in the checkout while the
+emulators run; ``--clean`` removes it once the service is stopped.
+
+Usage:
+    python -m emulator_tools.ports [--topology topology.json] [--check-only]
+    python -m emulator_tools.ports --clean
+
+Exit codes: 0 all ports free or remapped, 1 taken ports that were not (or could not be) moved.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import socket
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .topology import TOPOLOGY_ENV, Topology, load
+
+DERIVED_CONFIG = "firebase.emulator-ports.json"
+
+# Ports an emulator opens besides its main one: emulator -> {firebase.json key: CLI default}
+EXTRA_PORTS = {"firestore": {"websocketPort": 9150}}
+
+DEFAULT_RANGE = (20000, 40000)
+BLOCK_SIZE = 50
+
+
+class PortError(Exception):
+    """No free ports are left for the remap."""
+
+
+@dataclass
+class Port:
+    emulator: str
+    field: str
+    host: str
+    port: int
+
+    @property
+    def key(self) -> str:
+        """``firestore`` for a main port, ``firestore.websocketPort`` for the others."""
+        return self.emulator if self.field == "port" else f"{self.emulator}.{self.field}"
+
+
+def is_free(host: str, port: int) -> bool:
+    """Whether ``port`` can be bound on ``host`` right now."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            # Windows lets a second socket bind a port in use unless asked not to
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+def needed(topology: Topology, config: dict) -> List[Port]:
+    """Every port the emulators started by this run will bind."""
+    section = config.get("emulators") or {}
+    ports = []
+    for name, emulator in topology.emulators.items():
+        if not emulator.selected:
+            continue
+        ports.append(Port(name, "port", emulator.host, emulator.port))
+        entry = section.get(name) if isinstance(section.get(name), dict) else {}
+        for field, default in EXTRA_PORTS.get(name, {}).items():
+            ports.append(Port(name, field, emulator.host, int(entry.get(field) or default)))
+    return ports
+
+
+def conflicts(ports: List[Port], free: Callable[[str, int], bool] = is_free) -> List[Port]:
+    """Ports already in use, and every port after the first that reuses a number."""
+    seen = set()
+    taken = []
+    for port in ports:
+        if port.port in seen or not free(port.host, port.port):
+            taken.append(port)
+        seen.add(port.port)
+    return taken
+
+
+def block_seed(environ: Optional[dict] = None) -> int:
+    environ = os.environ if environ is None else environ
+    identity = f"{environ.get('GITHUB_RUN_ID', '')}-{environ.get('GITHUB_JOB', '')}-{os.getpid()}"
+    return int(hashlib.sha256(identity.encode()).hexdigest()[:8], 16)
+
+
+def find_free(host: str, count: int, exclude: List[int], start: int = DEFAULT_RANGE[0],
+              end: int = DEFAULT_RANGE[1], block: int = BLOCK_SIZE, seed: int = 0,
+              free: Callable[[str, int], bool] = is_free) -> List[int]:
+    """``count`` free ports from the first block, starting at the seeded one, that has enough."""
+    slots = max(1, (end - start) // block)
+    for i in range(slots):
+        base = start + ((seed + i) % slots) * block
+        found = [p for p in range(base, min(base + block, end)) if p not in exclude and free(host, p)]
+        if len(found) >= count:
+            return found[:count]
+    raise PortError(f"no {count} free port(s) in {start}-{end}")
+
+
+def moves_for(taken: List[Port], exclude: List[int], start: int = DEFAULT_RANGE[0],
+              end: int = DEFAULT_RANGE[1], block: int = BLOCK_SIZE, seed: int = 0,
+              free: Callable[[str, int], bool] = is_free) -> Dict[str, int]:
+    """New port for every taken one (key -> port), each checked on the host it binds."""
+    by_host: Dict[str, List[Port]] = {}
+    for port in taken:
+        by_host.setdefault(port.host, []).append(port)
+    exclude = list(exclude)
+    moves = {}
+    for host, group in by_host.items():
+        new = find_free(host, len(group), exclude, start, end, block, seed, free)
+        # 0.0.0.0 and 127.0.0.1 overlap, so no two hosts get the same number
+        exclude.extend(new)
+        moves.update({port.key: number for port, number in zip(group, new)})
+    return moves
+
+
+def clean(manifest: Optional[str]) -> Optional[str]:
+    """Remove the derived config the manifest points at; returns its path if one was removed."""
+    if not (manifest and os.path.exists(manifest)):
+        return None
+    config_path = load(manifest).config_path
+    if os.path.basename(config_path) != DERIVED_CONFIG or not os.path.exists(config_path):
+        return None
+    os.remove(config_path)
+    return config_path
+
+
+def remap(topology: Topology, config: dict, taken: List[Port], moves: Dict[str, int]) -> Tuple[Topology, dict]:
+    """Topology and firebase.json content with the ports in ``moves`` (key -> new port) applied."""
+    topology = copy.deepcopy(topology)
+    config = copy.deepcopy(config)
+    section = config.setdefault("emulators", {})
+    for port in taken:
+        new = moves[port.key]
+        entry = section.setdefault(port.emulator, {})
+        entry[port.field] = new
+        if port.field == "port":
+            topology.emulators[port.emulator].port = new
+        topology.remapped[port.key] = port.port
+    topology.env = topology.connection_env()
+    return topology, config
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--topology",
+                        help="Manifest path, updated in place (default: $FIREBASE_EMULATOR_TOPOLOGY)")
+    parser.add_argument("--check-only", action="store_true", help="Report taken ports instead of moving them")
+    parser.add_argument("--range", default=f"{DEFAULT_RANGE[0]}-{DEFAULT_RANGE[1]}",
+                        help="Ports to remap into (default: %(default)s)")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE, help="Ports per block")
+    parser.add_argument("--clean", action="store_true",
+                        help="Remove the derived config from the checkout (after the service is stopped)")
+    args = parser.parse_args(argv)
+
+    if args.clean:
+        removed = clean(args.topology or os.environ.get(TOPOLOGY_ENV))
+        if removed:
+            print(f"[OK] Removed {removed}")
+        return 0
+
+    manifest = args.topology or os.environ[TOPOLOGY_ENV]
+    topology = load(manifest)
+    config: dict = {}
+    if topology.config_found:
+        with open(topology.config_path, encoding="utf-8-sig") as f:
+            config = json.load(f)
+
+    ports = needed(topology, config)
+    taken = conflicts(ports)
+    if not taken:
+        print(f"[OK] All {len(ports)} emulator port(s) are free")
+        return 0
+    for port in taken:
+        print(f"[WARN] {port.key} port {port.port} is already in use")
+    if args.check_only:
+        print("[ERROR] The emulators cannot start on these ports")
+        return 1
+
+    start, _, end = args.range.partition("-")
+    try:
+        moves = moves_for(taken, [p.port for p in ports], int(start), int(end), args.block_size, block_seed())
+    except PortError as e:
+        print(f"[ERROR] Cannot remap the taken ports: {e}")
+        return 1
+    topology, config = remap(topology, config, taken, moves)
+
+    derived = os.path.join(os.path.dirname(topology.config_path), DERIVED_CONFIG)
+    with open(derived, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    topology.config_path = derived
+    topology.config_found = True
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(topology.to_dict(), f, indent=2)
+
+    for port in taken:
+        print(f"[OK] {port.key}: {port.port} -> {moves[port.key]}")
+    print(f"[INFO] Emulators start with {derived}")
+    # It sits next to firebase.json so rules and functions paths resolve, i.e. in the checkout
+    print("[INFO] Remove it after the run with 'python -m emulator_tools.ports --clean'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
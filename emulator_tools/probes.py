@@ -0,0 +1,135 @@
+"""
+Protocol-level probes for the individual Firebase emulators.
+
+A TCP connect only proves that something is listening. The probes here send a
+real request to each emulator and check that it answers the way that emulator
+does once it is able to serve traffic (e.g. Firestore's root returns "Ok").
+"""
+from __future__ import annotations
+
+import http.client
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# Emulators that do not speak plain HTTP on their main port; a TCP connect is
+# the strongest check we can make for them.
+TCP_ONLY = {"logging"}
+
+DEFAULT_PROJECT = "demo-project"
+
+# name -> (path, expected body prefix or None). Any HTTP response counts as
+# ready when no body is expected; only a 5xx or a broken connection fails.
+# "{project}" is replaced by the project being probed.
+HTTP_CHECKS = {
+    "hub": ("/emulators", "{"),
+    "firestore": ("/", "Ok"),
+    "pubsub": ("/", "Ok"),
+    # The project config is served by the Auth API itself, not just its web server
+    "auth": ("/emulator/v1/projects/{project}/config", "{"),
+    "database": ("/.json", None),
+    "storage": ("/", None),
+    "functions": ("/", None),
+    "hosting": ("/", None),
+    "ui": ("/", None),
+    "eventarc": ("/", None),
+    "tasks": ("/", None),
+}
+
+
+@dataclass
+class Endpoint:
+    """Where an emulator listens."""
+
+    name: str
+    host: str
+    port: int
+
+    @classmethod
+    def from_hub(cls, name: str, info: dict) -> "Endpoint":
+        """Build an endpoint from one entry of the Hub's ``/emulators`` response."""
+        host = info.get("host") or "127.0.0.1"
+        if host in ("0.0.0.0", "::"):
+            host = "127.0.0.1"
+        return cls(name=name, host=host, port=int(info["port"]))
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of probing a single emulator."""
+
+    name: str
+    host: str
+    port: int
+    ok: bool = False
+    connect_ms: Optional[float] = None
+    response_ms: Optional[float] = None
+    status: Optional[int] = None
+    detail: str = ""
+    extra: Dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("extra")
+        data.update(self.extra)
+        return data
+
+
+def probe(endpoint: Endpoint, timeout: float = 2.0, project: str = DEFAULT_PROJECT) -> ProbeResult:
+    """
+    Probe one emulator and report whether it is serving requests.
+
+    ``connect_ms`` is the TCP connect time and ``response_ms`` the time until
+    the response headers arrived, both measured from the start of the probe.
+    """
+    result = ProbeResult(endpoint.name, endpoint.host, endpoint.port)
+    start = time.perf_counter()
+
+    if endpoint.name in TCP_ONLY or endpoint.name not in HTTP_CHECKS:
+        try:
+            with socket.create_connection((endpoint.host, endpoint.port), timeout=timeout):
+                pass
+        except OSError as e:
+            result.detail = f"connect failed: {e}"
+            return result
+        result.connect_ms = (time.perf_counter() - start) * 1000
+        result.ok = True
+        result.detail = "tcp"
+        return result
+
+    path, expected = HTTP_CHECKS[endpoint.name]
+    conn = http.client.HTTPConnection(endpoint.host, endpoint.port, timeout=timeout)
+    try:
+        conn.connect()
+        result.connect_ms = (time.perf_counter() - start) * 1000
+        conn.request("GET", path.replace("{project}", project), headers={"Connection": "close"})
+        response = conn.getresponse()
+        result.response_ms = (time.perf_counter() - start) * 1000
+        result.status = response.status
+        body = response.read(256).decode("utf-8", errors="replace")
+    except (OSError, http.client.HTTPException) as e:
+        result.detail = f"{type(e).__name__}: {e}"
+        return result
+    finally:
+        conn.close()
+
+    if response.status >= 500:
+        result.detail = f"HTTP {response.status}"
+    elif expected is not None and not body.strip().startswith(expected):
+        result.detail = f"unexpected body: {body.strip()[:40]!r}"
+    else:
+        result.ok = True
+        result.detail = f"HTTP {response.status}"
+    return result
+
+
+def probe_all(endpoints: Iterable[Endpoint], timeout: float = 2.0,
+              project: str = DEFAULT_PROJECT) -> List[ProbeResult]:
+    """Probe every endpoint concurrently, preserving the input order."""
+    endpoints = list(endpoints)
+    if not endpoints:
+        return []
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+        return list(pool.map(lambda e: probe(e, timeout, project), endpoints))
@@ -0,0 +1,220 @@
+"""
+pytest fixtures for suites that run against the emulators this action starts.
+
+Install the action's tools into the test environment and the plugin is
+loaded through its ``pytest11`` entry point:
+
+    pip install "${FIREBASE_EMULATOR_TOOLS}[pytest]"
+
+Fixtures:
+
+``emulator_endpoints``
+    Base URL of every emulator, from the connection variables and topology
+    manifest the action exports, falling back to the default ports.
+``emulators_ready``
+    Waits once per session until the Hub reports every started emulator as
+    serving (see ``readiness.py``) instead of sleeping a fixed time.
+``emulator_http``
+    ``emulator_http("functions")`` is a ``requests`` session bound to that
+    emulator's base URL, kept for the whole session so connections are
+    reused.
+``firebase_app``
+    The session-scoped default Admin SDK app, with a credential the
+    emulators accept, so ``auth`` and ``firestore.client()`` need no
+    arguments.
+``clean_emulators``
+    Clears Firestore, Auth, Storage and Database before the test (see
+    ``reset.py``).
+``id_tokens``
+    A session-wide ``TokenCache`` (see ``tokens.py``):
+    ``id_tokens.headers(uid)`` authenticates a call without a round trip
+    to the Auth emulator.
+
+``wait_until`` retries a check with exponential backoff while it returns
+None, for things that become ready after the emulators do (e.g. a Python
+functions runtime).
+
+ini options: ``firebase_project`` (default: ``$GCLOUD_PROJECT`` or
+demo-project) and ``firebase_emulator_timeout`` (seconds, default 120).
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, Optional, Tuple, Type, TypeVar
+
+import pytest
+
+from .readiness import Backoff, ReadinessResult, wait_for_ready
+from .reset import DEFAULT_PROJECT, reset
+from .tokens import TokenCache
+from .topology import DEFAULT_PORTS, ENV_VARS, SUPPORT_EMULATORS, TOPOLOGY_ENV, addresses, load
+
+T = TypeVar("T")
+
+POOL_SIZE = 10
+
+
+def pytest_addoption(parser):
+    parser.addini("firebase_project", "Project ID the emulators run under", default="")
+    parser.addini("firebase_emulator_timeout", "Seconds to wait for the emulators to be ready", default="120")
+
+
+def endpoints(environ: Optional[dict] = None) -> Dict[str, str]:
+    """``http://host:port`` of every emulator."""
+    found = addresses(list(DEFAULT_PORTS), environ)
+    return {name: f"http://{host}:{port}" for name, (host, port) in found.items()}
+
+
+def expected_emulators(environ: Optional[dict] = None) -> Optional[list]:
+    """Emulators the action started, if its manifest is available."""
+    environ = os.environ if environ is None else environ
+    path = environ.get(TOPOLOGY_ENV)
+    if not (path and os.path.exists(path)):
+        return None
+    return [name for name, emulator in load(path).emulators.items()
+            if emulator.selected and name not in SUPPORT_EMULATORS]
+
+
+def wait_until(check: Callable[[], T], timeout: float = 30.0,
+               exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+               backoff: Optional[Backoff] = None) -> T:
+    """
+    Call ``check`` until it returns something other than None without
+    raising one of ``exceptions``; the last error is re-raised after
+    ``timeout`` seconds. Any other result is returned as is, falsy ones
+    included (a ``requests.Response`` for a 500 is falsy), so the caller
+    asserts on it once instead of retrying it until the timeout.
+    """
+    backoff = backoff or Backoff(initial=0.1, maximum=2.0)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = check()
+            if result is not None:
+                return result
+            error: Optional[BaseException] = None
+        except exceptions as e:
+            error = e
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if error is not None:
+                raise error
+            raise TimeoutError(f"condition not met within {timeout:.1f}s")
+        time.sleep(min(backoff.next(), remaining))
+
+
+def pooled_session(base_url: str, pool_size: int = POOL_SIZE):
+    """A ``requests`` session resolving relative URLs against ``base_url``."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    class EmulatorSession(requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            if not url.startswith(("http://", "https://")):
+                url = base_url.rstrip("/") + "/" + url.lstrip("/")
+            return super().request(method, url, *args, **kwargs)
+
+    session = EmulatorSession()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    return session
+
+
+def emulator_credential(project: str):
+    """An Admin SDK credential that never talks to Google; the emulators do not check tokens."""
+    from firebase_admin import credentials
+    from google.auth import credentials as google_credentials
+
+    class GoogleCredential(google_credentials.Credentials):
+        def __init__(self):
+            super().__init__()
+            self.token = "owner"
+            self.expiry = None
+
+        @property
+        def valid(self):
+            return True
+
+        def refresh(self, request):
+            pass
+
+        @property
+        def service_account_email(self):
+            return f"emulator@{project}.iam.gserviceaccount.com"
+
+    class EmulatorCredential(credentials.Base):
+        def __init__(self):
+            self._g_credential = GoogleCredential()
+
+        def get_credential(self):
+            return self._g_credential
+
+    return EmulatorCredential()
+
+
+@pytest.fixture(scope="session")
+def firebase_project(pytestconfig) -> str:
+    return (pytestconfig.getini("firebase_project") or os.environ.get("GCLOUD_PROJECT")
+            or os.environ.get("GOOGLE_CLOUD_PROJECT") or DEFAULT_PROJECT)
+
+
+@pytest.fixture(scope="session")
+def emulator_endpoints() -> Dict[str, str]:
+    return endpoints()
+
+
+@pytest.fixture(scope="session")
+def emulators_ready(pytestconfig) -> ReadinessResult:
+    host, port = addresses(["hub"])["hub"]
+    timeout = float(pytestconfig.getini("firebase_emulator_timeout"))
+    result = wait_for_ready(host, port, timeout=timeout, expected=expected_emulators())
+    if not result.ready:
+        pytest.fail(f"Emulators not ready after {result.elapsed:.1f}s: {result.reason}", pytrace=False)
+    return result
+
+
+@pytest.fixture(scope="session")
+def emulator_http(emulators_ready, emulator_endpoints):
+    pytest.importorskip("requests")
+    sessions = {}
+
+    def session(name: str):
+        if name not in sessions:
+            sessions[name] = pooled_session(emulator_endpoints[name])
+        return sessions[name]
+
+    yield session
+    for s in sessions.values():
+        s.close()
+
+
+@pytest.fixture(scope="session")
+def firebase_app(emulators_ready, firebase_project):
+    firebase_admin = pytest.importorskip("firebase_admin")
+    # The Admin SDK reads these when a client is first created
+    found = addresses(sorted(set(ENV_VARS.values())))
+    for variable, name in ENV_VARS.items():
+        os.environ.setdefault(variable, "{}:{}".format(*found[name]))
+    os.environ.setdefault("GCLOUD_PROJECT", firebase_project)
+    try:
+        # A suite (or functions code imported by it) may have set one up already
+        app, owned = firebase_admin.get_app(), False
+    except ValueError:
+        app, owned = firebase_admin.initialize_app(emulator_credential(firebase_project),
+                                                   {"projectId": firebase_project}), True
+    yield app
+    if owned:
+        firebase_admin.delete_app(app)
+
+
+@pytest.fixture
+def clean_emulators(emulators_ready, firebase_project):
+    failed = [f"{r.name}: {r.detail}" for r in reset(firebase_project) if not r.ok]
+    if failed:
+        pytest.fail(f"Could not reset emulators ({'; '.join(failed)})", pytrace=False)
+
+
+@pytest.fixture(scope="session")
+def id_tokens(firebase_project) -> TokenCache:
+    return TokenCache(firebase_project)
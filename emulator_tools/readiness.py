@@ -0,0 +1,265 @@
+"""
+Wait until the Firebase emulators are ready to serve requests.
+
+When the emulator log is available, readiness is event driven: the log is
+followed incrementally and the wait resolves as soon as the CLI prints its
+"All emulators ready" banner (see ``logwatch.py``).
+
+The Emulator Hub is the fallback, used when there is no log or the banner has
+not appeared after ``--fallback-after`` seconds. It is polled with a
+sub-second exponential backoff and every emulator it reports is probed
+concurrently with a protocol-level check (see ``probes.py``).
+
+While waiting, the stdout/stderr logs are scanned for fatal startup errors and
+the Windows service state is watched, so a crashed start is reported within a
+second instead of after the full timeout.
+
+Usage:
+    python -m emulator_tools.readiness --hub-port 4400 --timeout 120 \
+        --expect auth,firestore --log emulator-stdout.log \
+        --stderr-log emulator-stderr.log --service FirebaseEmulator
+
+Exit codes: 0 ready, 1 timed out, 2 the emulators crashed during startup.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .ledger import timed
+from .logwatch import LogFollower, LogWatcher
+from .probes import Endpoint, ProbeResult, probe_all
+from .service import DEAD_STATES, query_state
+
+# Entries the Hub reports that are never named in --only / firebase.json
+HUB_INTERNAL = {"hub", "logging"}
+
+# How often the log file is checked for new bytes (a stat call, no HTTP)
+LOG_POLL_INTERVAL = 0.05
+
+# How often the service state is queried while waiting
+SERVICE_POLL_INTERVAL = 0.5
+
+EXIT_READY, EXIT_TIMEOUT, EXIT_CRASHED = 0, 1, 2
+
+
+@dataclass
+class Backoff:
+    """Exponential backoff capped at ``maximum`` seconds."""
+
+    initial: float = 0.1
+    maximum: float = 1.0
+    factor: float = 1.6
+    current: float = field(init=False)
+
+    def __post_init__(self):
+        self.current = self.initial
+
+    def next(self) -> float:
+        delay = self.current
+        self.current = min(self.maximum, self.current * self.factor)
+        return delay
+
+
+@dataclass
+class ReadinessResult:
+    """Outcome of a readiness wait."""
+
+    ready: bool
+    elapsed: float
+    attempts: int
+    probes: List[ProbeResult] = field(default_factory=list)
+    reason: str = ""
+    source: str = "hub"
+    started: Dict[str, float] = field(default_factory=dict)
+    crashed: bool = False
+    excerpt: List[str] = field(default_factory=list)
+
+
+def fetch_hub(host: str, port: int, timeout: float = 1.0) -> Optional[Dict[str, dict]]:
+    """Return the Hub's ``/emulators`` map, or None if the Hub is not up yet."""
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/emulators", timeout=timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except (OSError, ValueError, urllib.error.URLError):
+        return None
+
+
+def parse_expected(value: str) -> List[str]:
+    """Split a comma-separated emulator list as accepted by ``--only``."""
+    # "functions:codebase" style filters still name the functions emulator
+    return [name.split(":")[0].strip() for name in value.split(",") if name.strip()]
+
+
+def check_hub(hub_host: str, hub_port: int, expected: List[str],
+              probe_timeout: float) -> Tuple[bool, List[ProbeResult], str]:
+    """Ask the Hub which emulators are up and probe them all concurrently."""
+    hub = fetch_hub(hub_host, hub_port, timeout=min(1.0, probe_timeout))
+    if hub is None:
+        return False, [], "hub not responding"
+    missing = [name for name in expected if name not in hub]
+    endpoints = [Endpoint.from_hub(name, info) for name, info in hub.items()
+                 if isinstance(info, dict) and info.get("port")]
+    probes = probe_all(endpoints, timeout=probe_timeout)
+    pending = [r.name for r in probes if not r.ok]
+    reason = "; ".join(filter(None, [
+        f"not registered: {', '.join(missing)}" if missing else "",
+        f"not serving: {', '.join(pending)}" if pending else "",
+    ]))
+    return not missing and not pending, probes, reason
+
+
+def wait_for_ready(hub_host: str = "127.0.0.1",
+                   hub_port: int = 4400,
+                   timeout: float = 120.0,
+                   expected: Optional[List[str]] = None,
+                   backoff: Optional[Backoff] = None,
+                   probe_timeout: float = 2.0,
+                   log_path: Optional[str] = None,
+                   fallback_after: float = 30.0,
+                   stderr_path: Optional[str] = None,
+                   service_name: Optional[str] = None,
+                   state_query: Callable[[str], Optional[str]] = query_state,
+                   on_attempt: Optional[Callable[[int, float, str], None]] = None,
+                   clock: Callable[[], float] = time.monotonic,
+                   sleep: Callable[[float], None] = time.sleep) -> ReadinessResult:
+    """
+    Wait until every emulator is serving, or ``timeout`` seconds pass.
+
+    ``expected`` lists emulators that must be reported by the Hub before a
+    Hub-based wait can succeed; the Hub answers before all emulators have
+    registered. With ``log_path`` the Hub is only consulted once the log is
+    missing or ``fallback_after`` seconds have passed without the banner.
+
+    The wait ends early with ``crashed=True`` when a fatal error shows up in
+    either log or ``service_name`` is no longer running.
+    """
+    backoff = backoff or Backoff()
+    expected = [name for name in (expected or []) if name not in HUB_INTERNAL]
+    follower = LogFollower(log_path) if log_path else None
+    followers = {"stdout": follower, "stderr": LogFollower(stderr_path) if stderr_path else None}
+    watcher = LogWatcher(clock)
+    start = clock()
+    next_hub_poll = start
+    next_service_poll = start
+    attempts = 0
+    last: List[ProbeResult] = []
+    reason = "waiting for emulator log" if follower else "hub not responding"
+
+    def crashed(why: str) -> ReadinessResult:
+        return ReadinessResult(False, clock() - start, attempts, last, why,
+                               started=watcher.started, crashed=True, excerpt=watcher.excerpt)
+
+    while True:
+        for source, log in followers.items():
+            if log:
+                for line in log.poll():
+                    watcher.feed(line, source)
+        if watcher.fatal:
+            return crashed(f"fatal error in emulator log ({watcher.fatal})")
+        if watcher.ready:
+            return ReadinessResult(True, clock() - start, attempts, last,
+                                   source="log", started=watcher.started)
+
+        now = clock()
+        if service_name and now >= next_service_poll:
+            state = state_query(service_name)
+            if state in DEAD_STATES or state == "NOT_FOUND":
+                return crashed(f"service {service_name} is {state}")
+            next_service_poll = now + SERVICE_POLL_INTERVAL
+
+        elapsed = now - start
+        use_hub = follower is None or elapsed >= fallback_after or not follower.exists()
+        if use_hub and now >= next_hub_poll:
+            attempts += 1
+            ready, last, reason = check_hub(hub_host, hub_port, expected, probe_timeout)
+            if ready:
+                return ReadinessResult(True, clock() - start, attempts, last,
+                                       source="hub", started=watcher.started)
+            next_hub_poll = clock() + backoff.next()
+
+        elapsed = clock() - start
+        if on_attempt:
+            on_attempt(attempts, elapsed, reason)
+        if elapsed >= timeout:
+            return ReadinessResult(False, elapsed, attempts, last, reason, started=watcher.started)
+
+        if follower:
+            delay = LOG_POLL_INTERVAL
+        else:
+            wake = min(next_hub_poll, next_service_poll) if service_name else next_hub_poll
+            delay = max(0.0, wake - clock())
+        sleep(min(delay, max(0.0, timeout - elapsed)))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hub-host", default="127.0.0.1")
+    parser.add_argument("--hub-port", type=int, default=4400)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--expect", default="", help="Comma-separated emulators that must be up")
+    parser.add_argument("--max-interval", type=float, default=1.0,
+                        help="Upper bound for the backoff between Hub polls (seconds)")
+    parser.add_argument("--log", default="", help="Emulator stdout log to follow")
+    parser.add_argument("--fallback-after", type=float, default=30.0,
+                        help="Seconds without the ready banner before polling the Hub")
+    parser.add_argument("--stderr-log", default="", help="Emulator stderr log to scan for fatal errors")
+    parser.add_argument("--service", default="", help="Windows service running the emulators")
+    args = parser.parse_args(argv)
+
+    if args.log:
+        print(f"Following {args.log} for the ready banner "
+              f"(Hub fallback at {args.hub_host}:{args.hub_port} after {args.fallback_after:g}s, "
+              f"max wait: {args.timeout:g} seconds)...")
+    else:
+        print(f"Polling Hub at {args.hub_host}:{args.hub_port} (max wait: {args.timeout:g} seconds)...")
+    last_report = [0.0]
+
+    def report(attempt: int, elapsed: float, reason: str):
+        # Keep the log readable: one progress line every ~3 seconds
+        if elapsed - last_report[0] >= 3:
+            last_report[0] = elapsed
+            print(f"  Waiting... ({elapsed:.1f}s elapsed, {attempt} Hub polls: {reason})", flush=True)
+
+    with timed("Wait for Emulators to be Ready", phase="readiness") as fields:
+        result = wait_for_ready(args.hub_host, args.hub_port, args.timeout,
+                                expected=parse_expected(args.expect),
+                                backoff=Backoff(maximum=args.max_interval),
+                                log_path=args.log or None,
+                                fallback_after=args.fallback_after,
+                                stderr_path=args.stderr_log or None,
+                                service_name=args.service or None,
+                                on_attempt=report)
+        fields.update(ready=result.ready, source=result.source, crashed=result.crashed)
+
+    for name, at in sorted(result.started.items(), key=lambda item: item[1]):
+        print(f"  [LOG] {name} started (+{at:.3f}s)")
+    for r in result.probes:
+        status = "[OK]" if r.ok else "[WAIT]"
+        print(f"  {status} {r.name} {r.host}:{r.port} ({r.detail})")
+
+    if result.ready:
+        print(f"[SUCCESS] All emulators are ready! (detected via {result.source})")
+        print(f"[TIMING] Emulators became ready in {result.elapsed:.3f}s ({result.attempts} Hub polls)")
+        return EXIT_READY
+
+    if result.crashed:
+        print(f"[ERROR] Emulators failed to start after {result.elapsed:.3f}s: {result.reason}")
+        if result.excerpt:
+            print("Log excerpt:")
+            for line in result.excerpt:
+                print(f"  | {line}")
+        return EXIT_CRASHED
+
+    print(f"[WARN] Reached timeout ({args.timeout:g} s) before all emulators reported ready: {result.reason}")
+    return EXIT_TIMEOUT
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Resolve the ``firebase-tools-version`` input to a concrete CLI release.
+
+The standalone Windows binary of every release is published on GitHub as
+``firebase-tools-win.exe``. Resolving the input to a version, download URL
+and SHA-256 lets the action cache the binary under that version and check
+the cached file against the checksum, so a cache hit is never a stale
+"latest" and a pinned version is actually installed.
+
+Resolutions are kept in a small JSON index (restored by ``actions/cache``):
+
+    {"releases": {"14.1.0": {"url": "...", "sha256": "..."}},
+     "latest": {"version": "14.1.0", "resolved_at": 1764000000.0}}
+
+Pinned versions never change, so they are resolved over the network once.
+"latest" is re-resolved when the index entry is older than ``--max-age``;
+if GitHub cannot be reached the last known release is used instead.
+
+Usage:
+    python -m emulator_tools.release --index index.json resolve latest
+    python -m emulator_tools.release --index index.json verify 14.1.0 firebase.exe
+    python -m emulator_tools.release --index index.json record 14.1.0 firebase.exe
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional
+
+from .download import sha256
+
+REPOSITORY = "firebase/firebase-tools"
+ASSET = "firebase-tools-win.exe"
+API_URL = f"https://api.github.com/repos/{REPOSITORY}/releases"
+DOWNLOAD_URL = f"https://github.com/{REPOSITORY}/releases/download/v{{version}}/{ASSET}"
+LATEST_PAGE = f"https://github.com/{REPOSITORY}/releases/latest"
+
+# How long a resolved "latest" is trusted before asking GitHub again
+DEFAULT_MAX_AGE = 6 * 3600
+
+VERSION_PATTERN = re.compile(r"^v?(?P<version>\d+\.\d+\.\d+(?:[-.][0-9A-Za-z.]+)?)$")
+
+
+class ResolveError(Exception):
+    """The requested version could not be resolved."""
+
+
+@dataclass
+class Release:
+    version: str
+    url: str
+    sha256: Optional[str]
+    source: str
+
+
+def normalize(version: str) -> str:
+    """'v14.1.0' and '14.1.0' are the same release; '' means latest."""
+    version = (version or "latest").strip()
+    if version == "latest":
+        return version
+    match = VERSION_PATTERN.match(version)
+    if not match:
+        raise ResolveError(f"'{version}' is not a firebase-tools version (expected e.g. 14.1.0 or latest)")
+    return match.group("version")
+
+
+def load_index(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {"releases": {}}
+    index.setdefault("releases", {})
+    return index
+
+
+def save_index(path: str, index: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + ".partial"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(partial, path)
+
+
+def _get_json(url: str, token: Optional[str], timeout: float) -> dict:
+    headers = {"Accept": "application/vnd.github+json", "User-Agent": "setup-firebase-emulator-win"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+        return json.load(response)
+
+
+def fetch_release(tag: str, token: Optional[str] = None, timeout: float = 10.0) -> dict:
+    """GitHub release metadata for ``latest`` or a ``v``-prefixed tag."""
+    url = f"{API_URL}/latest" if tag == "latest" else f"{API_URL}/tags/{tag}"
+    return _get_json(url, token, timeout)
+
+
+def release_from_metadata(metadata: dict) -> Release:
+    version = normalize(metadata.get("tag_name", ""))
+    for asset in metadata.get("assets", []):
+        if asset.get("name") == ASSET:
+            digest = asset.get("digest") or ""
+            checksum = digest.split(":", 1)[1] if digest.startswith("sha256:") else None
+            return Release(version, asset["browser_download_url"], checksum, "github")
+    raise ResolveError(f"Release {version} has no {ASSET} asset")
+
+
+def latest_from_redirect(timeout: float = 10.0) -> str:
+    """Fallback without the API (rate limits): /releases/latest redirects to the tag."""
+    request = urllib.request.Request(LATEST_PAGE, method="HEAD",
+                                     headers={"User-Agent": "setup-firebase-emulator-win"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return normalize(response.geturl().rstrip("/").rsplit("/", 1)[-1])
+
+
+def resolve(requested: str, index: dict, token: Optional[str] = None, max_age: float = DEFAULT_MAX_AGE,
+            fetch: Callable[..., dict] = fetch_release, now: Optional[float] = None) -> Release:
+    """
+    Resolve ``requested`` using the index first. Updates ``index`` in place
+    with anything learned from GitHub.
+    """
+    now = time.time() if now is None else now
+    requested = normalize(requested)
+    releases = index.setdefault("releases", {})
+
+    version = requested
+    if requested == "latest":
+        latest = index.get("latest") or {}
+        if latest.get("version") and now - float(latest.get("resolved_at", 0)) < max_age:
+            version = latest["version"]
+    if version != "latest" and version in releases and releases[version].get("sha256"):
+        entry = releases[version]
+        return Release(version, entry["url"], entry["sha256"], "index")
+
+    try:
+        release = release_from_metadata(fetch("latest" if version == "latest" else f"v{version}", token))
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            # The API answered: this release does not exist, so there is nothing to download
+            raise ResolveError(f"firebase-tools {version} not found on GitHub") from e
+        release = _offline(requested, version, index, e)
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        release = _offline(requested, version, index, e)
+    releases[release.version] = {"url": release.url, "sha256": release.sha256}
+    if requested == "latest":
+        index["latest"] = {"version": release.version, "resolved_at": now}
+    return release
+
+
+def _offline(requested: str, version: str, index: dict, error: Exception) -> Release:
+    """Best effort when the API cannot be used; the checksum is recorded after download."""
+    if requested == "latest":
+        known = (index.get("latest") or {}).get("version")
+        if known and known in index["releases"]:
+            entry = index["releases"][known]
+            # stdout carries the JSON the action parses
+            print(f"[WARN] Could not resolve latest firebase-tools ({error}); using last known {known}",
+                  file=sys.stderr)
+            return Release(known, entry["url"], entry.get("sha256"), "index (expired)")
+        try:
+            version = latest_from_redirect()
+        except (urllib.error.URLError, OSError, ResolveError) as e:
+            raise ResolveError(f"Could not resolve latest firebase-tools: {e}") from e
+    print(f"[WARN] GitHub API unavailable ({error}); checksum of {version} will be recorded after download",
+          file=sys.stderr)
+    return Release(version, DOWNLOAD_URL.format(version=version), None, "download url")
+
+
+def verify(index: dict, version: str, path: str) -> Optional[bool]:
+    """True/False if the file matches/does not match the indexed checksum, None if unknown."""
+    expected = (index.get("releases", {}).get(normalize(version)) or {}).get("sha256")
+    if not expected or not os.path.exists(path):
+        return None
+    return sha256(path) == expected.lower()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--index", required=True, help="Version index file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    resolve_parser = sub.add_parser("resolve", help="Print version, url and sha256 as JSON")
+    resolve_parser.add_argument("version", nargs="?", default="latest")
+    resolve_parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE,
+                                help="Seconds a resolved 'latest' stays valid")
+    verify_parser = sub.add_parser("verify", help="Check a binary against the indexed checksum")
+    verify_parser.add_argument("version")
+    verify_parser.add_argument("path")
+    record_parser = sub.add_parser("record", help="Record the checksum of a downloaded binary")
+    record_parser.add_argument("version")
+    record_parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    index = load_index(args.index)
+    if args.command == "resolve":
+        token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+        try:
+            release = resolve(args.version, index, token=token, max_age=args.max_age)
+        except ResolveError as e:
+            print(json.dumps({"error": str(e)}))
+            return 1
+        save_index(args.index, index)
+        print(json.dumps(asdict(release)))
+        return 0
+
+    if args.command == "verify":
+        result = verify(index, args.version, args.path)
+        if result is False:
+            # Never use a binary that is not the one the version resolved to;
+            # the download step sees it missing and fetches it again
+            os.remove(args.path)
+            print(f"[WARN] Cached firebase.exe does not match the checksum of {args.version}, removed it")
+            return 0
+        print("[OK] Cached firebase.exe matches its checksum" if result else
+              f"[INFO] No checksum known for {args.version}")
+        return 0
+
+    version = normalize(args.version)
+    entry = index["releases"].setdefault(version, {"url": DOWNLOAD_URL.format(version=version)})
+    if not entry.get("sha256"):
+        entry["sha256"] = sha256(args.path)
+        save_index(args.index, index)
+        print(f"[INFO] Recorded checksum of firebase-tools {version}: {entry['sha256']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
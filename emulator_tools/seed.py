@@ -0,0 +1,327 @@
+"""
+Load Firestore fixtures into the emulator with batched commits.
+
+Creating documents one ``set()`` at a time costs a round trip per document;
+with tens of thousands of documents per suite that dominates test time.
+Here documents are grouped into commits of up to ``--batch-size`` writes
+(500 is Firestore's limit) and several commits are in flight at once over
+keep-alive connections. Writes carry the emulator's ``owner`` credential,
+so security rules do not apply.
+
+Fixture formats:
+
+NDJSON (``.ndjson``/``.jsonl``), one document per line; read line by line,
+so only the batches in flight are ever in memory:
+
+    {"path": "accounts/acc-1", "data": {"tickets": 100}}
+
+JSON (``.json``) or YAML (``.yaml``/``.yml``, needs PyYAML), either a list
+of such objects or a map of collection path -> document id -> data:
+
+    {"accounts": {"acc-1": {"tickets": 100}},
+     "accounts/acc-1/tickets": {"t-1": {"used": false}}}
+
+Values map to Firestore types by their JSON type; ``{"__timestamp__":
+"2024-05-01T10:00:00Z"}``, ``{"__ref__": "accounts/acc-1"}``,
+``{"__geo__": [52.5, 13.4]}`` and ``{"__bytes__": "<base64>"}`` give the
+other types. A reference path is relative to the seeded project's
+database; YAML dates and datetimes without a zone are taken as UTC.
+
+Usage:
+    python -m emulator_tools.seed fixtures/accounts.ndjson [--project demo-project]
+
+From Python:
+    from emulator_tools.seed import seed
+    result = seed("fixtures/accounts.ndjson")
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .ledger import LEDGER_ENV, record
+
+STEP = "Seed Firestore"
+BATCH_SIZE = 500
+CONCURRENCY = 4
+DEFAULT_HOST = "127.0.0.1:8080"
+DEFAULT_PROJECT = "demo-project"
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+YAML_SUFFIXES = (".yaml", ".yml")
+
+Document = Tuple[str, dict]
+
+
+class SeedError(Exception):
+    """A fixture could not be read or a commit was rejected."""
+
+
+@dataclass
+class SeedResult:
+    documents: int
+    batches: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        """Documents per second."""
+        return self.documents / self.seconds if self.seconds > 0 else 0.0
+
+
+def emulator_host(environ: Optional[dict] = None) -> str:
+    """``FIRESTORE_EMULATOR_HOST`` as exported by the action, else the default port."""
+    environ = os.environ if environ is None else environ
+    return environ.get("FIRESTORE_EMULATOR_HOST") or DEFAULT_HOST
+
+
+def project_id(environ: Optional[dict] = None) -> str:
+    environ = os.environ if environ is None else environ
+    return environ.get("GCLOUD_PROJECT") or environ.get("GOOGLE_CLOUD_PROJECT") or DEFAULT_PROJECT
+
+
+def _timestamp(value: date) -> str:
+    """RFC 3339 in UTC, as ``timestampValue`` requires; naive values are taken as UTC."""
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + "Z"
+
+
+def encode(value: object, database: Optional[str] = None) -> dict:
+    """
+    A Python/JSON value as a Firestore REST ``Value``. Relative ``__ref__``
+    paths are expanded against ``database`` (``projects/{p}/databases/(default)``,
+    default: the project from the environment).
+    """
+    if value is None:
+        return {"nullValue": None}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"integerValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [encode(v, database) for v in value]}}
+    if isinstance(value, dict):
+        if len(value) == 1:
+            (key, inner), = value.items()
+            if key == "__timestamp__":
+                return {"timestampValue": inner}
+            if key == "__ref__":
+                if not inner.startswith("projects/"):
+                    database = database or f"projects/{project_id()}/databases/(default)"
+                    inner = f"{database}/documents/{inner.strip('/')}"
+                return {"referenceValue": inner}
+            if key == "__geo__":
+                return {"geoPointValue": {"latitude": inner[0], "longitude": inner[1]}}
+            if key == "__bytes__":
+                return {"bytesValue": inner}
+        return {"mapValue": {"fields": {k: encode(v, database) for k, v in value.items()}}}
+    # datetime and date, as loaded from YAML
+    if isinstance(value, date):
+        return {"timestampValue": _timestamp(value)}
+    raise SeedError(f"Cannot store {type(value).__name__} in Firestore: {value!r}")
+
+
+def _entry(entry: dict, where: str) -> Document:
+    if not isinstance(entry, dict) or "path" not in entry:
+        raise SeedError(f"{where}: expected an object with 'path' and 'data'")
+    path = entry["path"].strip("/")
+    if path.count("/") % 2 != 1:
+        raise SeedError(f"{where}: '{path}' is not a document path (collection/id[/collection/id...])")
+    return path, entry.get("data") or {}
+
+
+def _collections(tree: object, where: str) -> Iterator[Document]:
+    if not isinstance(tree, dict):
+        raise SeedError(f"{where}: expected a list of documents or a map of collections")
+    for collection, documents in tree.items():
+        if not isinstance(documents, dict):
+            raise SeedError(f"{where}: collection '{collection}' must map document ids to data")
+        for doc_id, data in documents.items():
+            yield _entry({"path": f"{collection.strip('/')}/{doc_id}", "data": data}, where)
+
+
+def read_entries(path: str) -> Iterator[Tuple[str, object]]:
+    """
+    ``(location, entry)`` for every line of an NDJSON file or every item of
+    a JSON/YAML list; any other JSON/YAML document is yielded whole.
+    """
+    lower = path.lower()
+    if lower.endswith(NDJSON_SUFFIXES):
+        with open(path, encoding="utf-8-sig") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield f"{path}:{number}", json.loads(line)
+                except ValueError as e:
+                    raise SeedError(f"{path}:{number}: {e}") from e
+        return
+    with open(path, encoding="utf-8-sig") as f:
+        if lower.endswith(YAML_SUFFIXES):
+            try:
+                import yaml
+            except ImportError as e:
+                raise SeedError("YAML fixtures need PyYAML (pip install pyyaml); use JSON or NDJSON") from e
+            tree = yaml.safe_load(f)
+        else:
+            try:
+                tree = json.load(f)
+            except ValueError as e:
+                raise SeedError(f"{path}: {e}") from e
+    if isinstance(tree, list):
+        for i, entry in enumerate(tree):
+            yield f"{path}[{i}]", entry
+    else:
+        yield path, tree
+
+
+def read_fixture(path: str) -> Iterator[Document]:
+    """Yield ``(document path, data)`` pairs from a fixture file."""
+    for where, entry in read_entries(path):
+        if where == path:
+            yield from _collections(entry, path)
+        else:
+            yield _entry(entry, where)
+
+
+def batches(items: Iterable, size: int = BATCH_SIZE) -> Iterator[list]:
+    batch: list = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_batches(items: Iterable[list], send: Callable[[list], int], concurrency: int) -> Tuple[int, int]:
+    """
+    Call ``send`` for every batch with at most ``concurrency`` calls in
+    flight; ``items`` is consumed only as fast as the calls complete.
+    Returns (sum of what ``send`` returned, number of batches).
+    """
+    total = count = 0
+    pending: Set[Future] = set()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        try:
+            for batch in items:
+                if len(pending) >= concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    total += sum(f.result() for f in done)
+                pending.add(pool.submit(send, batch))
+                count += 1
+            total += sum(f.result() for f in pending)
+        finally:
+            for future in pending:
+                future.cancel()
+    return total, count
+
+
+class KeepAliveClient:
+    """JSON POSTs to an emulator over one keep-alive connection per worker thread."""
+
+    def __init__(self, host: str, timeout: float = 30.0):
+        self.host = host
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, timeout=self.timeout)
+        return connection
+
+    def _send(self, url: str, body: bytes, headers: dict) -> Tuple[int, bytes]:
+        connection = self._connection()
+        try:
+            connection.request("POST", url, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            raise
+
+    def post(self, url: str, payload: dict) -> Tuple[int, bytes]:
+        """Returns (status, body); ``owner`` is the emulators' admin credential."""
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Authorization": "Bearer owner"}
+        try:
+            return self._send(url, body, headers)
+        except (http.client.HTTPException, OSError):
+            # The emulator closed the idle connection; reconnect once
+            return self._send(url, body, headers)
+
+
+def seed(fixture: str, host: Optional[str] = None, project: Optional[str] = None,
+         batch_size: int = BATCH_SIZE, concurrency: int = CONCURRENCY, timeout: float = 30.0) -> SeedResult:
+    """
+    Load ``fixture`` into the Firestore emulator. At most ``concurrency``
+    commits are in flight, and the fixture is read only as fast as they
+    complete.
+    """
+    if not 1 <= batch_size <= BATCH_SIZE:
+        raise SeedError(f"batch size must be between 1 and {BATCH_SIZE}")
+    client = KeepAliveClient(host or emulator_host(), timeout)
+    database = f"projects/{project or project_id()}/databases/(default)"
+
+    def commit(batch: List[Document]) -> int:
+        writes = [{"update": {"name": f"{database}/documents/{path}",
+                              "fields": {k: encode(v, database) for k, v in data.items()}}}
+                  for path, data in batch]
+        status, payload = client.post(f"/v1/{database}/documents:commit", {"writes": writes})
+        if status != 200:
+            raise SeedError(f"Commit of {len(batch)} documents failed: HTTP {status} "
+                            f"{payload[:300].decode('utf-8', 'replace')}")
+        return len(batch)
+
+    start = time.perf_counter()
+    documents, count = run_batches(batches(read_fixture(fixture), batch_size), commit, concurrency)
+    return SeedResult(documents, count, time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("fixtures", nargs="+", help="JSON, NDJSON or YAML fixture files")
+    parser.add_argument("--host",
+                        help=f"Emulator host:port (default: $FIRESTORE_EMULATOR_HOST or {DEFAULT_HOST})")
+    parser.add_argument("--project", help=f"Project ID (default: $GCLOUD_PROJECT or {DEFAULT_PROJECT})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Writes per commit (max 500)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Commits in flight")
+    parser.add_argument("--step", default=STEP, help="Ledger step the seeding is recorded under")
+    args = parser.parse_args(argv)
+
+    ledger_path = os.environ.get(LEDGER_ENV)
+    for fixture in args.fixtures:
+        start = time.time()
+        try:
+            result = seed(fixture, args.host, args.project, args.batch_size, args.concurrency)
+        except (OSError, SeedError) as e:
+            print(f"[ERROR] {fixture}: {e}")
+            return 1
+        print(f"[OK] {fixture}: {result.documents} documents in {result.batches} commits")
+        print(f"[TIMING] {fixture} seed Duration: {result.seconds:.3f}s ({result.rate:.0f} docs/s)")
+        record(ledger_path, args.step, start, time.time(), phase=os.path.basename(fixture),
+               documents=result.documents, docs_per_second=round(result.rate, 1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Windows service state lookups for the NSSM-managed emulator service.
+"""
+from __future__ import annotations
+
+import re
+import shutil
+import subprocess
+from typing import Optional
+
+STATE_PATTERN = re.compile(r"STATE\s*:\s*\d+\s+(?P<state>[A-Z_]+)")
+
+# States from which the service will not come back without intervention
+DEAD_STATES = {"STOPPED", "STOP_PENDING", "PAUSED"}
+
+
+def query_state(name: str, timeout: float = 5.0) -> Optional[str]:
+    """
+    Return the service state reported by ``sc query`` (e.g. ``RUNNING``).
+
+    Returns ``NOT_FOUND`` if the service does not exist and None when the
+    state cannot be determined (not on Windows, ``sc`` unavailable).
+    """
+    sc = shutil.which("sc.exe")
+    if not sc:
+        return None
+    try:
+        proc = subprocess.run([sc, "query", name], capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = STATE_PATTERN.search(proc.stdout)
+    if match:
+        return match.group("state")
+    # 1060: The specified service does not exist as an installed service.
+    if proc.returncode == 1060:
+        return "NOT_FOUND"
+    return None
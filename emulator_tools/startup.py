@@ -0,0 +1,263 @@
+"""
+Per-emulator startup timeline from the Firebase CLI logs.
+
+``firebase-debug.log`` (written next to ``firebase.json``) interleaves the
+CLI's info messages with timestamped debug lines, including the emulators'
+own output:
+
+    [debug] [2025-11-24T10:12:45.120Z] Starting Firestore Emulator with command {...}
+    [info] i  firestore: Firestore Emulator logging to firestore-debug.log {"metadata":...}
+
+Each line is classified into a milestone (JAR download, JVM launch, port
+bound, functions discovery, definitions loaded, ready). Untimestamped info
+lines take the time of the debug line before them. The phase between two
+milestones of one emulator is reported under the earlier one, so "download"
+covers download and verification and "launch" covers JVM start-up until the
+port is bound. The emulator that reaches its last milestone latest is the
+critical path.
+
+``emulator-stdout.log`` has no timestamps; given only that file the report
+shows the order of milestones without durations.
+
+Usage:
+    python -m emulator_tools.startup --debug-log firebase-debug.log \
+        --log emulator-stdout.log
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .ledger import LEDGER_ENV, record
+from .logwatch import READY_PATTERN, strip_ansi
+
+# "[debug] [2025-11-24T10:12:45.120Z] message" / "[info] i  firestore: message {...}"
+DEBUG_LINE = re.compile(
+    r"^\[(?P<level>debug|info|warn|error)\]\s+(?:\[(?P<ts>\d{4}-\d\d-\d\dT[\d:.]+Z)\]\s+)?(?P<msg>.*)$")
+METADATA = re.compile(r"\s+\{\"metadata\":.*$")
+METADATA_EMULATOR = re.compile(r"\"emulator\":\{\"name\":\"(?P<name>[a-z]+)\"")
+
+# "i  firestore: ..." / "+  functions[us-central1-hello]: ..."
+CLI_PREFIX = re.compile(r"^[i+!✔⚠]\s+(?P<name>[a-z]+)(?:\[[^\]]*\])?:\s+(?P<msg>.*)$")
+
+# "Starting Firestore Emulator with command ..." (debug, no CLI prefix)
+LAUNCH_COMMAND = re.compile(r"^Starting (?P<name>[A-Za-z ]+?) Emulator with command", re.IGNORECASE)
+
+MILESTONES: List[Tuple[str, re.Pattern]] = [
+    ("download", re.compile(r"downloading \S+\.(?:jar|zip)", re.IGNORECASE)),
+    ("launch", re.compile(r"Emulator logging to|Starting .* Emulator with command", re.IGNORECASE)),
+    ("discovery", re.compile(r"Watching .* for Cloud Functions|Loading and analyz", re.IGNORECASE)),
+    ("loaded", re.compile(r"Loaded functions definitions", re.IGNORECASE)),
+    ("initialized", re.compile(r"function initialized", re.IGNORECASE)),
+    ("listening", re.compile(r"running on|is running at|Dev App Server is now running|"
+                             r"API endpoint: http|started on port", re.IGNORECASE)),
+]
+
+# Display names used in "Starting <X> Emulator with command"
+EMULATOR_NAMES = {
+    "firestore": "firestore", "database": "database", "realtime database": "database",
+    "pubsub": "pubsub", "pub/sub": "pubsub", "storage": "storage", "auth": "auth",
+    "authentication": "auth", "functions": "functions", "hosting": "hosting",
+    "eventarc": "eventarc", "cloud tasks": "tasks", "data connect": "dataconnect", "ui": "ui",
+}
+
+# Components that are not emulators in their own right
+IGNORED = {"emulators", "hub", "logging"}
+
+
+@dataclass
+class Milestone:
+    emulator: str
+    name: str
+    at: Optional[datetime]
+    order: int
+
+
+@dataclass
+class Phase:
+    emulator: str
+    name: str
+    start: Optional[datetime]
+    duration: Optional[float]
+
+
+@dataclass
+class StartupTimeline:
+    """
+    Milestones grouped per emulator. The first occurrence of a milestone wins,
+    except "initialized", which tracks the last function to come up.
+    """
+    origin: Optional[datetime] = None
+    ready_at: Optional[datetime] = None
+    milestones: Dict[str, List[Milestone]] = field(default_factory=dict)
+    _count: int = 0
+
+    def add(self, emulator: str, name: str, at: Optional[datetime]) -> None:
+        entries = self.milestones.setdefault(emulator, [])
+        # Several functions initialize one after another: keep the last one
+        existing = next((m for m in entries if m.name == name), None)
+        if existing is not None:
+            if name == "initialized":
+                existing.at = at or existing.at
+            return
+        self._count += 1
+        entries.append(Milestone(emulator, name, at, self._count))
+
+    def phases(self) -> List[Phase]:
+        """One phase per milestone, lasting until that emulator's next milestone."""
+        result = []
+        for emulator, entries in self.milestones.items():
+            for current, following in zip(entries, entries[1:] + [None]):
+                duration = None
+                if following is not None and current.at and following.at:
+                    duration = (following.at - current.at).total_seconds()
+                result.append((current.order, Phase(emulator, current.name, current.at, duration)))
+        return [phase for _, phase in sorted(result, key=lambda item: item[0])]
+
+    def critical_path(self) -> Optional[Tuple[str, float]]:
+        """The emulator whose last milestone comes latest, and its offset from start."""
+        if self.origin is None:
+            return None
+        ends = {emulator: entries[-1].at for emulator, entries in self.milestones.items()
+                if entries and entries[-1].at}
+        if not ends:
+            return None
+        emulator = max(ends, key=lambda name: ends[name])
+        return emulator, (ends[emulator] - self.origin).total_seconds()
+
+
+def _parse_iso(text: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _emulator_for(message: str, metadata_name: Optional[str]) -> Tuple[Optional[str], str]:
+    prefixed = CLI_PREFIX.match(message)
+    if prefixed:
+        return prefixed.group("name").lower(), prefixed.group("msg")
+    launch = LAUNCH_COMMAND.match(message)
+    if launch:
+        return EMULATOR_NAMES.get(launch.group("name").lower()), message
+    return metadata_name, message
+
+
+def classify(message: str) -> Optional[str]:
+    for name, pattern in MILESTONES:
+        if pattern.search(message):
+            return name
+    return None
+
+
+def build(lines: Iterable[str]) -> StartupTimeline:
+    """
+    Stream CLI log lines (debug-log or plain stdout format) into a timeline.
+    """
+    timeline = StartupTimeline()
+    now: Optional[datetime] = None
+    for raw in lines:
+        line = strip_ansi(raw).strip()
+        if not line:
+            continue
+        metadata_name = None
+        parsed = DEBUG_LINE.match(line)
+        if parsed:
+            if parsed.group("ts"):
+                now = _parse_iso(parsed.group("ts")) or now
+            message = parsed.group("msg")
+            meta = METADATA_EMULATOR.search(message)
+            if meta:
+                metadata_name = meta.group("name")
+            message = METADATA.sub("", message)
+        else:
+            message = line
+
+        if timeline.origin is None and now is not None:
+            timeline.origin = now
+        if READY_PATTERN.search(message):
+            timeline.ready_at = timeline.ready_at or now
+            continue
+
+        emulator, text = _emulator_for(message, metadata_name)
+        if not emulator or emulator in IGNORED:
+            continue
+        milestone = classify(text)
+        if milestone:
+            timeline.add(emulator, milestone, now)
+    return timeline
+
+
+def build_from_file(path: str) -> StartupTimeline:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return build(f)
+
+
+def _offset(timeline: StartupTimeline, at: Optional[datetime]) -> str:
+    if at is None or timeline.origin is None:
+        return "-"
+    return f"+{(at - timeline.origin).total_seconds():.3f}s"
+
+
+def format_report(timeline: StartupTimeline) -> str:
+    phases = timeline.phases()
+    width = max([len(p.emulator) for p in phases] + [8])
+    lines = [f"{'Emulator':<{width}}  {'Phase':<11}  {'Start':>10}  {'Duration':>9}",
+             f"{'-' * width}  {'-' * 11}  {'-' * 10}  {'-' * 9}"]
+    for p in phases:
+        duration = "-" if p.duration is None else f"{p.duration:.3f}s"
+        lines.append(f"{p.emulator:<{width}}  {p.name:<11}  {_offset(timeline, p.start):>10}  {duration:>9}")
+    return "\n".join(lines)
+
+
+def write_ledger(timeline: StartupTimeline, path: Optional[str]) -> None:
+    """Add every timed phase to the action's timing ledger."""
+    if not path:
+        return
+    for p in timeline.phases():
+        if p.start is None or p.duration is None:
+            continue
+        start = p.start.timestamp()
+        record(path, "Emulator Startup", start, start + p.duration, phase=f"{p.emulator} {p.name}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--debug-log", default="firebase-debug.log",
+                        help="Timestamped CLI log (preferred)")
+    parser.add_argument("--log", default="emulator-stdout.log",
+                        help="CLI stdout, used for ordering when the debug log is missing")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.debug_log):
+        source = args.debug_log
+    elif os.path.exists(args.log):
+        source = args.log
+        print(f"[WARN] {args.debug_log} not found; {args.log} has no timestamps, showing order only")
+    else:
+        print(f"[WARN] No emulator log found ({args.debug_log}, {args.log})")
+        return 0
+
+    timeline = build_from_file(source)
+    if not timeline.milestones:
+        print(f"[INFO] No emulator startup milestones in {source}")
+        return 0
+
+    print(format_report(timeline))
+    print("")
+    if timeline.ready_at is not None and timeline.origin is not None:
+        print(f"[TIMING] All emulators ready: {(timeline.ready_at - timeline.origin).total_seconds():.3f}s")
+    critical = timeline.critical_path()
+    if critical:
+        print(f"[INFO] Critical path: {critical[0]} (last milestone at +{critical[1]:.3f}s)")
+    write_ledger(timeline, os.environ.get(LEDGER_ENV))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+ID tokens for calling authenticated functions in the emulators.
+
+The usual route is ``auth.create_custom_token(uid)`` followed by a POST to
+the Auth emulator's ``accounts:signInWithCustomToken``, for every call. The
+emulators do not check signatures: the Auth emulator issues unsigned
+(``alg: none``) ID tokens itself, and the Functions and Firestore emulators
+accept them. So tokens can be
+
+- minted locally, with no HTTP call at all (``mode="mint"``, the default), or
+- exchanged once through the Auth emulator (``mode="exchange"``), which also
+  creates the user there,
+
+and are cached per uid and claims until shortly before they expire.
+
+Usage:
+    python -m emulator_tools.tokens user-1 --claims '{"admin": true}'
+
+From Python:
+    from emulator_tools.tokens import TokenCache
+    tokens = TokenCache("demo-project")
+    headers = {"Authorization": f"Bearer {tokens.get('user-1')}"}
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_PROJECT = "demo-project"
+DEFAULT_AUTH_HOST = "127.0.0.1:9099"
+LIFETIME = 3600
+# Tokens are replaced this many seconds before they expire
+MARGIN = 300
+
+CUSTOM_TOKEN_AUDIENCE = "https://identitytoolkit.googleapis.com/google.identity.identitytoolkit.v1.IdentityToolkit"
+EMULATOR_ACCOUNT = "firebase-auth-emulator@example.com"
+
+
+def _b64(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _unsigned(payload: dict) -> str:
+    return f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64(payload)}."
+
+
+def decode(token: str) -> dict:
+    """The payload of a JWT, without verifying it."""
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+
+def mint(uid: str, project: str, claims: Optional[dict] = None, email: Optional[str] = None,
+         now: Optional[float] = None, lifetime: int = LIFETIME) -> str:
+    """An unsigned ID token shaped like the ones the Auth emulator issues."""
+    issued = int(time.time() if now is None else now)
+    payload = dict(claims or {})
+    payload.update({
+        "iss": f"https://securetoken.google.com/{project}",
+        "aud": project,
+        "auth_time": issued,
+        "user_id": uid,
+        "sub": uid,
+        "iat": issued,
+        "exp": issued + lifetime,
+        "firebase": {"identities": {"email": [email]} if email else {}, "sign_in_provider": "custom"},
+    })
+    if email:
+        payload.update({"email": email, "email_verified": True})
+    return _unsigned(payload)
+
+
+def custom_token(uid: str, claims: Optional[dict] = None, now: Optional[float] = None) -> str:
+    """An unsigned custom token; the Auth emulator accepts it in signInWithCustomToken."""
+    issued = int(time.time() if now is None else now)
+    payload = {"aud": CUSTOM_TOKEN_AUDIENCE, "iss": EMULATOR_ACCOUNT, "sub": EMULATOR_ACCOUNT,
+               "iat": issued, "exp": issued + LIFETIME, "uid": uid}
+    if claims:
+        payload["claims"] = claims
+    return _unsigned(payload)
+
+
+def exchange(token: str, auth_host: str, timeout: float = 5.0) -> str:
+    """Trade a custom token for an ID token at the Auth emulator."""
+    url = (f"http://{auth_host}/identitytoolkit.googleapis.com/v1/accounts:signInWithCustomToken"
+           f"?key=fake-api-key")
+    body = json.dumps({"token": token, "returnSecureToken": True}).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)["idToken"]
+
+
+class TokenCache:
+    """ID tokens per (uid, claims), reused until ``margin`` seconds before expiry."""
+
+    def __init__(self, project: Optional[str] = None, mode: str = "mint", auth_host: Optional[str] = None,
+                 margin: float = MARGIN, clock: Callable[[], float] = time.time,
+                 create_custom_token: Callable[[str, Optional[dict]], object] = custom_token):
+        if mode not in ("mint", "exchange"):
+            raise ValueError(f"mode must be 'mint' or 'exchange', not {mode!r}")
+        self.project = project or os.environ.get("GCLOUD_PROJECT") or DEFAULT_PROJECT
+        self.mode = mode
+        self.auth_host = auth_host or os.environ.get("FIREBASE_AUTH_EMULATOR_HOST") or DEFAULT_AUTH_HOST
+        self.margin = margin
+        self.clock = clock
+        self.create_custom_token = create_custom_token
+        self.tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, uid: str, claims: Optional[dict] = None, email: Optional[str] = None) -> str:
+        key = (uid, json.dumps(claims or {}, sort_keys=True))
+        with self.lock:
+            cached = self.tokens.get(key)
+            if cached and cached[1] - self.margin > self.clock():
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+        token = self._new(uid, claims, email)
+        with self.lock:
+            self.tokens[key] = (token, float(decode(token)["exp"]))
+        return token
+
+    def headers(self, uid: str, claims: Optional[dict] = None) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.get(uid, claims)}"}
+
+    def clear(self) -> None:
+        with self.lock:
+            self.tokens.clear()
+
+    def _new(self, uid: str, claims: Optional[dict], email: Optional[str]) -> str:
+        if self.mode == "mint":
+            return mint(uid, self.project, claims, email, now=self.clock())
+        token = self.create_custom_token(uid, claims)
+        if isinstance(token, bytes):
+            token = token.decode("utf-8")
+        return exchange(token, self.auth_host)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("uid")
+    parser.add_argument("--claims", default="{}", help="Custom claims as JSON")
+    parser.add_argument("--email")
+    parser.add_argument("--project", help=f"Project ID (default: $GCLOUD_PROJECT or {DEFAULT_PROJECT})")
+    parser.add_argument("--exchange", action="store_true",
+                        help="Get the token from the Auth emulator instead of minting it locally")
+    args = parser.parse_args(argv)
+
+    cache = TokenCache(args.project, mode="exchange" if args.exchange else "mint")
+    try:
+        print(cache.get(args.uid, json.loads(args.claims), args.email))
+    except (OSError, KeyError, ValueError) as e:
+        print(f"[ERROR] Could not get an ID token for {args.uid}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Resolve firebase.json once into an emulator topology manifest.
+
+Every later step of the action (functions detection and install, service
+start, readiness, health check) and the test suites read the manifest
+instead of re-parsing firebase.json with their own path rules and port
+defaults:
+
+    {
+      "working_directory": "D:\\a\\repo\\tests\\default-ports",
+      "config_path": "D:\\a\\repo\\tests\\default-ports\\firebase.json",
+      "config_found": true,
+      "only": ["auth", "firestore"],
+      "emulators": {"auth": {"host": "127.0.0.1", "port": 9099,
+                             "configured": true, "selected": true}, ...},
+      "functions": [{"codebase": "default", "source": "functions",
+                     "dir": "...\\functions", "runtime": "python"}],
+      "env": {"FIRESTORE_EMULATOR_HOST": "127.0.0.1:8080", ...}
+    }
+
+Usage:
+    python -m emulator_tools.topology --working-directory ./tests/default-ports \
+        --config firebase.json --only auth,firestore --output topology.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+TOPOLOGY_ENV = "FIREBASE_EMULATOR_TOPOLOGY"
+
+# Ports the Firebase CLI uses when firebase.json does not set one
+DEFAULT_PORTS = {
+    "hub": 4400,
+    "ui": 4000,
+    "logging": 4500,
+    "hosting": 5000,
+    "functions": 5001,
+    "apphosting": 5002,
+    "firestore": 8080,
+    "pubsub": 8085,
+    "database": 9000,
+    "auth": 9099,
+    "storage": 9199,
+    "eventarc": 9299,
+    "dataconnect": 9399,
+    "tasks": 9499,
+}
+
+# Always started alongside the requested emulators
+SUPPORT_EMULATORS = {"hub", "logging", "ui"}
+
+# Connection variables understood by the Admin SDKs and Google Cloud clients
+ENV_VARS = {
+    "FIRESTORE_EMULATOR_HOST": "firestore",
+    "FIREBASE_FIRESTORE_EMULATOR_ADDRESS": "firestore",
+    "FIREBASE_AUTH_EMULATOR_HOST": "auth",
+    "FIREBASE_STORAGE_EMULATOR_HOST": "storage",
+    "FIREBASE_DATABASE_EMULATOR_HOST": "database",
+    "PUBSUB_EMULATOR_HOST": "pubsub",
+    "FIREBASE_EMULATOR_HUB": "hub",
+}
+
+
+@dataclass
+class EmulatorConfig:
+    host: str
+    port: int
+    configured: bool
+    selected: bool
+
+
+@dataclass
+class Codebase:
+    codebase: str
+    source: str
+    dir: str
+    runtime: Optional[str]
+
+
+@dataclass
+class Topology:
+    working_directory: str
+    config_path: str
+    config_found: bool
+    only: List[str] = field(default_factory=list)
+    emulators: Dict[str, EmulatorConfig] = field(default_factory=dict)
+    functions: List[Codebase] = field(default_factory=list)
+    env: Dict[str, str] = field(default_factory=dict)
+    # Ports moved by the preflight (see ports.py): key -> port in firebase.json
+    remapped: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Topology":
+        topology = cls(**{k: v for k, v in data.items() if k not in ("emulators", "functions")})
+        topology.emulators = {name: EmulatorConfig(**info) for name, info in data.get("emulators", {}).items()}
+        topology.functions = [Codebase(**entry) for entry in data.get("functions", [])]
+        return topology
+
+    def port(self, name: str) -> int:
+        return self.emulators[name].port
+
+    def connection_env(self) -> Dict[str, str]:
+        """The ``ENV_VARS`` connection variables for the emulators' current addresses."""
+        return {var: f"{self.emulators[name].host}:{self.emulators[name].port}"
+                for var, name in ENV_VARS.items()}
+
+
+def resolve_config_path(config: str, working_directory: str, cwd: Optional[str] = None) -> str:
+    """
+    Resolve the ``firebase-config-path`` input.
+
+    Absolute paths are used as is, paths starting with ``./`` are relative to
+    the workspace (the current directory), anything else is relative to the
+    working directory.
+    """
+    cwd = cwd or os.getcwd()
+    if os.path.isabs(config):
+        return os.path.normpath(config)
+    if config.startswith("./") or config.startswith(".\\"):
+        return os.path.normpath(os.path.join(cwd, config))
+    return os.path.normpath(os.path.join(resolve_working_directory(working_directory, cwd), config))
+
+
+def resolve_working_directory(working_directory: str, cwd: Optional[str] = None) -> str:
+    cwd = cwd or os.getcwd()
+    return os.path.normpath(os.path.join(cwd, working_directory or "."))
+
+
+def connect_host(host: Optional[str]) -> str:
+    """Address clients should use for an emulator bound to ``host``."""
+    if not host or host in ("0.0.0.0", "::", "[::]"):
+        return "127.0.0.1"
+    return host
+
+
+def detect_runtime(directory: str) -> Optional[str]:
+    if os.path.exists(os.path.join(directory, "package.json")):
+        return "node"
+    if os.path.exists(os.path.join(directory, "requirements.txt")):
+        return "python"
+    return None
+
+
+def parse_only(value: str) -> List[str]:
+    # "functions:codebase" selects a codebase; the emulator is still "functions"
+    names = [item.strip().split(":", 1)[0] for item in (value or "").split(",")]
+    return [name for name in dict.fromkeys(names) if name]
+
+
+def _codebases(config: dict, project_dir: str) -> List[Codebase]:
+    entries = config.get("functions")
+    if entries is None:
+        # Not declared: the CLI looks for functions/ next to firebase.json
+        default = os.path.join(project_dir, "functions")
+        runtime = detect_runtime(default)
+        return [Codebase("default", "functions", default, runtime)] if runtime else []
+    if isinstance(entries, dict):
+        entries = [entries]
+    result = []
+    for entry in entries:
+        source = entry.get("source") or "functions"
+        directory = os.path.normpath(os.path.join(project_dir, source))
+        result.append(Codebase(entry.get("codebase") or "default", source, directory,
+                               detect_runtime(directory)))
+    return result
+
+
+def resolve(working_directory: str = ".", config: str = "firebase.json", only: str = "",
+            cwd: Optional[str] = None) -> Topology:
+    """Build the topology for one action invocation."""
+    work_dir = resolve_working_directory(working_directory, cwd)
+    config_path = resolve_config_path(config, working_directory, cwd)
+    data: dict = {}
+    found = os.path.exists(config_path)
+    if found:
+        with open(config_path, encoding="utf-8-sig") as f:
+            data = json.load(f)
+
+    topology = Topology(work_dir, config_path, found, only=parse_only(only))
+    section = data.get("emulators") or {}
+    selected = set(topology.only)
+    for name, default_port in DEFAULT_PORTS.items():
+        entry = section.get(name) if isinstance(section.get(name), dict) else {}
+        configured = name in section
+        if name in SUPPORT_EMULATORS:
+            is_selected = entry.get("enabled", True) is not False
+        elif selected:
+            is_selected = name in selected
+        else:
+            is_selected = configured
+        topology.emulators[name] = EmulatorConfig(
+            host=connect_host(entry.get("host")),
+            port=int(entry.get("port") or default_port),
+            configured=configured,
+            selected=is_selected,
+        )
+
+    topology.functions = _codebases(data, os.path.dirname(config_path))
+    topology.env = topology.connection_env()
+    return topology
+
+
+def load(path: Optional[str] = None) -> Topology:
+    """Read the manifest written by an earlier step (path defaults to the env var)."""
+    path = path or os.environ[TOPOLOGY_ENV]
+    with open(path, encoding="utf-8-sig") as f:
+        return Topology.from_dict(json.load(f))
+
+
+def addresses(names: List[str], environ: Optional[dict] = None) -> Dict[str, Tuple[str, int]]:
+    """
+    host/port clients should use for every emulator in ``names``: the
+    exported connection variables first, then the manifest, then the
+    default port.
+    """
+    environ = os.environ if environ is None else environ
+    topology = None
+    if environ.get(TOPOLOGY_ENV) and os.path.exists(environ[TOPOLOGY_ENV]):
+        topology = load(environ[TOPOLOGY_ENV])
+    found = {}
+    for name in names:
+        variable = next((v for v, n in ENV_VARS.items() if n == name and environ.get(v)), None)
+        if variable:
+            host, _, port = environ[variable].rpartition(":")
+            found[name] = (connect_host(host), int(port))
+        elif topology and name in topology.emulators:
+            emulator = topology.emulators[name]
+            found[name] = (connect_host(emulator.host), emulator.port)
+        else:
+            found[name] = ("127.0.0.1", DEFAULT_PORTS[name])
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--working-directory", default=".")
+    parser.add_argument("--config", default="firebase.json", help="The firebase-config-path input")
+    parser.add_argument("--only", default="", help="The emulators input (comma-separated)")
+    parser.add_argument("--output", required=True, help="Where to write the manifest")
+    args = parser.parse_args(argv)
+
+    try:
+        topology = resolve(args.working_directory, args.config, args.only)
+    except ValueError as e:
+        print(f"[ERROR] Failed to parse {resolve_config_path(args.config, args.working_directory)}: {e}")
+        return 1
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(topology.to_dict(), f, indent=2)
+
+    if topology.config_found:
+        print(f"[OK] Resolved {topology.config_path}")
+    else:
+        print(f"[WARN] Config file not found at {topology.config_path}, using default ports")
+    for name, emulator in topology.emulators.items():
+        if emulator.selected:
+            print(f"  {name:<12} {emulator.host}:{emulator.port}")
+    for codebase in topology.functions:
+        print(f"  functions[{codebase.codebase}] {codebase.dir} ({codebase.runtime or 'no runtime detected'})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Create Auth emulator users in batches.
+
+``auth.create_user`` is one request per user. The Auth emulator accepts the
+Identity Toolkit batch import (``accounts:batchCreate``, up to 1000 users a
+request) with plain-text passwords, so thousands of users with known
+passwords and custom claims take a handful of requests. Existing users with
+the same uid are overwritten, so provisioning can be re-run.
+
+Users come from a fixture file (JSON/YAML list or NDJSON, as in
+``seed.py``) or are generated from a pattern:
+
+    {"uid": "user-1", "email": "user1@example.com", "password": "secret1",
+     "claims": {"role": "admin"}, "displayName": "User 1"}
+
+The created users (uid, email, password, claims) can be written out as
+JSON for the tests to sign in with.
+
+Usage:
+    python -m emulator_tools.users --fixture users.ndjson --output created.json
+    python -m emulator_tools.users --count 5000 --email "load{n}@example.com" --password secret
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Iterator, List, Optional
+
+from .ledger import LEDGER_ENV, record
+from .seed import CONCURRENCY, KeepAliveClient, SeedError, batches, project_id, read_entries, run_batches
+
+STEP = "Provision Auth Users"
+BATCH_SIZE = 1000
+DEFAULT_HOST = "127.0.0.1:9099"
+
+
+class ProvisionError(Exception):
+    """A user entry is invalid or the emulator rejected part of a batch."""
+
+
+@dataclass
+class User:
+    uid: str
+    email: Optional[str] = None
+    password: Optional[str] = None
+    claims: dict = field(default_factory=dict)
+    display_name: Optional[str] = None
+    email_verified: bool = False
+
+    @classmethod
+    def from_entry(cls, entry: object, where: str) -> "User":
+        if not isinstance(entry, dict) or not (entry.get("uid") or entry.get("email")):
+            raise ProvisionError(f"{where}: expected an object with 'uid' and/or 'email'")
+        return cls(uid=entry.get("uid") or entry["email"].split("@")[0],
+                   email=entry.get("email"),
+                   password=entry.get("password"),
+                   claims=entry.get("claims") or {},
+                   display_name=entry.get("displayName"),
+                   email_verified=bool(entry.get("emailVerified", False)))
+
+    def to_request(self) -> dict:
+        """The user as an Identity Toolkit ``UserInfo`` for batchCreate."""
+        info = {"localId": self.uid, "emailVerified": self.email_verified}
+        if self.email:
+            info["email"] = self.email
+        if self.password:
+            info["rawPassword"] = self.password
+        if self.claims:
+            info["customAttributes"] = json.dumps(self.claims)
+        if self.display_name:
+            info["displayName"] = self.display_name
+        return info
+
+
+@dataclass
+class ProvisionResult:
+    users: List[User]
+    batches: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        """Users per second."""
+        return len(self.users) / self.seconds if self.seconds > 0 else 0.0
+
+
+def emulator_host(environ: Optional[dict] = None) -> str:
+    environ = os.environ if environ is None else environ
+    return environ.get("FIREBASE_AUTH_EMULATOR_HOST") or DEFAULT_HOST
+
+
+def read_users(path: str) -> Iterator[User]:
+    try:
+        for where, entry in read_entries(path):
+            yield User.from_entry(entry, where)
+    except SeedError as e:
+        raise ProvisionError(str(e)) from e
+
+
+def generate(count: int, email: str = "user{n}@example.com", password: str = "password{n}",
+             uid: str = "user-{n}", claims: Optional[dict] = None) -> Iterator[User]:
+    """``count`` users from patterns; ``{n}`` is replaced by 1..count."""
+    for n in range(1, count + 1):
+        yield User(uid=uid.format(n=n), email=email.format(n=n), password=password.format(n=n),
+                   claims=dict(claims or {}))
+
+
+def provision(users: Iterable[User], host: Optional[str] = None, project: Optional[str] = None,
+              batch_size: int = BATCH_SIZE, concurrency: int = CONCURRENCY,
+              timeout: float = 30.0) -> ProvisionResult:
+    """Import ``users`` into the Auth emulator with batchCreate, a few batches at a time."""
+    if not 1 <= batch_size <= BATCH_SIZE:
+        raise ProvisionError(f"batch size must be between 1 and {BATCH_SIZE}")
+    client = KeepAliveClient(host or emulator_host(), timeout)
+    url = f"/identitytoolkit.googleapis.com/v1/projects/{project or project_id()}/accounts:batchCreate"
+    created: List[User] = []
+
+    def create(batch: List[User]) -> int:
+        status, payload = client.post(url, {"users": [u.to_request() for u in batch], "allowOverwrite": True})
+        text = payload.decode("utf-8", "replace")
+        if status != 200:
+            raise ProvisionError(f"batchCreate of {len(batch)} users failed: HTTP {status} {text[:300]}")
+        errors = json.loads(text or "{}").get("error") or []
+        if errors:
+            first = errors[0]
+            raise ProvisionError(f"{len(errors)} of {len(batch)} users rejected, e.g. "
+                                 f"{batch[first.get('index', 0)].uid}: {first.get('message')}")
+        created.extend(batch)
+        return len(batch)
+
+    start = time.perf_counter()
+    _, count = run_batches(batches(users, batch_size), create, concurrency)
+    return ProvisionResult(created, count, time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fixture", help="JSON, NDJSON or YAML list of users")
+    source.add_argument("--count", type=int, help="Generate this many users from the patterns below")
+    parser.add_argument("--email", default="user{n}@example.com", help="Email pattern for --count")
+    parser.add_argument("--password", default="password{n}", help="Password pattern for --count")
+    parser.add_argument("--uid", default="user-{n}", help="uid pattern for --count")
+    parser.add_argument("--claims", default="{}", help="Custom claims (JSON) for generated users")
+    parser.add_argument("--host",
+                        help=f"Emulator host:port (default: $FIREBASE_AUTH_EMULATOR_HOST or {DEFAULT_HOST})")
+    parser.add_argument("--project", help="Project ID (default: $GCLOUD_PROJECT or demo-project)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Users per request (max 1000)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Requests in flight")
+    parser.add_argument("--output", help="Write the created users (uid, email, password, claims) as JSON")
+    parser.add_argument("--step", default=STEP, help="Ledger step the provisioning is recorded under")
+    args = parser.parse_args(argv)
+
+    if args.fixture:
+        users = read_users(args.fixture)
+    else:
+        users = generate(args.count, args.email, args.password, args.uid, json.loads(args.claims))
+    start = time.time()
+    try:
+        result = provision(users, args.host, args.project, args.batch_size, args.concurrency)
+    except (OSError, ProvisionError) as e:
+        print(f"[ERROR] User provisioning failed: {e}")
+        return 1
+    end = time.time()
+
+    print(f"[OK] Created {len(result.users)} users in {result.batches} batches")
+    print(f"[TIMING] User provisioning Duration: {result.seconds:.3f}s ({result.rate:.0f} users/s)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([{k: v for k, v in asdict(u).items() if k in ("uid", "email", "password", "claims")}
+                       for u in result.users], f, indent=2)
+    record(os.environ.get(LEDGER_ENV), args.step, start, end, users=len(result.users),
+           users_per_second=round(result.rate, 1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
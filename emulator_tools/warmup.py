@@ -0,0 +1,143 @@
+"""
+Invoke every HTTP and callable function once after the emulators are ready.
+
+The first call of a function pays for starting its worker: for Python
+functions that is the interpreter plus the ``firebase_admin`` /
+``firebase_functions`` imports, often several seconds. Without a warmup the
+first test to call each function pays it, and suites paper over it with
+sleep-and-retry loops.
+
+Functions are discovered from the emulator log, where the CLI prints one
+line per function it loaded:
+
+    ✔  functions[us-central1-hello_world]: http function initialized (http://127.0.0.1:5001/demo/us-central1/hello_world).
+
+Every HTTP function (callable functions are HTTP functions too) is sent one
+``POST {"data": {}}`` concurrently. Any HTTP response, including an error
+from a callable that wants arguments or auth, means the worker is up; the
+time it took is the function's cold start. Background triggers (Firestore,
+Auth, Pub/Sub, ...) are not invoked.
+
+Usage:
+    python -m emulator_tools.warmup --log emulator-stdout.log --output warmup.json
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterable, List, Optional
+
+from .ledger import LEDGER_ENV, record
+from .logwatch import strip_ansi
+
+STEP = "Warm Up Functions"
+
+INITIALIZED = re.compile(
+    r"functions\[(?P<id>[^\]]+)\]:\s+http function initialized\s+\((?P<url>https?://[^)\s]+)\)")
+
+
+@dataclass
+class Function:
+    id: str
+    url: str
+
+
+@dataclass
+class WarmupResult:
+    id: str
+    url: str
+    ok: bool
+    cold_start_ms: Optional[float] = None
+    status: Optional[int] = None
+    detail: str = ""
+
+
+def discover(lines: Iterable[str]) -> List[Function]:
+    """HTTP functions announced in the log, in order, without duplicates (reloads)."""
+    found = {}
+    for line in lines:
+        match = INITIALIZED.search(strip_ansi(line))
+        if match:
+            found[match.group("id")] = Function(match.group("id"), match.group("url").rstrip("."))
+    return list(found.values())
+
+
+def invoke(function: Function, timeout: float = 60.0) -> WarmupResult:
+    url = urllib.parse.urlsplit(function.url)
+    body = json.dumps({"data": {}}).encode("utf-8")
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+    try:
+        conn.request("POST", url.path or "/", body=body,
+                     headers={"Content-Type": "application/json", "Connection": "close"})
+        response = conn.getresponse()
+        response.read()
+    except (OSError, http.client.HTTPException) as e:
+        return WarmupResult(function.id, function.url, False, detail=f"{type(e).__name__}: {e}")
+    finally:
+        conn.close()
+    ms = (time.perf_counter() - start) * 1000
+    # Anything the function runtime answered means its worker is running
+    return WarmupResult(function.id, function.url, True, ms, response.status, f"HTTP {response.status}")
+
+
+def warm_up(functions: List[Function], timeout: float = 60.0,
+            jobs: Optional[int] = None) -> List[WarmupResult]:
+    if not functions:
+        return []
+    with ThreadPoolExecutor(max_workers=jobs or len(functions)) as pool:
+        return list(pool.map(lambda f: invoke(f, timeout), functions))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--log", required=True, help="Emulator stdout log to discover functions from")
+    parser.add_argument("--output", help="Write the per-function results as JSON")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for one function")
+    parser.add_argument("--jobs", type=int, help="Maximum concurrent invocations")
+    parser.add_argument("--step", default=STEP, help="Ledger step the warmup is recorded under")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.log):
+        print(f"[WARN] {args.log} not found, no functions to warm up")
+        functions = []
+    else:
+        with open(args.log, encoding="utf-8", errors="replace") as f:
+            functions = discover(f)
+    if functions:
+        print(f"[INFO] Warming up {len(functions)} function(s): {', '.join(f.id for f in functions)}")
+    else:
+        print("[INFO] No HTTP functions found in the emulator log")
+
+    start = time.time()
+    results = warm_up(functions, args.timeout, args.jobs)
+    end = time.time()
+    ledger_path = os.environ.get(LEDGER_ENV)
+    width = max((len(r.id) for r in results), default=0)
+    for result in results:
+        if result.ok:
+            print(f"[OK] {result.id:<{width}}  cold start {result.cold_start_ms:8.1f} ms  ({result.detail})")
+        else:
+            print(f"[WARN] {result.id:<{width}}  not reachable: {result.detail}")
+        record(ledger_path, args.step, start, start + (result.cold_start_ms or 0) / 1000,
+               phase=result.id, cold_start_ms=result.cold_start_ms, ok=result.ok)
+    if results:
+        print(f"[TIMING] Function warmup: {end - start:.3f}s for {len(results)} function(s)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+    # A function that cannot be reached is reported, not fatal: tests decide
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+# Shared by the action's pwsh steps (dot-source it): appends records to the
+# JSON-lines timing ledger. See emulator_tools/ledger.py for the record format.
+
+function Add-TimingRecord {
+  param(
+    [Parameter(Mandatory = $true)][string]$Step,
+    [Parameter(Mandatory = $true)][datetime]$Start,
+    [Parameter(Mandatory = $true)][datetime]$End,
+    [string]$Phase,
+    $CacheHit = $null,
+    $BytesDownloaded = $null
+  )
+
+  if (-not $env:FIREBASE_EMULATOR_TIMING_LEDGER) { return }
+
+  $record = [ordered]@{
+    step = $Step
+    phase = if ($Phase) { $Phase } else { $null }
+    start = $Start.ToUniversalTime().ToString("o")
+    end = $End.ToUniversalTime().ToString("o")
+    duration = [math]::Round(($End - $Start).TotalSeconds, 3)
+    cache_hit = $CacheHit
+    bytes_downloaded = $BytesDownloaded
+  }
+  $record | ConvertTo-Json -Compress | Add-Content -Path $env:FIREBASE_EMULATOR_TIMING_LEDGER -Encoding utf8
+}
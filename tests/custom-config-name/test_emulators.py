@@ -3,8 +3,8 @@
 
 import os
 
-os.environ["FIREBASE_AUTH_EMULATOR_HOST"] = "127.0.0.1:9099"
-os.environ["FIRESTORE_EMULATOR_HOST"] = "127.0.0.1:8080"
+os.environ.setdefault("FIREBASE_AUTH_EMULATOR_HOST", "127.0.0.1:9099")
+os.environ.setdefault("FIRESTORE_EMULATOR_HOST", "127.0.0.1:8080")
 
 import firebase_admin
 from firebase_admin import credentials, auth, firestore
@@ -10,8 +10,8 @@ from firebase_admin import credentials, auth, firestore
 def initialize_firebase():
     """Initialize Firebase Admin SDK for emulator with custom ports."""
     # Set emulator environment variables with custom ports
-    os.environ['FIREBASE_AUTH_EMULATOR_HOST'] = '127.0.0.1:9199'
-    os.environ['FIRESTORE_EMULATOR_HOST'] = '127.0.0.1:8888'
+    os.environ.setdefault('FIREBASE_AUTH_EMULATOR_HOST', '127.0.0.1:9199')
+    os.environ.setdefault('FIRESTORE_EMULATOR_HOST', '127.0.0.1:8888')
     os.environ['GCLOUD_PROJECT'] = 'demo-project'
 
     cred = credentials.Certificate({
@@ -1,7 +1,7 @@
 """Quick test for Auth emulator only."""
 import os
 
-os.environ["FIREBASE_AUTH_EMULATOR_HOST"] = "127.0.0.1:9099"
+os.environ.setdefault("FIREBASE_AUTH_EMULATOR_HOST", "127.0.0.1:9099")
 import firebase_admin
 from firebase_admin import credentials, auth
 
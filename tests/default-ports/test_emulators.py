@@ -11,9 +11,9 @@ import requests
 def initialize_firebase():
     """Initialize Firebase Admin SDK for emulator."""
     # Set emulator environment variables (use 127.0.0.1 for Windows compatibility)
-    os.environ['FIREBASE_AUTH_EMULATOR_HOST'] = '127.0.0.1:9099'
-    os.environ['FIRESTORE_EMULATOR_HOST'] = '127.0.0.1:8080'
-    os.environ['FIREBASE_STORAGE_EMULATOR_HOST'] = '127.0.0.1:9199'
+    os.environ.setdefault('FIREBASE_AUTH_EMULATOR_HOST', '127.0.0.1:9099')
+    os.environ.setdefault('FIRESTORE_EMULATOR_HOST', '127.0.0.1:8080')
+    os.environ.setdefault('FIREBASE_STORAGE_EMULATOR_HOST', '127.0.0.1:9199')
     os.environ['GCLOUD_PROJECT'] = 'demo-project'
 
     cred = credentials.Certificate({
@@ -2,54 +2,15 @@
 Test Python functions for Firebase Emulator with StA2BLE-Cloud custom ports.
 Tests Auth (17641), Firestore (17644), and Functions (17642) integration.
 """
-import time
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import firestore
 from firebase_functions import https_fn
-from google.auth import credentials as google_credentials
 
 
-# Initialize Firebase Admin (must be done before defining functions)
-class MockGoogleCredential(google_credentials.Credentials):
-    """Mock Google authentication credential for emulator testing."""
-
-    def __init__(self):
-        super().__init__()
-        self._token = 'mock-token'
-        self.expiry = None
-
-    @property
-    def valid(self):
-        return True
-
-    @property
-    def token(self):
-        return self._token
-
-    @token.setter
-    def token(self, value):
-        self._token = value
-
-    def refresh(self, request):
-        self.token = f'mock-token-{int(time.time())}'
-
-    @property
-    def service_account_email(self):
-        return 'mock-email@demo-sta2ble-ports.iam.gserviceaccount.com'
-
-
-class MockFirebaseCredential(credentials.Base):
-    """Mock Firebase credential for emulator testing."""
-
-    def __init__(self):
-        self._g_credential = MockGoogleCredential()
-
-    def get_credential(self):
-        return self._g_credential
-
-
-# Initialize Firebase Admin SDK
-firebase_admin.initialize_app(MockFirebaseCredential(), options={'projectId': 'demo-sta2ble-ports'})
+# Initialize Firebase Admin SDK (must be done before defining functions). The
+# functions emulator sets the emulator hosts and the project for the runtime,
+# and the emulators accept requests without real credentials.
+firebase_admin.initialize_app()
 
 
 @https_fn.on_request()
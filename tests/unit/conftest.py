@@ -0,0 +1,85 @@
+"""
+Shared fixtures for the emulator_tools unit tests.
+
+These tests run on any OS: the emulators are replaced by small local HTTP
+servers that answer the way the real Hub and emulators do.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeServer:
+    """A local HTTP server whose responses are looked up in ``routes``."""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                server.requests.append((self.command, self.path, body))
+                route = server.routes.get((self.command, self.path.split("?")[0]))
+                if route is None:
+                    route = server.routes.get(self.path.split("?")[0], (404, "Not Found"))
+                if callable(route):
+                    route = route(self, body)
+                status, payload, headers = route if len(route) == 3 else (*route, {})
+                if not isinstance(payload, (str, bytes)):
+                    payload = json.dumps(payload)
+                if isinstance(payload, str):
+                    payload = payload.encode("utf-8")
+                self.send_response(status)
+                # A route may announce a different length to simulate a connection cut mid-body
+                for name, value in {"Content-Length": str(len(payload)), **headers}.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = do_PUT = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_server():
+    """Factory for local HTTP servers, all shut down after the test."""
+    servers = []
+
+    def make(routes=None):
+        server = FakeServer()
+        server.routes.update(routes or {})
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def fake_hub(fake_server):
+    """A fake Emulator Hub plus a Firestore emulator it reports."""
+    firestore = fake_server({"/": (200, "Ok")})
+    hub = fake_server()
+    hub.routes["/emulators"] = (200, {
+        "hub": {"name": "hub", "host": "127.0.0.1", "port": hub.port},
+        "firestore": {"name": "firestore", "host": "127.0.0.1", "port": firestore.port},
+    })
+    hub.firestore = firestore
+    return hub
@@ -0,0 +1,66 @@
+import json
+import sys
+
+from emulator_tools import artifacts, ledger, topology
+
+
+def write_topology(tmp_path, only):
+    (tmp_path / "firebase.json").write_text(json.dumps({"emulators": {"ui": {"enabled": False}}}))
+    manifest = tmp_path / "topology.json"
+    result = topology.resolve(".", "firebase.json", only=only, cwd=str(tmp_path))
+    manifest.write_text(json.dumps(result.to_dict()))
+    return manifest
+
+
+def test_needed_follows_selected_emulators(tmp_path):
+    manifest = write_topology(tmp_path, "auth,firestore,pubsub")
+    assert artifacts.needed(topology.load(str(manifest))) == ["firestore", "pubsub"]
+
+
+def test_present_requires_unpacked_archives(tmp_path):
+    (tmp_path / "cloud-firestore-emulator-v1.19.8.jar").write_bytes(b"jar")
+    (tmp_path / "pubsub-emulator-0.8.14.zip").write_bytes(b"zip")
+    assert artifacts.present("firestore", str(tmp_path))
+    assert not artifacts.present("pubsub", str(tmp_path))
+    (tmp_path / "pubsub-emulator-0.8.14").mkdir()
+    assert artifacts.present("pubsub", str(tmp_path))
+    assert not artifacts.present("database", str(tmp_path))
+
+
+def test_keys_follow_cli_version_not_config(tmp_path):
+    assert artifacts.keys(["firestore", "ui"], "14.1.0", "Windows-firebase-emulator") == {
+        "firestore": "Windows-firebase-emulator-firestore-cli-14.1.0",
+        "ui": "Windows-firebase-emulator-ui-cli-14.1.0",
+    }
+
+
+def test_prefetch_downloads_only_missing_artifacts(tmp_path, monkeypatch, capsys):
+    emulators = tmp_path / "emulators"
+    emulators.mkdir()
+    (emulators / "cloud-firestore-emulator-v1.19.8.jar").write_bytes(b"jar")
+    monkeypatch.setenv("FIREBASE_EMULATORS_PATH", str(emulators))
+    ledger_path = tmp_path / "timing.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    manifest = write_topology(tmp_path, "firestore,database")
+
+    # Stand-in for firebase.exe: "setup:emulators:database" writes the JAR
+    fake_cli = tmp_path / "fake_firebase.py"
+    fake_cli.write_text(
+        "import os, sys\n"
+        "name = sys.argv[1].split(':')[-1]\n"
+        "path = os.path.join(os.environ['FIREBASE_EMULATORS_PATH'], 'firebase-database-emulator-v4.11.2.jar')\n"
+        "open(path, 'wb').write(b'x' * 2048)\n")
+    fetched = []
+
+    def prefetch(firebase_bin, names, jobs=None):
+        fetched.extend(names)
+        commands = [[sys.executable, str(fake_cli), f"setup:emulators:{name}"] for name in names]
+        return [(name, 1.0, 2.0, *artifacts.run_commands([command]))
+                for name, command in zip(names, commands)]
+
+    monkeypatch.setattr(artifacts, "prefetch", prefetch)
+    assert artifacts.main(["--topology", str(manifest), "prefetch", "--firebase-bin", "firebase.exe"]) == 0
+    assert fetched == ["database"]
+    (entry,) = ledger.read(str(ledger_path))
+    assert (entry["phase"], entry["bytes_downloaded"]) == ("database prefetch", 2048)
+    assert "[OK] firestore: restored from cache" in capsys.readouterr().out
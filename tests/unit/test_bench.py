@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+
+from emulator_tools import bench, ledger, tokens
+
+
+def test_targets_from_spec_entries():
+    hello = bench.Target.from_entry({"function": "hello_world"}, "demo", "us-central1")
+    assert (hello.emulator, hello.method, hello.path) == ("functions", "GET", "/demo/us-central1/hello_world")
+
+    entry = {"callable": "add", "data": {"n": 1}, "uid": "u1"}
+    callable_ = bench.Target.from_entry(entry, "demo", "europe-west1")
+    assert (callable_.method, callable_.path) == ("POST", "/demo/europe-west1/add")
+    assert json.loads(callable_.body) == {"data": {"n": 1}}
+    assert tokens.decode(callable_.headers["Authorization"].split()[1])["sub"] == "u1"
+
+    firestore = bench.Target.from_entry({"emulator": "firestore"}, "demo", "us-central1")
+    assert firestore.path.startswith("/v1/projects/demo/databases/(default)/documents/")
+    assert firestore.headers["Authorization"] == "Bearer owner"
+
+    with pytest.raises(bench.BenchError):
+        bench.Target.from_entry({"emulator": "storage"}, "demo", "us-central1")
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert [bench.percentile(values, q) for q in (50, 95, 99, 100)] == [50.0, 95.0, 99.0, 100.0]
+    assert bench.percentile([], 95) == 0.0
+
+
+def test_closed_loop_sends_the_requested_count(fake_server):
+    server = fake_server({("POST", "/demo/us-central1/echo"): (200, "Echo")})
+    target = bench.Target.from_entry({"function": "echo", "body": "hi"}, "demo", "us-central1")
+    result = asyncio.run(bench.run_target(target, "127.0.0.1", server.port,
+                                          concurrency=4, requests=20, warmup=2))
+    assert (result.requests, result.errors, result.statuses) == (20, 0, {"200": 20})
+    assert len(server.requests) == 22
+    assert all(body == b"hi" for _, _, body in server.requests)
+    assert 0 < result.latency_ms["p50"] <= result.latency_ms["p95"] <= result.latency_ms["p99"]
+
+
+def test_open_loop_keeps_the_rate_and_counts_errors(fake_server):
+    server = fake_server({"/fail": (500, "boom")})
+    target = bench.Target("fail", "functions", path="/fail")
+    result = asyncio.run(bench.run_target(target, "127.0.0.1", server.port, rate=50, duration=0.5, warmup=0))
+    assert 20 <= result.requests <= 26
+    assert result.errors == result.requests and result.throughput == 0
+    assert result.statuses == {"500": result.requests}
+
+
+def test_connection_reuses_keep_alive_and_reads_chunked_bodies():
+    async def scenario():
+        connections = []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            try:
+                while await reader.readuntil(b"\r\n\r\n"):
+                    writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                                 b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n")
+                    await writer.drain()
+            except asyncio.IncompleteReadError:
+                writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        connection = bench.Connection("127.0.0.1", server.sockets[0].getsockname()[1], timeout=5)
+        replies = [await connection.request("GET", "/") for _ in range(3)]
+        connection.close()
+        server.close()
+        return replies, len(connections)
+
+    replies, opened = asyncio.run(scenario())
+    assert replies == [(200, 11)] * 3
+    assert opened == 1
+
+
+def test_compare_flags_regressions():
+    def result(p95, throughput, errors=0):
+        return {"name": "hello_world", "requests": 100, "errors": errors, "throughput": throughput,
+                "latency_ms": {"p95": p95}}
+
+    assert bench.compare([result(11, 95)], [result(10, 100)]) == []
+    regressions = bench.compare([result(20, 50, errors=10)], [result(10, 100)])
+    assert len(regressions) == 3 and regressions[0].startswith("hello_world: p95 20.0 ms")
+
+
+def test_main_writes_results_and_gates_on_baseline(tmp_path, fake_server, monkeypatch, capsys):
+    server = fake_server({"/demo/us-central1/hello_world": (200, "Hello")})
+    output = tmp_path / "bench.json"
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    args = ["--function", "hello_world", "--project", "demo", "--host", f"functions=127.0.0.1:{server.port}",
+            "--requests", "10", "--concurrency", "2", "--output", str(output)]
+
+    assert bench.main(args) == 0
+    written = json.loads(output.read_text())
+    assert written["results"][0]["name"] == "hello_world" and written["results"][0]["requests"] == 10
+    assert json.loads(ledger_path.read_text())["phase"] == "hello_world"
+    assert "[OK] hello_world: 10 requests, 0 errors" in capsys.readouterr().out
+
+    baseline = tmp_path / "baseline.json"
+    written["results"][0]["throughput"] *= 1000
+    baseline.write_text(json.dumps(written))
+    assert bench.main(args + ["--baseline", str(baseline)]) == 1
+    assert "[ERROR] Regression: hello_world:" in capsys.readouterr().out
+
+
+def test_main_without_targets_is_a_usage_error(capsys):
+    assert bench.main([]) == 2
+    assert "no targets" in capsys.readouterr().err
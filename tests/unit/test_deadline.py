@@ -0,0 +1,68 @@
+import json
+
+from emulator_tools import deadline, ledger
+
+
+def test_deadline_needs_enough_history():
+    assert deadline.deadline([10.0] * (deadline.MIN_SAMPLES - 1), ceiling=120) is None
+
+
+def test_deadline_is_high_percentile_plus_margin_within_bounds():
+    samples = [8.0, 9.0, 10.0, 11.0, 12.0, 30.0]
+    # p95 of six samples is the slowest: 30 * 1.5 + 15
+    assert deadline.deadline(samples, ceiling=120) == 60
+    assert deadline.deadline(samples, ceiling=45) == 45
+    assert deadline.deadline([1.0] * 10, ceiling=120) == deadline.FLOOR
+
+
+def test_history_keeps_the_newest_samples(tmp_path):
+    path = str(tmp_path / "nested" / "history.json")
+    for i in range(deadline.MAX_SAMPLES + 5):
+        deadline.add_sample(path, float(i), now=1000 + i)
+    samples = deadline.load_samples(path)
+    assert len(samples) == deadline.MAX_SAMPLES
+    assert samples[0] == 5.0 and samples[-1] == float(deadline.MAX_SAMPLES + 4)
+
+
+def test_key_follows_config_and_runner_image(tmp_path):
+    config = tmp_path / "firebase.json"
+    config.write_text(json.dumps({"emulators": {"firestore": {"port": 8080}}}))
+    manifest = tmp_path / "topology.json"
+
+    def key(image):
+        manifest.write_text(json.dumps({
+            "working_directory": str(tmp_path), "config_path": str(config), "config_found": True,
+            "emulators": {"firestore": {"host": "127.0.0.1", "port": 8080, "configured": True,
+                                        "selected": True}}}))
+        return deadline.history_key(str(manifest), "14.1.0", "Windows-firebase-startup", image=image)
+
+    first = key("win22-20250101")
+    assert first.startswith("Windows-firebase-startup-")
+    assert key("win22-20250101") == first
+    assert key("win25-20250301") != first
+    config.write_text(json.dumps({"emulators": {"firestore": {"port": 8081}}}))
+    assert key("win22-20250101") != first
+
+
+def test_compute_falls_back_to_wait_time(tmp_path, capsys):
+    history = str(tmp_path / "history.json")
+    assert deadline.main(["--history", history, "compute", "--ceiling", "120"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"deadline": 120.0, "adaptive": False,
+                                                   "samples": 0, "slowest": None}
+    for seconds in (9.0, 10.0, 11.0, 12.0, 14.0):
+        deadline.add_sample(history, seconds)
+    assert deadline.main(["--history", history, "compute", "--ceiling", "120"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"deadline": 36, "adaptive": True,
+                                                   "samples": 5, "slowest": 14.0}
+
+
+def test_record_takes_only_successful_waits_from_the_ledger(tmp_path, monkeypatch):
+    ledger_path = tmp_path / "ledger.jsonl"
+    history = str(tmp_path / "history.json")
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+
+    ledger.record(str(ledger_path), deadline.READINESS_STEP, 100.0, 112.5, phase="readiness", ready=True)
+    assert deadline.main(["--history", history, "record"]) == 0
+    ledger.record(str(ledger_path), deadline.READINESS_STEP, 200.0, 320.0, phase="readiness", ready=False)
+    assert deadline.main(["--history", history, "record"]) == 0
+    assert deadline.load_samples(history) == [12.5]
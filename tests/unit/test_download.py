@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+
+import pytest
+
+from emulator_tools import download, ledger
+
+BODY = bytes(range(256)) * 40  # 10240 bytes, every part different
+
+
+def ranged(body, fail=None, cut=None):
+    """
+    Route serving ``body`` with Range support; ``fail(start)`` makes a part error out
+    and ``cut(start)`` sends only half of it after announcing its full length.
+    """
+    def route(handler, _):
+        match = re.match(r"bytes=(\d+)-(\d+)", handler.headers.get("Range") or "")
+        if not match:
+            return 200, body
+        start, end = int(match.group(1)), int(match.group(2))
+        if fail and fail(start):
+            return 503, "Unavailable"
+        headers = {"Content-Range": f"bytes {start}-{end}/{len(body)}", "ETag": '"v1"'}
+        if cut and cut(start):
+            half = body[start:start + (end - start + 1) // 2]
+            return 206, half, dict(headers, **{"Content-Length": str(end - start + 1)})
+        return 206, body[start:end + 1], headers
+    return route
+
+
+def part_requests(server):
+    return [r for r in server.requests if r[0] == "GET"]
+
+
+def test_probe_detects_range_support(fake_server):
+    server = fake_server({"/ranged": ranged(BODY), "/plain": (200, BODY)})
+    info = download.probe(f"http://127.0.0.1:{server.port}/ranged")
+    assert (info.ranges, info.size, info.validator) == (True, len(BODY), '"v1"')
+    info = download.probe(f"http://127.0.0.1:{server.port}/plain")
+    assert (info.ranges, info.size) == (False, len(BODY))
+
+
+def test_parts_are_fetched_concurrently_into_one_file(tmp_path, fake_server):
+    server = fake_server({"/bin": ranged(BODY)})
+    target = tmp_path / "firebase.exe"
+    result = download.download(f"http://127.0.0.1:{server.port}/bin", str(target), part_size=1024,
+                               connections=4, expected_sha256=hashlib.sha256(BODY).hexdigest())
+    assert target.read_bytes() == BODY
+    assert (result.size, result.fetched, result.resumed, result.connections) == (len(BODY), len(BODY), 0, 4)
+    # One probe plus one request per part
+    assert len(part_requests(server)) == 1 + 10
+    assert not (tmp_path / "firebase.exe.partial").exists()
+    assert not (tmp_path / "firebase.exe.partial.json").exists()
+
+
+def test_failed_parts_are_kept_and_resumed(tmp_path, fake_server):
+    broken = {"down": True}
+    server = fake_server({"/bin": ranged(BODY, fail=lambda start: broken["down"] and start >= 5120)})
+    url = f"http://127.0.0.1:{server.port}/bin"
+    target = tmp_path / "firebase.exe"
+
+    with pytest.raises(OSError, match="5 of 10 parts failed"):
+        download.download(url, str(target), part_size=1024, attempts=2)
+    assert not target.exists()
+    state = json.loads((tmp_path / "firebase.exe.partial.json").read_text())
+    assert state["done"] == [0, 1, 2, 3, 4]
+
+    broken["down"] = False
+    server.requests.clear()
+    result = download.download(url, str(target), part_size=1024)
+    assert target.read_bytes() == BODY
+    assert (result.fetched, result.resumed) == (5120, 5120)
+    assert len(part_requests(server)) == 1 + 5
+
+
+def test_truncated_parts_are_retried(tmp_path, fake_server):
+    cuts = set()
+
+    def cut_once(start):
+        if not start or start % 2048 or start in cuts:
+            return False
+        cuts.add(start)
+        return True
+
+    server = fake_server({"/bin": ranged(BODY, cut=cut_once)})
+    target = tmp_path / "firebase.exe"
+    result = download.download(f"http://127.0.0.1:{server.port}/bin", str(target), part_size=1024,
+                               connections=4)
+    assert target.read_bytes() == BODY
+    assert (result.fetched, result.connections) == (len(BODY), 4)
+    assert len(part_requests(server)) == 1 + 10 + 4
+
+
+@pytest.mark.parametrize("route, error", [
+    ((200, BODY[:100], {"Content-Length": str(len(BODY))}), "Short read: got 100 of 10240 bytes"),
+    # A chunked body cut before its last chunk raises http.client.IncompleteRead
+    ((200, b"64\r\n" + BODY[:100] + b"\r\n", {"Transfer-Encoding": "chunked"}), "IncompleteRead"),
+])
+def test_main_fails_cleanly_on_a_truncated_stream(tmp_path, fake_server, capsys, route, error):
+    server = fake_server({"/bin": route})
+    assert download.main([f"http://127.0.0.1:{server.port}/bin", str(tmp_path / "firebase.exe")]) == 1
+    assert f"[ERROR] Download failed: {error}" in capsys.readouterr().out
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_connections_used_are_capped_by_the_parts(tmp_path, fake_server):
+    server = fake_server({"/bin": ranged(BODY)})
+    result = download.download(f"http://127.0.0.1:{server.port}/bin", str(tmp_path / "firebase.exe"),
+                               part_size=4096, connections=8)
+    assert result.connections == 3
+
+
+def test_state_of_another_file_is_not_resumed(tmp_path, fake_server):
+    server = fake_server({"/bin": ranged(BODY)})
+    (tmp_path / "firebase.exe.partial").write_bytes(b"\0" * len(BODY))
+    (tmp_path / "firebase.exe.partial.json").write_text(json.dumps(
+        {"size": len(BODY), "validator": '"v0"', "part_size": 1024, "done": list(range(10))}))
+    result = download.download(f"http://127.0.0.1:{server.port}/bin", str(tmp_path / "firebase.exe"),
+                               part_size=1024)
+    assert (result.fetched, result.resumed) == (len(BODY), 0)
+    assert (tmp_path / "firebase.exe").read_bytes() == BODY
+
+
+def test_checksum_mismatch_discards_the_partial_download(tmp_path, fake_server):
+    server = fake_server({"/bin": ranged(BODY)})
+    target = tmp_path / "firebase.exe"
+    with pytest.raises(download.ChecksumError):
+        download.download(f"http://127.0.0.1:{server.port}/bin", str(target), part_size=1024,
+                          expected_sha256="00" * 32)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_main_reports_throughput(tmp_path, fake_server, monkeypatch, capsys):
+    server = fake_server({"/bin": ranged(BODY)})
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    assert download.main([f"http://127.0.0.1:{server.port}/bin", str(tmp_path / "firebase.exe"),
+                          "--connections", "2"]) == 0
+    # 10 KB fit in one part, so only one of the two connections is opened
+    assert "MB/s over 1 connection(s)" in capsys.readouterr().out
+    entry = json.loads(ledger_path.read_text())
+    assert entry["bytes_downloaded"] == len(BODY)
+    assert "throughput_mb_s" in entry
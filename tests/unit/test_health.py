@@ -0,0 +1,57 @@
+import json
+
+from emulator_tools import health, ledger
+from emulator_tools.probes import Endpoint, probe
+
+
+def test_auth_probe_reads_the_project_config(fake_server):
+    config = {"signIn": {"allowDuplicateEmails": False}}
+    server = fake_server({"/emulator/v1/projects/demo-app/config": (200, config)})
+    assert probe(Endpoint("auth", "127.0.0.1", server.port), project="demo-app").ok
+    assert not probe(Endpoint("auth", "127.0.0.1", server.port), project="other").ok
+
+
+def test_summary_reports_latency_and_cold_starts(fake_hub, fake_server, tmp_path, monkeypatch, capsys):
+    functions = fake_server({"/": (200, "")})
+    hub = fake_hub.routes["/emulators"][1]
+    hub["functions"] = {"name": "functions", "host": "127.0.0.1", "port": functions.port}
+    warmup = tmp_path / "warmup.json"
+    warmup.write_text(json.dumps([{"id": "us-central1-hello", "ok": True, "cold_start_ms": 2100.5}]))
+    output = tmp_path / "health.json"
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+
+    args = ["--hub-port", str(fake_hub.port), "--warmup", str(warmup), "--output", str(output)]
+    assert health.main(args) == 0
+    summary = {entry["Name"]: entry for entry in json.loads(output.read_text())}
+    assert set(summary) == {"hub", "firestore", "functions"}
+    assert all(e["Running"] and e["ConnectMs"] is not None and e["ResponseMs"] >= e["ConnectMs"]
+               for e in summary.values())
+    assert summary["firestore"]["Status"] == 200
+    assert summary["functions"]["ColdStarts"] == [
+        {"Function": "us-central1-hello", "Warm": True, "ColdStartMs": 2100.5}]
+    assert "ColdStarts" not in summary["firestore"]
+    assert {json.loads(line)["phase"] for line in ledger_path.read_text().splitlines()} == set(summary)
+    out = capsys.readouterr().out
+    assert "[SUCCESS] All 3 emulator(s) are running!" in out
+    assert "Slowest to answer:" in out
+
+
+def test_unreachable_emulator_is_reported_not_fatal(fake_hub, fake_server, tmp_path, capsys):
+    closed = fake_server()
+    port = closed.port
+    closed.close()
+    fake_hub.routes["/emulators"][1]["auth"] = {"name": "auth", "host": "127.0.0.1", "port": port}
+    output = tmp_path / "health.json"
+    assert health.main(["--hub-port", str(fake_hub.port), "--timeout", "1", "--output", str(output)]) == 0
+    auth = next(e for e in json.loads(output.read_text()) if e["Name"] == "auth")
+    assert not auth["Running"] and auth["ConnectMs"] is None
+    assert "[WARNING] 2/3 emulator(s) accessible" in capsys.readouterr().out
+
+
+def test_missing_hub_fails(fake_server, capsys):
+    closed = fake_server()
+    port = closed.port
+    closed.close()
+    assert health.main(["--hub-port", str(port), "--timeout", "1"]) == 1
+    assert "Failed to connect to Emulator Hub" in capsys.readouterr().out
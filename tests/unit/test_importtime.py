@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+
+from emulator_tools import importtime, ledger
+
+SITE = os.path.join(os.path.dirname(importtime.__file__), "importtime_site")
+
+PROFILE = """\
+# cwd: {cwd}
+# argv: functions_framework
+import time: self [us] | cumulative | imported package
+import time:       400 |        400 |     google.auth.crypt
+import time:      1200 |       1600 |   google.auth
+import time:     90000 |      91600 | firebase_admin
+import time:       300 |        300 | main
+"""
+
+
+def write_profile(path, cwd, **replace):
+    text = PROFILE.format(cwd=cwd)
+    for old, new in replace.items():
+        text = text.replace(old, new)
+    path.write_text(text)
+
+
+def test_parse_reads_depth_and_totals(tmp_path):
+    process = importtime.parse("p", PROFILE.format(cwd="/src/functions").splitlines())
+    assert process.cwd == "/src/functions"
+    assert [(i.name, i.depth) for i in process.imports] == [
+        ("google.auth.crypt", 2), ("google.auth", 1), ("firebase_admin", 0), ("main", 0)]
+    assert process.total_us == 91900
+
+
+def test_sitecustomize_traces_imports_to_a_file(tmp_path):
+    env = dict(os.environ, PYTHONPATH=SITE, **{importtime.PROFILE_ENV: str(tmp_path)})
+    subprocess.run([sys.executable, "-c", "import json"], env=env, check=True, cwd=str(tmp_path))
+    [process] = importtime.read([str(tmp_path)])
+    assert os.path.samefile(process.cwd, str(tmp_path))
+    assert any(i.name == "json" and i.depth == 0 for i in process.imports)
+    assert any(i.name == "json.decoder" and i.depth == 1 for i in process.imports)
+
+
+def test_report_groups_workers_by_codebase(tmp_path, monkeypatch, capsys):
+    functions = tmp_path / "functions"
+    api = tmp_path / "api"
+    manifest = tmp_path / "topology.json"
+    manifest.write_text(json.dumps({
+        "working_directory": str(tmp_path), "config_path": "firebase.json", "config_found": True,
+        "functions": [{"codebase": "default", "source": "functions", "dir": str(functions), "runtime": "python312"},
+                      {"codebase": "api", "source": "api", "dir": str(api), "runtime": "python312"}]}))
+    profiles = tmp_path / "profiles"
+    profiles.mkdir()
+    write_profile(profiles / "imports-1.txt", functions)
+    write_profile(profiles / "imports-2.txt", functions, **{"91600": "191600"})
+    write_profile(profiles / "imports-3.txt", api)
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+
+    assert importtime.main([str(profiles), "--topology", str(manifest), "--top", "2"]) == 0
+    out = capsys.readouterr().out
+    assert "Codebase default: 2 Python process(es), import time max 0.192s" in out
+    assert "Codebase api: 1 Python process(es)" in out
+    assert "[TIMING] default import time: 0.192s" in out
+    records = {r["phase"]: r for r in map(json.loads, ledger_path.read_text().splitlines())}
+    assert records["default"]["top_modules"][0] == "firebase_admin"
+    assert records["default"]["processes"] == 2
+
+
+def test_no_profiles_is_not_an_error(tmp_path, capsys):
+    assert importtime.main([str(tmp_path)]) == 0
+    assert "No import-time profiles" in capsys.readouterr().out
@@ -0,0 +1,103 @@
+import json
+import sys
+
+from emulator_tools import install, ledger
+from emulator_tools.topology import Codebase
+
+
+def codebase(tmp_path, name, runtime):
+    directory = tmp_path / name
+    directory.mkdir()
+    return Codebase(name, name, str(directory), runtime)
+
+
+def test_plan_per_runtime(tmp_path):
+    node = install.plan(codebase(tmp_path, "web", "node"), npm="npm")
+    assert node.commands == [["npm", "install"]]
+
+    api = codebase(tmp_path, "api", "python")
+    assert install.plan(api, uv="uv").commands == [
+        ["uv", "venv", "venv", "--python", "3.12"],
+        ["uv", "pip", "install", "--python", "venv", "-r", "requirements.txt"]]
+    (tmp_path / "api" / "venv").mkdir()
+    assert install.plan(api, uv="uv").commands[0][:3] == ["uv", "pip", "install"]
+    assert install.plan(api).tool == "pip"
+
+    assert install.plan(codebase(tmp_path, "empty", None)) is None
+
+
+def test_installs_run_concurrently_and_stop_on_failure(tmp_path):
+    sleep = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+    fail = [sys.executable, "-c", "import sys; sys.exit(3)"]
+    installs = [
+        install.Install(codebase(tmp_path, "a", "node"), "npm", [sleep]),
+        install.Install(codebase(tmp_path, "b", "python"), "uv", [sleep]),
+        install.Install(codebase(tmp_path, "c", "python"), "uv", [fail, sleep]),
+    ]
+    results = install.run_all(installs)
+
+    assert [r.install.codebase.codebase for r in results] == ["a", "b", "c"]
+    assert [r.returncode for r in results] == [0, 0, 3]
+    wall = max(r.end for r in results) - min(r.start for r in results)
+    assert wall < results[0].duration + results[1].duration
+    assert results[2].duration < 0.5
+
+
+def write_manifest(tmp_path):
+    manifest = tmp_path / "topology.json"
+    manifest.write_text(json.dumps({
+        "working_directory": str(tmp_path), "config_path": "", "config_found": True,
+        "functions": [
+            {"codebase": "default", "source": "functions", "dir": str(tmp_path / "functions"),
+             "runtime": "node"},
+            {"codebase": "api", "source": "api", "dir": str(tmp_path / "api"), "runtime": "python"},
+            {"codebase": "docs", "source": "docs", "dir": str(tmp_path / "docs"), "runtime": None},
+        ],
+    }))
+    return manifest
+
+
+def test_main_records_each_codebase(tmp_path, monkeypatch):
+    manifest = write_manifest(tmp_path)
+    ledger_path = tmp_path / "timing.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    monkeypatch.setattr(install.shutil, "which", lambda name: name)
+    ran = []
+    monkeypatch.setattr(install, "run", lambda i: ran.append(i.tool) or install.Result(i, 1.0, 2.0, 0))
+
+    assert install.main(["--topology", str(manifest), "run"]) == 0
+    assert sorted(ran) == ["npm", "uv"]
+    assert [e["phase"] for e in ledger.read(str(ledger_path))] == [
+        "functions npm install", "api uv install"]
+
+
+def test_cache_key_follows_lockfiles_and_interpreters(tmp_path):
+    web = codebase(tmp_path, "web", "node")
+    (tmp_path / "web" / "package.json").write_text('{"name": "web"}')
+    installs = [install.plan(web, npm="npm")]
+    node20 = {"npm": "v20.11.0"}
+
+    key = install.cache_key(installs, node20, "Windows-functions-deps")
+    assert key.startswith("Windows-functions-deps-")
+    assert install.cache_key(installs, node20, "Windows-functions-deps") == key
+    assert install.cache_key(installs, {"npm": "v22.1.0"}, "Windows-functions-deps") != key
+
+    # A lockfile takes precedence over package.json
+    (tmp_path / "web" / "package-lock.json").write_text('{"lockfileVersion": 3}')
+    assert install.lockfile(web).endswith("package-lock.json")
+    assert install.cache_key(installs, node20, "Windows-functions-deps") != key
+
+
+def test_cache_hit_skips_restored_environments(tmp_path, monkeypatch, capsys):
+    manifest = write_manifest(tmp_path)
+    (tmp_path / "functions" / "node_modules" / "firebase-functions").mkdir(parents=True)
+    monkeypatch.setattr(install.shutil, "which", lambda name: name)
+    monkeypatch.setattr(install, "_version", lambda command: None)  # venv python does not start
+    ran = []
+    monkeypatch.setattr(install, "run", lambda i: ran.append(i.tool) or install.Result(i, 1.0, 2.0, 0))
+
+    assert install.main(["--topology", str(manifest), "run", "--cache-hit", "true"]) == 0
+    assert ran == ["uv"]
+    out = capsys.readouterr().out
+    assert "functions: node_modules restored from cache" in out
+    assert "api: cached environment is not usable" in out
@@ -0,0 +1,58 @@
+import json
+
+from emulator_tools import ledger
+
+
+def test_record_appends_json_lines(tmp_path):
+    path = tmp_path / "timing.jsonl"
+    ledger.record(str(path), "Download Firebase CLI", 100.0, 103.25, phase="download",
+                  cache_hit=False, bytes_downloaded=2048)
+    ledger.record(str(path), "Download Firebase CLI", 99.0, 104.0)
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    first = json.loads(lines[0])
+    assert first["phase"] == "download"
+    assert first["duration"] == 3.25
+    assert first["bytes_downloaded"] == 2048
+    assert first["start"] == "1970-01-01T00:01:40.000Z"
+
+
+def test_record_without_path_is_not_written(tmp_path):
+    entry = ledger.record(None, "Install NSSM", 0.0, 1.0)
+    assert entry["duration"] == 1.0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_timed_uses_env_and_collects_fields(tmp_path, monkeypatch):
+    path = tmp_path / "timing.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(path))
+    with ledger.timed("Wait for Emulators to be Ready", phase="readiness") as fields:
+        fields["ready"] = True
+
+    (entry,) = ledger.read(str(path))
+    assert entry["step"] == "Wait for Emulators to be Ready"
+    assert entry["ready"] is True
+    assert entry["cache_hit"] is None
+
+
+def test_read_handles_bom_and_bad_lines(tmp_path):
+    # Windows PowerShell writes a BOM with -Encoding utf8
+    path = tmp_path / "timing.jsonl"
+    path.write_bytes(b'\xef\xbb\xbf{"step": "Install NSSM", "duration": 1.5}\r\nnot json\r\n\r\n')
+    assert ledger.read(str(path)) == [{"step": "Install NSSM", "duration": 1.5}]
+    assert ledger.read(str(tmp_path / "missing.jsonl")) == []
+
+
+def test_summary_lists_step_before_its_phases():
+    entries = [
+        {"step": "Setup Java", "phase": None, "duration": 2.0},
+        {"step": "Download Firebase CLI", "phase": "download", "duration": 3.0,
+         "cache_hit": False, "bytes_downloaded": 3 * 1024 * 1024},
+        {"step": "Download Firebase CLI", "phase": None, "duration": 3.5},
+    ]
+    lines = ledger.format_summary(entries).splitlines()
+    assert lines[2].startswith("Setup Java")
+    assert lines[3].startswith("Download Firebase CLI")
+    assert lines[4].startswith("  download")
+    assert lines[4].endswith("cache miss, 3.00 MB")
@@ -0,0 +1,84 @@
+from emulator_tools import readiness
+from emulator_tools.logwatch import LogFollower, LogWatcher
+
+BANNER = "│ \x1b[32m✔\x1b[39m  \x1b[1mAll emulators ready! It is now safe to connect your app.\x1b[22m │\n"
+
+
+def test_follower_returns_only_new_complete_lines(tmp_path):
+    log = tmp_path / "emulator-stdout.log"
+    follower = LogFollower(str(log))
+    assert follower.poll() == []
+
+    log.write_bytes(b"i  emulators: Starting emulators: auth\n+  auth: partial")
+    assert follower.poll() == ["i  emulators: Starting emulators: auth"]
+    with open(log, "ab") as f:
+        f.write(b" line\r\n")
+    assert follower.poll() == ["+  auth: partial line"]
+    assert follower.poll() == []
+
+
+def test_follower_restarts_after_truncation(tmp_path):
+    log = tmp_path / "emulator-stdout.log"
+    log.write_text("first run line\n")
+    follower = LogFollower(str(log))
+    follower.poll()
+    log.write_text("new\n")
+    assert follower.poll() == ["new"]
+
+
+def test_watcher_detects_banner_and_started_lines():
+    watcher = LogWatcher()
+    watcher.feed("+  firestore: Firestore Emulator UI websocket is running on 9150.")
+    watcher.feed("+  functions[us-central1-hello]: http function initialized (http://127.0.0.1:5001/p/us-central1/hello).")
+    assert set(watcher.started) == {"firestore", "functions"}
+    assert not watcher.ready
+    watcher.feed("│ ✔  All emulators ready! It is now safe to connect your app. │")
+    assert watcher.ready
+
+
+def test_readiness_resolves_from_log_without_hub_traffic(tmp_path, fake_hub):
+    log = tmp_path / "emulator-stdout.log"
+    log.write_text("i  emulators: Starting emulators: firestore\n" + BANNER, encoding="utf-8")
+    result = readiness.wait_for_ready(hub_port=fake_hub.port, timeout=5, log_path=str(log))
+    assert result.ready
+    assert result.source == "log"
+    assert fake_hub.requests == []
+
+
+def test_readiness_falls_back_to_hub_without_banner(tmp_path, fake_hub):
+    log = tmp_path / "emulator-stdout.log"
+    log.write_text("i  emulators: Starting emulators: firestore\n")
+    result = readiness.wait_for_ready(hub_port=fake_hub.port, timeout=5, log_path=str(log),
+                                      fallback_after=0.1)
+    assert result.ready
+    assert result.source == "hub"
+
+
+def test_watcher_flags_port_conflict_with_excerpt():
+    watcher = LogWatcher()
+    watcher.feed("i  emulators: Starting emulators: auth, firestore")
+    watcher.feed("!  firestore: Port 8080 is not open on localhost (127.0.0.1), could not start Firestore Emulator.")
+    assert watcher.fatal.startswith("stdout: !  firestore: Port 8080")
+    assert watcher.excerpt[0] == "i  emulators: Starting emulators: auth, firestore"
+
+
+def test_readiness_fails_fast_on_fatal_stderr(tmp_path, fake_hub):
+    stdout = tmp_path / "emulator-stdout.log"
+    stderr = tmp_path / "emulator-stderr.log"
+    stdout.write_text("i  emulators: Starting emulators: firestore\n")
+    stderr.write_text("Error: Could not spawn `java -version`. Please make sure Java is installed.\n")
+    result = readiness.wait_for_ready(hub_port=fake_hub.port, timeout=30, log_path=str(stdout),
+                                      stderr_path=str(stderr))
+    assert result.crashed
+    assert result.elapsed < 1
+    assert "java -version" in result.excerpt[-1]
+
+
+def test_readiness_fails_fast_when_service_stops(tmp_path, fake_hub):
+    stdout = tmp_path / "emulator-stdout.log"
+    stdout.write_text("i  emulators: Starting emulators: firestore\n")
+    result = readiness.wait_for_ready(hub_port=fake_hub.port, timeout=30, log_path=str(stdout),
+                                      service_name="FirebaseEmulator",
+                                      state_query=lambda name: "STOPPED")
+    assert result.crashed
+    assert result.reason == "service FirebaseEmulator is STOPPED"
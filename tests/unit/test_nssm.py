@@ -0,0 +1,134 @@
+import hashlib
+import io
+import zipfile
+
+import pytest
+
+from emulator_tools import ledger, nssm
+
+BINARY = b"MZ nssm"
+FETCH_PINNED = nssm.fetch_pinned
+
+
+@pytest.fixture(autouse=True)
+def pin(monkeypatch):
+    """Pin the test binary in place of the published NSSM digests."""
+    monkeypatch.setattr(nssm, "NSSM_SHA256", hashlib.sha256(BINARY).hexdigest())
+    monkeypatch.setattr(nssm, "NSSM_ARCHIVE_SHA256", "00" * 32)
+    monkeypatch.setattr(nssm, "fetch_pinned", lambda cache_dir: None)
+
+
+def make_exe(path, content=BINARY):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def chocolatey(tmp_path, monkeypatch):
+    choco = tmp_path / "chocolatey"
+    monkeypatch.setenv("ChocolateyInstall", str(choco))
+    monkeypatch.setenv("ProgramFiles", str(tmp_path / "Program Files"))
+    monkeypatch.setattr(nssm.shutil, "which", lambda name: None)
+    return choco
+
+
+def test_known_locations_prefer_real_64_bit_binary(tmp_path, monkeypatch):
+    choco = chocolatey(tmp_path, monkeypatch)
+    shim = make_exe(choco / "bin" / "nssm.exe")
+    win32 = make_exe(choco / "lib" / "nssm" / "tools" / "nssm-2.24-101" / "win32" / "nssm.exe")
+    win64 = make_exe(choco / "lib" / "nssm" / "tools" / "nssm-2.24-101" / "win64" / "nssm.exe")
+
+    assert nssm.known_locations() == [str(win64), str(win32), str(shim)]
+    assert nssm.is_shim(str(shim))
+    assert not nssm.is_shim(str(win64))
+
+
+def test_cached_copy_is_verified_against_the_pin(tmp_path):
+    cache = tmp_path / "cache"
+    assert nssm.store(str(make_exe(tmp_path / "nssm.exe")), str(cache)) == str(cache / "nssm.exe")
+    assert nssm.cached(str(cache)) == str(cache / "nssm.exe")
+
+    (cache / "nssm.exe").write_bytes(b"truncated")
+    assert nssm.cached(str(cache)) is None
+    assert list(cache.iterdir()) == []
+
+
+def test_other_builds_are_not_cached(tmp_path, monkeypatch):
+    other = make_exe(tmp_path / "nssm.exe", b"MZ nssm 2.24")
+    assert nssm.store(str(other), str(tmp_path / "cache")) is None
+    monkeypatch.setattr(nssm, "NSSM_SHA256", "")
+    assert nssm.store(str(make_exe(tmp_path / "nssm.exe")), str(tmp_path / "cache")) is None
+    assert not (tmp_path / "cache").exists()
+
+
+def test_known_location_is_used_and_cached_without_choco(tmp_path, monkeypatch):
+    choco = chocolatey(tmp_path, monkeypatch)
+    binary = make_exe(choco / "lib" / "nssm" / "tools" / "nssm.exe")
+    monkeypatch.setattr(nssm, "choco_install", lambda: pytest_fail("choco must not run"))
+    github_path = tmp_path / "github_path"
+    monkeypatch.setenv("GITHUB_PATH", str(github_path))
+    ledger_path = tmp_path / "timing.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    cache = tmp_path / "cache"
+
+    assert nssm.main(["--cache-dir", str(cache)]) == 0
+    assert github_path.read_text().splitlines() == [str(binary.parent)]
+    assert (cache / "nssm.exe").read_bytes() == binary.read_bytes()
+    (entry,) = ledger.read(str(ledger_path))
+    assert entry["phase"] == "nssm from known location"
+
+    # A runner without NSSM uses the cached copy
+    binary.unlink()
+    assert nssm.resolve(str(cache)) == (str(cache / "nssm.exe"), "action cache")
+
+
+def test_cached_binary_is_not_copied_again(tmp_path, monkeypatch):
+    choco = chocolatey(tmp_path, monkeypatch)
+    make_exe(choco / "lib" / "nssm" / "tools" / "nssm.exe")
+    cache = tmp_path / "cache"
+    make_exe(cache / "nssm.exe")
+    monkeypatch.setattr(nssm, "store", lambda path, cache_dir: pytest_fail("cache is already filled"))
+    assert nssm.main(["--cache-dir", str(cache)]) == 0
+
+
+def test_pinned_release_is_downloaded_before_chocolatey(tmp_path, monkeypatch, fake_server):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr(nssm.NSSM_MEMBER, BINARY)
+    server = fake_server({"/nssm.zip": (200, archive.getvalue())})
+    chocolatey(tmp_path, monkeypatch)
+    monkeypatch.setattr(nssm, "fetch_pinned", FETCH_PINNED)
+    monkeypatch.setattr(nssm, "NSSM_ARCHIVE_SHA256", hashlib.sha256(archive.getvalue()).hexdigest())
+    monkeypatch.setattr(nssm, "NSSM_URL", f"http://127.0.0.1:{server.port}/nssm.zip")
+    monkeypatch.setattr(nssm, "choco_install", lambda: pytest_fail("choco must not run"))
+
+    cache = tmp_path / "cache"
+    assert nssm.resolve(str(cache)) == (str(cache / "nssm.exe"), "pinned release")
+    assert sorted(p.name for p in cache.iterdir()) == ["nssm.exe"]
+
+    # A tampered release is rejected and Chocolatey takes over
+    (cache / "nssm.exe").unlink()
+    monkeypatch.setattr(nssm, "NSSM_ARCHIVE_SHA256", "00" * 32)
+    monkeypatch.setattr(nssm, "choco_install", lambda: False)
+    assert nssm.resolve(str(cache)) == (None, "not found")
+    assert list(cache.iterdir()) == []
+
+
+def test_chocolatey_is_the_last_resort(tmp_path, monkeypatch):
+    choco = chocolatey(tmp_path, monkeypatch)
+    installed = []
+
+    def choco_install():
+        installed.append(True)
+        make_exe(choco / "lib" / "nssm" / "tools" / "nssm.exe")
+        return True
+
+    monkeypatch.setattr(nssm, "choco_install", choco_install)
+    assert nssm.resolve(str(tmp_path / "cache"), allow_choco=False) == (None, "not found")
+    assert installed == []
+    path, source = nssm.resolve(str(tmp_path / "cache"))
+    assert source == "chocolatey" and installed == [True]
+
+
+def pytest_fail(message):
+    raise AssertionError(message)
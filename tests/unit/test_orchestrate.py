@@ -0,0 +1,54 @@
+import sys
+
+from emulator_tools import download, ledger, orchestrate
+
+
+def test_plan_skips_work_already_done(tmp_path, monkeypatch):
+    firebase = tmp_path / "firebase.exe"
+    monkeypatch.setattr(orchestrate.shutil, "which", lambda name: None)
+    phases = orchestrate.plan(str(firebase), "https://example.invalid/firebase", [], "nssm-cache")
+    assert [p.name for p in phases] == ["firebase cli", "functions dependencies", "nssm"]
+    assert phases[0].commands[0][2] == "emulator_tools.download"
+
+    pinned = orchestrate.plan(str(firebase), "https://example.invalid/firebase", [], "nssm-cache",
+                              release_index="index.json", release_version="14.1.0")
+    assert pinned[0].commands[1][2:] == ["emulator_tools.release", "--index", "index.json",
+                                         "record", "14.1.0", str(firebase)]
+
+    firebase.write_bytes(b"MZ")
+    monkeypatch.setattr(orchestrate.shutil, "which", lambda name: "C:\\nssm.exe")
+    phases = orchestrate.plan(str(firebase), "https://example.invalid/firebase", ["--cache-hit", "true"],
+                              "nssm-cache")
+    assert [p.name for p in phases] == ["firebase cli", "functions dependencies"]
+    assert phases[0].commands[0] == [str(firebase), "--version"]
+    assert "prefetch" in phases[0].commands[1]
+    assert phases[1].commands[0][-2:] == ["--cache-hit", "true"]
+
+
+def test_phases_overlap_and_are_recorded(tmp_path, monkeypatch, capsys):
+    ledger_path = tmp_path / "timing.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    sleep = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+    monkeypatch.setattr(orchestrate, "plan", lambda *args, **kwargs: [
+        orchestrate.Phase("firebase cli", [sleep]),
+        orchestrate.Phase("nssm", [sleep]),
+    ])
+
+    assert orchestrate.main(["--firebase-bin", "firebase.exe", "--download-url", "https://example.invalid"]) == 0
+    first, second = ledger.read(str(ledger_path))
+    assert (first["phase"], second["phase"]) == ("firebase cli", "nssm")
+    # Both phases were running at the same time
+    assert first["start"] < second["end"] and second["start"] < first["end"]
+    assert "Parallel setup:" in capsys.readouterr().out
+
+
+def test_download_replaces_target_only_when_complete(tmp_path, fake_server):
+    server = fake_server({"/bin": (200, b"x" * 3000)})
+    target = tmp_path / "firebase.exe"
+    assert download.download(f"http://127.0.0.1:{server.port}/bin", str(target)).size == 3000
+    assert target.read_bytes() == b"x" * 3000
+
+    assert download.main([f"http://127.0.0.1:{server.port}/missing", str(target)]) == 1
+    assert download.main([f"http://127.0.0.1:{server.port}/bin", str(target), "--sha256", "00" * 32]) == 1
+    assert target.read_bytes() == b"x" * 3000
+    assert not (tmp_path / "firebase.exe.partial").exists()
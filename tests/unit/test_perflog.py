@@ -0,0 +1,73 @@
+from emulator_tools import perflog
+
+JOB = "Performance Test - Default Ports"
+STEP = "Setup Firebase Emulator (Default Ports)"
+ECHO = "\x1b[36;1m"
+
+
+def log_lines(nssm_seconds=4.618, wait_end="10:13:43.2256586"):
+    rows = [
+        ("Set up job", "﻿2025-11-24T10:11:41.1665392Z Current runner version: '2.329.0'"),
+        ("Set up job", "2025-11-24T10:11:41.8000000Z Complete"),
+        (STEP, "2025-11-24T10:12:34.5356287Z ##[group]Run $stepStart = Get-Date"),
+        (STEP, f"2025-11-24T10:12:34.5356500Z {ECHO}$stepStart = Get-Date\x1b[0m"),
+        (STEP, f"2025-11-24T10:12:34.5356600Z {ECHO}Write-Host \"====\" -ForegroundColor Cyan\x1b[0m"),
+        (STEP, f"2025-11-24T10:12:34.5356700Z {ECHO}Write-Host \"Installing NSSM...\" -ForegroundColor Cyan\x1b[0m"),
+        (STEP, f"2025-11-24T10:12:34.5356800Z {ECHO}Write-Host \"[TIMING] choco install Duration: "
+               f"$($t)s\"\x1b[0m"),
+        (STEP, "2025-11-24T10:12:34.5360900Z ##[endgroup]"),
+        (STEP, f"2025-11-24T10:12:39.4965820Z [TIMING] choco install Duration: {nssm_seconds}s"),
+        (STEP, "2025-11-24T10:12:39.4985889Z [TIMING] Step Duration: 4.639s"),
+        (STEP, "2025-11-24T10:12:42.7727860Z ##[group]Run $stepStart = Get-Date"),
+        (STEP, f"2025-11-24T10:12:42.7728129Z {ECHO}$stepStart = Get-Date\x1b[0m"),
+        (STEP, f"2025-11-24T10:12:42.7729071Z {ECHO}$waitTime = [int]\"60\"\x1b[0m"),
+        (STEP, "2025-11-24T10:12:42.7800000Z ##[endgroup]"),
+        (STEP, f"2025-11-24T{wait_end}Z [TIMING] Step Duration: 60.015s"),
+    ]
+    return [f"{JOB}\t{step}\t{rest}\n" for step, rest in rows]
+
+
+def test_parse_builds_steps_substeps_and_markers():
+    timeline = perflog.parse(log_lines())
+    setup, step = timeline[JOB]
+    assert setup.name == "Set up job"
+    assert round(setup.duration, 3) == 0.633
+
+    nssm, wait = step.substeps
+    assert nssm.name == "Installing NSSM..."
+    assert [(m.label, m.seconds) for m in nssm.markers] == [
+        ("choco install Duration", 4.618), ("Step Duration", 4.639)]
+    assert wait.name == '$waitTime = [int]"60"'
+    assert round(wait.duration, 3) == 60.453
+    assert round(step.duration, 3) == round(nssm.duration + wait.duration, 3)
+
+
+def test_phases_are_keyed_by_path():
+    keys = perflog.phases(perflog.parse(log_lines()))
+    assert keys[f"{JOB} > {STEP} > Installing NSSM... > choco install Duration"] == 4.618
+    assert f"{JOB} > Set up job" in keys
+
+
+def test_select_matches_one_level_per_glob():
+    changes = perflog.compare({}, perflog.phases(perflog.parse(log_lines())))
+    selected = perflog.select(changes, ["* > Setup Firebase Emulator*"])
+    assert [c.phase for c in selected] == [f"{JOB} > {STEP}"]
+
+
+def test_regression_needs_both_threshold_and_min_delta():
+    assert perflog.Change("p", 10.0, 13.0).regressed(threshold=20, min_delta=1)
+    assert not perflog.Change("p", 10.0, 13.0).regressed(threshold=50, min_delta=1)
+    assert not perflog.Change("p", 1.0, 1.5).regressed(threshold=20, min_delta=1)
+    assert not perflog.Change("p", None, 30.0).regressed(threshold=20, min_delta=1)
+
+
+def test_compare_exit_code(tmp_path, capsys):
+    baseline = tmp_path / "baseline.txt"
+    candidate = tmp_path / "candidate.txt"
+    baseline.write_text("".join(log_lines()), encoding="utf-8")
+    candidate.write_text("".join(log_lines(nssm_seconds=19.2)), encoding="utf-8")
+    gate = ["--phase", "* > * > Installing NSSM* > choco*", "--threshold", "25"]
+
+    assert perflog.main(["compare", str(baseline), str(baseline)] + gate) == 0
+    assert perflog.main(["compare", str(baseline), str(candidate)] + gate) == 1
+    assert "[ERROR]" in capsys.readouterr().out
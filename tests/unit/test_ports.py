@@ -0,0 +1,110 @@
+import json
+import socket
+
+import pytest
+
+from emulator_tools import ports, topology
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def write_project(tmp_path, emulators):
+    config = tmp_path / "firebase.json"
+    config.write_text(json.dumps({"emulators": emulators, "firestore": {"rules": "firestore.rules"}}))
+    manifest = tmp_path / "topology.json"
+    resolved = topology.resolve(str(tmp_path), "firebase.json", "firestore,auth", cwd=str(tmp_path))
+    manifest.write_text(json.dumps(resolved.to_dict()))
+    return config, manifest
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_needed_includes_support_and_websocket_ports(tmp_path):
+    _, manifest = write_project(tmp_path, {"firestore": {"port": 8888, "websocketPort": 9155}})
+    keys = {p.key: p.port for p in ports.needed(topology.load(str(manifest)),
+                                                 json.loads((tmp_path / "firebase.json").read_text()))}
+    assert keys["firestore"] == 8888 and keys["firestore.websocketPort"] == 9155
+    assert {"hub", "logging", "ui", "auth"} <= set(keys)
+    assert "storage" not in keys
+
+
+def test_duplicates_within_the_config_conflict():
+    planned = [ports.Port("auth", "port", "127.0.0.1", 9099), ports.Port("storage", "port", "127.0.0.1", 9099)]
+    assert [p.key for p in ports.conflicts(planned, free=lambda host, port: True)] == ["storage"]
+
+
+def test_find_free_starts_at_the_seeded_block():
+    taken = {20100, 20101}
+    found = ports.find_free("127.0.0.1", 3, [20102], start=20000, end=20300, block=100, seed=1,
+                            free=lambda host, port: port not in taken)
+    assert found == [20103, 20104, 20105]
+    with pytest.raises(ports.PortError):
+        ports.find_free("127.0.0.1", 5, [], start=20000, end=20004, block=4, free=lambda host, port: True)
+
+
+def test_taken_ports_are_checked_on_their_own_host():
+    taken = [ports.Port("firestore", "port", "127.0.0.1", 8080), ports.Port("auth", "port", "0.0.0.0", 9099),
+             ports.Port("hub", "port", "127.0.0.1", 4400)]
+    busy = {("127.0.0.1", 20001)}
+    checked = []
+
+    def free(host, port):
+        checked.append((host, port))
+        return (host, port) not in busy
+
+    moves = ports.moves_for(taken, [8080, 9099, 4400], start=20000, end=20010, block=10, free=free)
+    assert moves == {"firestore": 20000, "hub": 20002, "auth": 20001}
+    # 20001 is only busy on 127.0.0.1, so the 0.0.0.0 port may take it
+    assert ("0.0.0.0", 20001) in checked
+
+
+def test_taken_port_is_remapped_into_a_derived_config(tmp_path, listener, capsys):
+    config, manifest = write_project(tmp_path, {
+        "firestore": {"port": listener, "websocketPort": free_port()},
+        "auth": {"port": free_port()}, "hub": {"port": free_port()},
+        "logging": {"port": free_port()}, "ui": {"enabled": False}})
+
+    assert ports.main(["--topology", str(manifest), "--range", "30000-40000"]) == 0
+    updated = topology.load(str(manifest))
+    moved = updated.emulators["firestore"].port
+    assert moved != listener and 30000 <= moved < 40000
+    assert updated.remapped == {"firestore": listener}
+    assert updated.env["FIRESTORE_EMULATOR_HOST"] == f"127.0.0.1:{moved}"
+    assert updated.config_path == str(tmp_path / ports.DERIVED_CONFIG)
+    derived = json.loads((tmp_path / ports.DERIVED_CONFIG).read_text())
+    assert derived["emulators"]["firestore"]["port"] == moved
+    assert derived["firestore"] == {"rules": "firestore.rules"}
+    assert json.loads(config.read_text())["emulators"]["firestore"]["port"] == listener
+    assert f"firestore: {listener} -> {moved}" in capsys.readouterr().out
+
+    assert ports.main(["--topology", str(manifest), "--clean"]) == 0
+    assert not (tmp_path / ports.DERIVED_CONFIG).exists()
+    assert config.exists()
+    assert ports.main(["--topology", str(manifest), "--clean"]) == 0
+    assert ports.main(["--topology", str(tmp_path / "missing.json"), "--clean"]) == 0
+
+
+def test_check_only_fails_fast_and_free_ports_change_nothing(tmp_path, listener):
+    _, manifest = write_project(tmp_path, {"firestore": {"port": listener}})
+    before = manifest.read_text()
+    assert ports.main(["--topology", str(manifest), "--check-only"]) == 1
+    assert manifest.read_text() == before
+
+    _, manifest = write_project(tmp_path, {
+        "firestore": {"port": free_port(), "websocketPort": free_port()}, "auth": {"port": free_port()},
+        "hub": {"port": free_port()}, "logging": {"port": free_port()}, "ui": {"port": free_port()}})
+    before = manifest.read_text()
+    assert ports.main(["--topology", str(manifest)]) == 0
+    assert manifest.read_text() == before
+    assert not (tmp_path / ports.DERIVED_CONFIG).exists()
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from emulator_tools import pytest_plugin, topology
+
+
+def write_manifest(path, emulators):
+    path.write_text(json.dumps({"working_directory": ".", "config_path": "firebase.json", "config_found": True,
+                                "emulators": emulators}))
+    return str(path)
+
+
+def test_endpoints_prefer_exported_variables_over_manifest(tmp_path):
+    manifest = write_manifest(tmp_path / "topology.json", {
+        "functions": {"host": "0.0.0.0", "port": 5101, "configured": True, "selected": True},
+        "auth": {"host": "127.0.0.1", "port": 9199, "configured": True, "selected": True}})
+    environ = {topology.TOPOLOGY_ENV: manifest, "FIREBASE_AUTH_EMULATOR_HOST": "localhost:9299"}
+    found = pytest_plugin.endpoints(environ)
+    assert found["functions"] == "http://127.0.0.1:5101"
+    assert found["auth"] == "http://localhost:9299"
+    assert found["firestore"] == "http://127.0.0.1:8080"
+
+
+def test_expected_emulators_skips_support_emulators(tmp_path):
+    manifest = write_manifest(tmp_path / "topology.json", {
+        "firestore": {"host": "127.0.0.1", "port": 8080, "configured": True, "selected": True},
+        "ui": {"host": "127.0.0.1", "port": 4000, "configured": True, "selected": True},
+        "storage": {"host": "127.0.0.1", "port": 9199, "configured": True, "selected": False}})
+    assert pytest_plugin.expected_emulators({topology.TOPOLOGY_ENV: manifest}) == ["firestore"]
+    assert pytest_plugin.expected_emulators({}) is None
+
+
+def test_wait_until_retries_until_the_check_passes():
+    calls = []
+
+    def check():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("not yet")
+        return "ready"
+
+    assert pytest_plugin.wait_until(check, timeout=5) == "ready"
+    assert len(calls) == 3
+
+
+def test_wait_until_reraises_the_last_error():
+    def check():
+        raise ConnectionError("still down")
+
+    with pytest.raises(ConnectionError, match="still down"):
+        pytest_plugin.wait_until(check, timeout=0.3)
+    with pytest.raises(TimeoutError):
+        pytest_plugin.wait_until(lambda: None, timeout=0.2)
+
+
+def test_wait_until_returns_falsy_results_without_retrying():
+    calls = []
+
+    def check():
+        calls.append(1)
+        return False
+
+    assert pytest_plugin.wait_until(check, timeout=5) is False
+    assert len(calls) == 1
+
+
+def test_pooled_session_resolves_relative_urls(fake_server):
+    pytest.importorskip("requests")
+    server = fake_server({"/demo/us-central1/hello": (200, "Hello")})
+    session = pytest_plugin.pooled_session(f"http://127.0.0.1:{server.port}")
+    assert session.get("/demo/us-central1/hello").text == "Hello"
+    assert session.get("demo/us-central1/hello").status_code == 200
+    session.close()
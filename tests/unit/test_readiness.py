@@ -0,0 +1,53 @@
+from emulator_tools import readiness
+from emulator_tools.probes import Endpoint, probe
+
+
+def test_ready_when_hub_and_emulators_answer(fake_hub):
+    result = readiness.wait_for_ready(hub_port=fake_hub.port, timeout=5, expected=["firestore"])
+    assert result.ready
+    assert result.attempts == 1
+    assert {r.name for r in result.probes} == {"hub", "firestore"}
+    assert all(r.ok and r.response_ms is not None for r in result.probes)
+
+
+def test_waits_for_expected_emulator_to_register(fake_hub):
+    hub_routes = fake_hub.routes["/emulators"][1]
+    partial = {"hub": hub_routes["hub"]}
+    calls = []
+
+    def emulators(handler, body):
+        calls.append(1)
+        return (200, hub_routes if len(calls) >= 3 else partial)
+
+    fake_hub.routes["/emulators"] = emulators
+    result = readiness.wait_for_ready(hub_port=fake_hub.port, timeout=5, expected=["firestore"],
+                                      backoff=readiness.Backoff(initial=0.01, maximum=0.02))
+    assert result.ready
+    assert result.attempts > 1
+
+
+def test_firestore_probe_requires_ok_body(fake_server):
+    server = fake_server({"/": (200, "Starting")})
+    result = probe(Endpoint("firestore", "127.0.0.1", server.port))
+    assert not result.ok
+    assert "unexpected body" in result.detail
+
+
+def test_timeout_reports_reason(fake_server):
+    closed = fake_server()
+    port = closed.port
+    closed.close()
+    result = readiness.wait_for_ready(hub_port=port, timeout=0.2,
+                                      backoff=readiness.Backoff(initial=0.05, maximum=0.05))
+    assert not result.ready
+    assert result.reason == "hub not responding"
+    assert result.attempts > 1
+
+
+def test_backoff_is_capped():
+    backoff = readiness.Backoff(initial=0.1, maximum=0.3, factor=2)
+    assert [round(backoff.next(), 2) for _ in range(4)] == [0.1, 0.2, 0.3, 0.3]
+
+
+def test_parse_expected_strips_codebase_filters():
+    assert readiness.parse_expected("auth, functions:api,,firestore") == ["auth", "functions", "firestore"]
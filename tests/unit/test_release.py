@@ -0,0 +1,108 @@
+import json
+import urllib.error
+
+import pytest
+
+from emulator_tools import release
+
+METADATA = {
+    "tag_name": "v14.1.0",
+    "assets": [
+        {"name": "firebase-tools-linux", "browser_download_url": "https://example.invalid/linux"},
+        {"name": "firebase-tools-win.exe", "browser_download_url": "https://example.invalid/win.exe",
+         "digest": "sha256:" + "ab" * 32},
+    ],
+}
+
+
+def test_normalize():
+    assert release.normalize("") == "latest"
+    assert release.normalize("v14.1.0") == release.normalize("14.1.0") == "14.1.0"
+    with pytest.raises(release.ResolveError):
+        release.normalize("fourteen")
+
+
+def test_latest_is_cached_in_index_until_it_expires():
+    calls = []
+
+    def fetch(tag, token):
+        calls.append(tag)
+        return METADATA
+
+    index = {"releases": {}}
+    first = release.resolve("latest", index, fetch=fetch, now=1000.0)
+    assert (first.version, first.sha256, first.source) == ("14.1.0", "ab" * 32, "github")
+
+    again = release.resolve("latest", index, fetch=fetch, now=1000.0 + 60)
+    assert again.source == "index" and calls == ["latest"]
+
+    release.resolve("latest", index, fetch=fetch, now=1000.0 + release.DEFAULT_MAX_AGE + 1)
+    assert calls == ["latest", "latest"]
+
+
+def test_pinned_version_uses_its_tag_and_is_never_refetched():
+    calls = []
+
+    def fetch(tag, token):
+        calls.append(tag)
+        return METADATA
+
+    index = {"releases": {}}
+    assert release.resolve("v14.1.0", index, fetch=fetch).url == "https://example.invalid/win.exe"
+    assert release.resolve("14.1.0", index, fetch=fetch).source == "index"
+    assert calls == ["v14.1.0"]
+
+
+def test_offline_falls_back_to_last_known_latest():
+    def offline(tag, token):
+        raise urllib.error.URLError("rate limited")
+
+    index = {"releases": {"14.0.0": {"url": "u", "sha256": "cd" * 32}},
+             "latest": {"version": "14.0.0", "resolved_at": 0}}
+    result = release.resolve("latest", index, fetch=offline, now=10 ** 9)
+    assert (result.version, result.sha256) == ("14.0.0", "cd" * 32)
+
+    pinned = release.resolve("13.0.0", index, fetch=offline)
+    assert pinned.sha256 is None
+    assert pinned.url.endswith("/v13.0.0/firebase-tools-win.exe")
+
+
+def test_offline_resolve_prints_only_json_on_stdout(tmp_path, monkeypatch, capsys):
+    def unreachable(request, timeout=None):
+        raise urllib.error.URLError("network unreachable")
+
+    monkeypatch.setattr(release.urllib.request, "urlopen", unreachable)
+    index = tmp_path / "index.json"
+    index.write_text(json.dumps({"releases": {"14.0.0": {"url": "u", "sha256": "cd" * 32}},
+                                 "latest": {"version": "14.0.0", "resolved_at": 0}}))
+
+    for version in ("latest", "13.0.0"):
+        assert release.main(["--index", str(index), "resolve", version]) == 0
+        out, err = capsys.readouterr()
+        assert json.loads(out)["version"] == ("14.0.0" if version == "latest" else version)
+        assert "[WARN]" in err
+
+
+def test_missing_pinned_release_is_an_error_not_offline():
+    def not_found(tag, token):
+        raise urllib.error.HTTPError("https://api.github.com", 404, "Not Found", {}, None)
+
+    index = {"releases": {}}
+    with pytest.raises(release.ResolveError, match="99.0.0 not found"):
+        release.resolve("99.0.0", index, fetch=not_found)
+    assert index["releases"] == {}
+
+
+def test_verify_removes_mismatching_binary_and_record_pins_checksum(tmp_path):
+    index_path = tmp_path / "index.json"
+    binary = tmp_path / "firebase.exe"
+    binary.write_bytes(b"cli")
+
+    assert release.main(["--index", str(index_path), "record", "14.1.0", str(binary)]) == 0
+    entry = json.loads(index_path.read_text())["releases"]["14.1.0"]
+    assert entry["sha256"] == release.sha256(str(binary))
+    assert release.verify(release.load_index(str(index_path)), "v14.1.0", str(binary)) is True
+
+    binary.write_bytes(b"stale cli")
+    assert release.main(["--index", str(index_path), "verify", "14.1.0", str(binary)]) == 0
+    assert not binary.exists()
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from emulator_tools import ledger, reset, topology
+
+
+@pytest.fixture
+def emulators(fake_server, monkeypatch):
+    """One fake server per resettable emulator, wired up through the env vars."""
+    monkeypatch.delenv(topology.TOPOLOGY_ENV, raising=False)
+    servers = {
+        "firestore": fake_server({("DELETE", "/emulator/v1/projects/demo-test/databases/(default)/documents"):
+                                  (200, {})}),
+        "auth": fake_server({("DELETE", "/emulator/v1/projects/demo-test/accounts"): (200, {})}),
+        "storage": fake_server({("POST", "/internal/reset"): (200, "OK")}),
+        "database": fake_server({("DELETE", "/.json"): (200, "null")}),
+    }
+    for variable in topology.ENV_VARS:
+        monkeypatch.delenv(variable, raising=False)
+    monkeypatch.setenv("FIRESTORE_EMULATOR_HOST", f"127.0.0.1:{servers['firestore'].port}")
+    monkeypatch.setenv("FIREBASE_AUTH_EMULATOR_HOST", f"127.0.0.1:{servers['auth'].port}")
+    monkeypatch.setenv("FIREBASE_STORAGE_EMULATOR_HOST", f"127.0.0.1:{servers['storage'].port}")
+    monkeypatch.setenv("FIREBASE_DATABASE_EMULATOR_HOST", f"127.0.0.1:{servers['database'].port}")
+    return servers
+
+
+def test_reset_clears_every_emulator(emulators):
+    results = reset.reset("demo-test")
+    assert [(r.name, r.ok) for r in results] == [
+        ("firestore", True), ("auth", True), ("storage", True), ("database", True)]
+    assert emulators["database"].requests[0][:2] == ("DELETE", "/.json?ns=demo-test-default-rtdb")
+
+
+def test_reset_follows_the_topology(emulators, tmp_path, monkeypatch):
+    manifest = tmp_path / "topology.json"
+    manifest.write_text(json.dumps({"working_directory": ".", "config_path": "firebase.json",
+                                    "config_found": True, "emulators": {
+                                        "firestore": {"host": "0.0.0.0", "port": 1, "configured": True,
+                                                      "selected": True},
+                                        "auth": {"host": "127.0.0.1", "port": 2, "configured": True,
+                                                 "selected": False}}}))
+    monkeypatch.setenv(topology.TOPOLOGY_ENV, str(manifest))
+    results = reset.reset("demo-test")
+    # Only the started emulator, at the address from the env var
+    assert [(r.name, r.ok) for r in results] == [("firestore", True)]
+    assert emulators["auth"].requests == []
+
+
+def test_main_fails_when_an_emulator_cannot_be_cleared(emulators, tmp_path, monkeypatch, capsys):
+    emulators["auth"].routes.clear()
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    assert reset.main(["--project", "demo-test", "--only", "firestore,auth"]) == 1
+    out = capsys.readouterr().out
+    assert "[OK] firestore: cleared" in out
+    assert "[ERROR] auth: HTTP 404" in out
+    assert json.loads(ledger_path.read_text())["cleared"] == ["firestore"]
+
+
+def test_unknown_emulator_is_rejected():
+    with pytest.raises(ValueError, match="pubsub"):
+        reset.reset("demo-test", ["pubsub"])
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from emulator_tools import ledger, seed
+
+COMMIT = "/v1/projects/demo-test/databases/(default)/documents:commit"
+
+
+def firestore(fake_server, delay=0.0, status=200):
+    """A fake emulator recording the documents of every commit and the peak concurrency."""
+    state = {"docs": {}, "commits": 0, "active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def commit(handler, body):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(delay)
+        with lock:
+            state["active"] -= 1
+            state["commits"] += 1
+            for write in json.loads(body)["writes"]:
+                state["docs"][write["update"]["name"].split("/documents/", 1)[1]] = write["update"]["fields"]
+        return status, {"writeResults": []} if status == 200 else {"error": {"message": "denied"}}
+
+    server = fake_server({("POST", COMMIT): commit})
+    server.state = state
+    return server
+
+
+def test_encode_maps_json_and_special_values():
+    assert seed.encode({"n": 1, "f": 1.5, "ok": True, "none": None, "tags": ["a"]}) == {"mapValue": {"fields": {
+        "n": {"integerValue": "1"}, "f": {"doubleValue": 1.5}, "ok": {"booleanValue": True},
+        "none": {"nullValue": None}, "tags": {"arrayValue": {"values": [{"stringValue": "a"}]}}}}}
+    assert seed.encode({"__timestamp__": "2024-05-01T10:00:00Z"}) == {"timestampValue": "2024-05-01T10:00:00Z"}
+    assert seed.encode({"__geo__": [52.5, 13.4]}) == {"geoPointValue": {"latitude": 52.5, "longitude": 13.4}}
+    with pytest.raises(seed.SeedError):
+        seed.encode(object())
+
+
+def test_encode_normalises_yaml_dates_to_utc():
+    assert seed.encode(datetime(2024, 5, 1, 10)) == {"timestampValue": "2024-05-01T10:00:00Z"}
+    assert seed.encode(date(2024, 5, 1)) == {"timestampValue": "2024-05-01T00:00:00Z"}
+    cest = timezone(timedelta(hours=2))
+    assert seed.encode(datetime(2024, 5, 1, 12, 0, 0, 500, tzinfo=cest)) == {
+        "timestampValue": "2024-05-01T10:00:00.000500Z"}
+
+
+def test_seed_commits_references_as_full_resource_names(tmp_path, fake_server):
+    server = firestore(fake_server)
+    fixture = tmp_path / "tickets.json"
+    full = "projects/other/databases/(default)/documents/accounts/acc-9"
+    fixture.write_text(json.dumps([{"path": "tickets/t-1", "data": {
+        "account": {"__ref__": "accounts/acc-1"},
+        "links": [{"__ref__": "/accounts/acc-2"}, {"__ref__": full}]}}]))
+    seed.seed(str(fixture), host=f"127.0.0.1:{server.port}", project="demo-test")
+    database = "projects/demo-test/databases/(default)/documents"
+    assert server.state["docs"]["tickets/t-1"] == {
+        "account": {"referenceValue": f"{database}/accounts/acc-1"},
+        "links": {"arrayValue": {"values": [{"referenceValue": f"{database}/accounts/acc-2"},
+                                            {"referenceValue": full}]}}}
+
+
+def test_read_fixture_supports_collection_maps_and_lists(tmp_path):
+    tree = tmp_path / "accounts.json"
+    tree.write_text(json.dumps({"accounts": {"a1": {"tickets": 1}}, "accounts/a1/tickets": {"t1": {}}}))
+    assert list(seed.read_fixture(str(tree))) == [("accounts/a1", {"tickets": 1}), ("accounts/a1/tickets/t1", {})]
+
+    bad = tmp_path / "bad.ndjson"
+    bad.write_text('{"path": "accounts/a1", "data": {}}\n{"path": "accounts"}\n')
+    with pytest.raises(seed.SeedError, match="bad.ndjson:2"):
+        list(seed.read_fixture(str(bad)))
+
+
+def test_seed_commits_batches_concurrently(tmp_path, fake_server):
+    server = firestore(fake_server, delay=0.05)
+    fixture = tmp_path / "accounts.ndjson"
+    with open(fixture, "w") as f:
+        for i in range(1050):
+            f.write(json.dumps({"path": f"accounts/acc-{i}", "data": {"tickets": i}}) + "\n")
+
+    result = seed.seed(str(fixture), host=f"127.0.0.1:{server.port}", project="demo-test",
+                       batch_size=100, concurrency=4)
+    assert (result.documents, result.batches) == (1050, 11)
+    assert result.rate > 0
+    assert server.state["commits"] == 11
+    assert server.state["docs"]["accounts/acc-1049"] == {"tickets": {"integerValue": "1049"}}
+    assert 1 < server.state["peak"] <= 4
+
+
+def test_rejected_commit_fails_the_seed(tmp_path, fake_server, monkeypatch, capsys):
+    server = firestore(fake_server, status=403)
+    fixture = tmp_path / "accounts.json"
+    fixture.write_text(json.dumps([{"path": "accounts/a1", "data": {}}]))
+    monkeypatch.setenv("FIRESTORE_EMULATOR_HOST", f"127.0.0.1:{server.port}")
+    monkeypatch.setenv("GCLOUD_PROJECT", "demo-test")
+    assert seed.main([str(fixture)]) == 1
+    assert "HTTP 403" in capsys.readouterr().out
+
+
+def test_main_reports_documents_per_second(tmp_path, fake_server, monkeypatch, capsys):
+    server = firestore(fake_server)
+    fixture = tmp_path / "accounts.json"
+    fixture.write_text(json.dumps({"accounts": {"a1": {}, "a2": {}}}))
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    assert seed.main([str(fixture), "--host", f"127.0.0.1:{server.port}", "--project", "demo-test"]) == 0
+    assert "docs/s" in capsys.readouterr().out
+    entry = json.loads(ledger_path.read_text())
+    assert (entry["step"], entry["documents"]) == ("Seed Firestore", 2)
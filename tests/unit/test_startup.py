@@ -0,0 +1,55 @@
+from emulator_tools import ledger, startup
+
+DEBUG_LOG = """\
+[debug] [2025-11-24T10:12:44.900Z] ----------------------------------------------------------------------
+[info] i  emulators: Starting emulators: auth, firestore, functions {"metadata":{"emulator":{"name":"hub"}}}
+[debug] [2025-11-24T10:12:45.300Z] Resolving emulator versions {"metadata":{}}
+[info] i  firestore: downloading cloud-firestore-emulator-v1.19.8.jar... {"metadata":{"emulator":{"name":"firestore"}}}
+[debug] [2025-11-24T10:12:48.500Z] Starting Firestore Emulator with command {"binary":"java"} {"metadata":{}}
+[info] i  firestore: Firestore Emulator logging to firestore-debug.log {"metadata":{"emulator":{"name":"firestore"}}}
+[debug] [2025-11-24T10:12:50.600Z] API endpoint: http://127.0.0.1:8080 {"metadata":{"emulator":{"name":"firestore"}}}
+[debug] [2025-11-24T10:12:50.700Z] Watching source {"metadata":{}}
+[info] i  functions: Watching "C:\\w\\functions" for Cloud Functions... {"metadata":{"emulator":{"name":"functions"}}}
+[debug] [2025-11-24T10:12:58.100Z] Discovery done {"metadata":{}}
+[info] +  functions: Loaded functions definitions from source: hello. {"metadata":{"emulator":{"name":"functions"}}}
+[debug] [2025-11-24T10:12:58.300Z] Setting up function {"metadata":{}}
+[info] +  functions[us-central1-hello]: http function initialized (http://127.0.0.1:5001/d/us-central1/hello).
+[debug] [2025-11-24T10:12:58.400Z] Ready {"metadata":{}}
+[info] \u2502 \u2714  All emulators ready! It is now safe to connect your app. \u2502
+"""
+
+
+def test_debug_log_phases_and_durations():
+    timeline = startup.build(DEBUG_LOG.splitlines())
+    phases = [(p.emulator, p.name, p.duration) for p in timeline.phases()]
+    assert phases == [
+        ("firestore", "download", 3.2),
+        ("firestore", "launch", 2.1),
+        ("firestore", "listening", None),
+        ("functions", "discovery", 7.4),
+        ("functions", "loaded", 0.2),
+        ("functions", "initialized", None),
+    ]
+    assert (timeline.ready_at - timeline.origin).total_seconds() == 13.5
+    assert timeline.critical_path() == ("functions", 13.4)
+
+
+def test_stdout_log_gives_order_without_durations():
+    stdout = [
+        "\x1b[36m\x1b[1mi  firestore:\x1b[22m\x1b[39m downloading cloud-firestore-emulator-v1.19.8.jar...",
+        "\x1b[32m\x1b[1m+  firestore:\x1b[22m\x1b[39m Firestore Emulator UI websocket is running on 9150.",
+        "\x1b[36m\x1b[1mi  emulators:\x1b[22m\x1b[39m Shutting down emulators.",
+    ]
+    timeline = startup.build(stdout)
+    assert [(p.name, p.start, p.duration) for p in timeline.phases()] == [
+        ("download", None, None), ("listening", None, None)]
+    assert timeline.critical_path() is None
+
+
+def test_phases_are_written_to_ledger(tmp_path):
+    ledger_path = tmp_path / "timing.jsonl"
+    startup.write_ledger(startup.build(DEBUG_LOG.splitlines()), str(ledger_path))
+    entries = ledger.read(str(ledger_path))
+    assert [e["phase"] for e in entries] == [
+        "firestore download", "firestore launch", "functions discovery", "functions loaded"]
+    assert entries[0]["step"] == "Emulator Startup"
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from emulator_tools import tokens
+
+SIGN_IN = "/identitytoolkit.googleapis.com/v1/accounts:signInWithCustomToken"
+
+
+def test_minted_token_looks_like_an_emulator_token():
+    token = tokens.mint("user-1", "demo-test", claims={"admin": True}, email="a@example.com", now=1000)
+    header, _, signature = token.split(".")
+    assert json.loads(tokens.base64.urlsafe_b64decode(header + "==")) == {"alg": "none", "typ": "JWT"}
+    assert signature == ""
+    payload = tokens.decode(token)
+    assert (payload["sub"], payload["user_id"], payload["aud"]) == ("user-1", "user-1", "demo-test")
+    assert payload["iss"] == "https://securetoken.google.com/demo-test"
+    assert (payload["iat"], payload["exp"], payload["admin"]) == (1000, 4600, True)
+    assert payload["firebase"]["identities"] == {"email": ["a@example.com"]}
+
+
+def test_cache_reuses_tokens_until_close_to_expiry():
+    now = [1000.0]
+    cache = tokens.TokenCache("demo-test", clock=lambda: now[0])
+    first = cache.get("user-1")
+    assert cache.get("user-1") is first
+    assert cache.get("user-1", {"admin": True}) != first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    now[0] += tokens.LIFETIME - tokens.MARGIN - 1
+    assert cache.get("user-1") is first
+    now[0] += 2
+    assert cache.get("user-1") != first
+
+
+def test_exchange_mode_signs_in_once_per_uid(fake_server):
+    def sign_in(handler, body):
+        custom = tokens.decode(json.loads(body)["token"])
+        return 200, {"idToken": tokens.mint(custom["uid"], "demo-test", custom.get("claims"))}
+
+    server = fake_server({("POST", SIGN_IN): sign_in})
+    cache = tokens.TokenCache("demo-test", mode="exchange", auth_host=f"127.0.0.1:{server.port}")
+    token = cache.get("user-1", {"role": "admin"})
+    assert tokens.decode(token)["role"] == "admin"
+    assert cache.headers("user-1", {"role": "admin"}) == {"Authorization": f"Bearer {token}"}
+    assert len(server.requests) == 1
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        tokens.TokenCache(mode="sign")
@@ -0,0 +1,69 @@
+import json
+import os
+
+from emulator_tools import topology
+
+
+def write_config(directory, config, name="firebase.json"):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(json.dumps(config), encoding="utf-8")
+
+
+def test_config_path_rules(tmp_path):
+    work = os.path.join(str(tmp_path), "tests", "app")
+    assert topology.resolve_config_path("firebase.json", "tests/app", str(tmp_path)) == \
+        os.path.join(work, "firebase.json")
+    assert topology.resolve_config_path("./configs/firebase.json", "tests/app", str(tmp_path)) == \
+        os.path.join(str(tmp_path), "configs", "firebase.json")
+    absolute = os.path.join(str(tmp_path), "elsewhere.json")
+    assert topology.resolve_config_path(absolute, "tests/app", str(tmp_path)) == absolute
+
+
+def test_ports_hosts_and_env(tmp_path):
+    write_config(tmp_path / "app", {
+        "emulators": {
+            "auth": {"port": 19099},
+            "firestore": {"port": 18080, "host": "0.0.0.0"},
+            "hub": {"port": 4401},
+            "ui": {"enabled": False},
+        },
+    })
+    result = topology.resolve("app", "firebase.json", cwd=str(tmp_path))
+
+    assert result.config_found
+    assert result.port("auth") == 19099
+    assert result.port("database") == 9000
+    assert result.emulators["firestore"].host == "127.0.0.1"
+    assert result.env["FIRESTORE_EMULATOR_HOST"] == "127.0.0.1:18080"
+    assert result.env["FIREBASE_EMULATOR_HUB"] == "127.0.0.1:4401"
+    selected = {name for name, e in result.emulators.items() if e.selected}
+    assert selected == {"auth", "firestore", "hub", "logging"}
+
+
+def test_only_overrides_configured_emulators(tmp_path):
+    write_config(tmp_path, {"emulators": {"auth": {}, "firestore": {}}})
+    result = topology.resolve(".", "firebase.json", only="firestore, functions:api", cwd=str(tmp_path))
+    assert result.only == ["firestore", "functions"]
+    assert result.emulators["functions"].selected
+    assert not result.emulators["auth"].selected
+
+
+def test_functions_codebases(tmp_path):
+    write_config(tmp_path, {"functions": [
+        {"source": "functions", "codebase": "default"},
+        {"source": "api"},
+    ]})
+    (tmp_path / "functions").mkdir()
+    (tmp_path / "functions" / "requirements.txt").write_text("firebase-functions\n")
+    result = topology.resolve(".", "firebase.json", cwd=str(tmp_path))
+    assert [(c.codebase, c.source, c.runtime) for c in result.functions] == [
+        ("default", "functions", "python"), ("default", "api", None)]
+
+
+def test_missing_config_uses_defaults_and_round_trips(tmp_path):
+    output = tmp_path / "topology.json"
+    assert topology.main(["--working-directory", str(tmp_path), "--output", str(output)]) == 0
+    loaded = topology.load(str(output))
+    assert not loaded.config_found
+    assert loaded.port("hub") == 4400
+    assert loaded.functions == []
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from emulator_tools import ledger, users
+
+BATCH_CREATE = "/identitytoolkit.googleapis.com/v1/projects/demo-test/accounts:batchCreate"
+
+
+def auth_emulator(fake_server, reject=None):
+    """Fake Auth emulator keeping every imported user; ``reject`` names uids to refuse."""
+    imported = {}
+
+    def batch_create(handler, body):
+        request = json.loads(body)
+        assert request["allowOverwrite"] is True
+        errors = []
+        for index, user in enumerate(request["users"]):
+            if reject and user["localId"] in reject:
+                errors.append({"index": index, "message": "INVALID_EMAIL"})
+            else:
+                imported[user["localId"]] = user
+        return 200, {"error": errors} if errors else {}
+
+    server = fake_server({("POST", BATCH_CREATE): batch_create})
+    server.imported = imported
+    return server
+
+
+def test_generated_users_are_imported_in_batches(fake_server):
+    server = auth_emulator(fake_server)
+    result = users.provision(users.generate(2500, claims={"role": "load"}), host=f"127.0.0.1:{server.port}",
+                             project="demo-test", batch_size=1000)
+    assert (len(result.users), result.batches) == (2500, 3)
+    assert len([r for r in server.requests if r[0] == "POST"]) == 3
+    assert server.imported["user-7"] == {
+        "localId": "user-7", "email": "user7@example.com", "rawPassword": "password7",
+        "customAttributes": '{"role": "load"}', "emailVerified": False}
+    assert result.rate > 0
+
+
+def test_rejected_users_fail_the_batch(fake_server):
+    server = auth_emulator(fake_server, reject={"user-2"})
+    with pytest.raises(users.ProvisionError, match="1 of 3 users rejected, e.g. user-2: INVALID_EMAIL"):
+        users.provision(users.generate(3), host=f"127.0.0.1:{server.port}", project="demo-test")
+
+
+def test_fixture_users_and_output(tmp_path, fake_server, monkeypatch, capsys):
+    server = auth_emulator(fake_server)
+    fixture = tmp_path / "users.ndjson"
+    fixture.write_text('{"email": "admin@example.com", "password": "s3cret", "claims": {"admin": true}}\n'
+                       '{"uid": "u2", "email": "u2@example.com", "password": "pw2", "displayName": "U2"}\n')
+    output = tmp_path / "created.json"
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+    monkeypatch.setenv("FIREBASE_AUTH_EMULATOR_HOST", f"127.0.0.1:{server.port}")
+
+    assert users.main(["--fixture", str(fixture), "--output", str(output), "--project", "demo-test"]) == 0
+    assert "users/s" in capsys.readouterr().out
+    created = sorted(json.loads(output.read_text()), key=lambda u: u["uid"])
+    assert created == [
+        {"uid": "admin", "email": "admin@example.com", "password": "s3cret", "claims": {"admin": True}},
+        {"uid": "u2", "email": "u2@example.com", "password": "pw2", "claims": {}}]
+    assert server.imported["u2"]["displayName"] == "U2"
+    assert json.loads(ledger_path.read_text())["users"] == 2
+
+
+def test_invalid_fixture_entry(tmp_path):
+    fixture = tmp_path / "users.json"
+    fixture.write_text(json.dumps([{"password": "x"}]))
+    with pytest.raises(users.ProvisionError, match=r"users.json\[0\]"):
+        list(users.read_users(str(fixture)))
@@ -0,0 +1,48 @@
+import json
+
+from emulator_tools import ledger, warmup
+
+LOG = """\
+i  functions: Loaded functions definitions from source: hello_world, echo, on_write.
+\x1b[32m✔\x1b[39m  functions[us-central1-hello_world]: http function initialized (http://127.0.0.1:{port}/demo/us-central1/hello_world).
+✔  functions[us-central1-echo]: http function initialized (http://127.0.0.1:{port}/demo/us-central1/echo).
+✔  functions[us-central1-on_write]: firestore function initialized.
+✔  functions[us-central1-echo]: http function initialized (http://127.0.0.1:{port}/demo/us-central1/echo).
+"""
+
+
+def test_discover_finds_http_functions_once():
+    functions = warmup.discover(LOG.format(port=5001).splitlines())
+    assert [(f.id, f.url) for f in functions] == [
+        ("us-central1-hello_world", "http://127.0.0.1:5001/demo/us-central1/hello_world"),
+        ("us-central1-echo", "http://127.0.0.1:5001/demo/us-central1/echo")]
+
+
+def test_warmup_invokes_every_function_and_records_cold_starts(tmp_path, fake_server, monkeypatch, capsys):
+    server = fake_server({
+        ("POST", "/demo/us-central1/hello_world"): (200, "Hello from Python"),
+        # A callable that wants arguments still counts as warm
+        ("POST", "/demo/us-central1/echo"): (400, {"error": {"status": "INVALID_ARGUMENT"}}),
+    })
+    log = tmp_path / "emulator-stdout.log"
+    log.write_text(LOG.format(port=server.port), encoding="utf-8")
+    output = tmp_path / "warmup.json"
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv(ledger.LEDGER_ENV, str(ledger_path))
+
+    assert warmup.main(["--log", str(log), "--output", str(output)]) == 0
+    results = {r["id"]: r for r in json.loads(output.read_text())}
+    assert results["us-central1-hello_world"]["ok"] and results["us-central1-hello_world"]["status"] == 200
+    assert results["us-central1-echo"]["ok"] and results["us-central1-echo"]["cold_start_ms"] >= 0
+    assert sorted(r[1] for r in server.requests) == ["/demo/us-central1/echo", "/demo/us-central1/hello_world"]
+    assert json.loads(server.requests[0][2]) == {"data": {}}
+    assert len(ledger_path.read_text().splitlines()) == 2
+    assert "cold start" in capsys.readouterr().out
+
+
+def test_unreachable_function_is_reported_not_fatal(tmp_path):
+    log = tmp_path / "emulator-stdout.log"
+    log.write_text(LOG.format(port=1), encoding="utf-8")
+    results = warmup.warm_up(warmup.discover(log.read_text(encoding="utf-8").splitlines()), timeout=1)
+    assert [r.ok for r in results] == [False, False]
+    assert warmup.main(["--log", str(log), "--timeout", "1"]) == 0
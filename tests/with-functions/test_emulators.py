@@ -2,16 +2,27 @@
 Test Firebase Emulators with Functions support.
 Tests: Authentication, Firestore, and Functions
 """
+import json
 import os
 import firebase_admin
 from firebase_admin import credentials, auth, firestore
 import requests
 
 
+def emulator_url(name, default_port):
+    """Base URL of an emulator, from the action's topology manifest when available."""
+    path = os.environ.get("FIREBASE_EMULATOR_TOPOLOGY")
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8-sig") as f:
+            info = json.load(f)["emulators"][name]
+        return f"http://{info['host']}:{info['port']}"
+    return f"http://127.0.0.1:{default_port}"
+
+
 def initialize_firebase():
     """Initialize Firebase Admin SDK for emulator."""
-    os.environ['FIREBASE_AUTH_EMULATOR_HOST'] = '127.0.0.1:9099'
-    os.environ['FIRESTORE_EMULATOR_HOST'] = '127.0.0.1:8080'
+    os.environ.setdefault('FIREBASE_AUTH_EMULATOR_HOST', '127.0.0.1:9099')
+    os.environ.setdefault('FIRESTORE_EMULATOR_HOST', '127.0.0.1:8080')
     os.environ['GCLOUD_PROJECT'] = 'demo-project'
 
     cred = credentials.Certificate({
@@ -73,7 +84,7 @@ def test_functions():
     """Test Functions emulator."""
     print("\n=== Testing Functions ===")
     try:
-        function_url = "http://127.0.0.1:5001/demo-project/us-central1/helloWorld"
+        function_url = f"{emulator_url('functions', 5001)}/demo-project/us-central1/helloWorld"
 
         response = requests.get(function_url, timeout=10)
         print(f"[OK] Function response status: {response.status_code}")
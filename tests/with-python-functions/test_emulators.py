@@ -1,238 +1,136 @@
+"""
+Python functions suite. Uses the action's pytest plugin (pip install "<action>[pytest]"):
+endpoints come from the action's topology, the Admin app and HTTP sessions are shared
+for the whole session, and waiting is readiness-aware instead of fixed sleeps.
+"""
 import pytest
 import requests
-import time
+from firebase_admin import auth, firestore
 
+from emulator_tools.pytest_plugin import wait_until
+
+PROJECT = "demo-python-functions"
 
-def test_python_functions_emulator():
-    """Test Python Firebase Functions in emulator."""
-    # Give emulator extra time to initialize Python runtime
-    max_retries = 10
-    retry_delay = 3
 
-    for attempt in range(max_retries):
+def test_python_functions_emulator(emulator_http):
+    """Test Python Firebase Functions in emulator."""
+    functions = emulator_http("functions")
+
+    def hello_world():
+        response = functions.get(f"/{PROJECT}/us-central1/hello_world", timeout=5)
+        # The Python runtime loads after the emulator reports ready; 404 until it has
+        return response if response.status_code != 404 else None
+
+    # Test hello_world function
+    response = wait_until(hello_world, timeout=30, exceptions=(requests.exceptions.ConnectionError,))
+    assert response.status_code == 200
+    assert "Hello from Python" in response.text
+    print("[OK] hello_world function is responding")
+
+    # Test echo function
+    test_data = "Test message"
+    response = functions.post(f"/{PROJECT}/us-central1/echo", data=test_data, timeout=5)
+    assert response.status_code == 200
+    assert test_data in response.text
+    print("[OK] echo function is responding")
+
+    # Test Firestore access from function
+    response = functions.get(f"/{PROJECT}/us-central1/check_firestore", timeout=5)
+    if response.status_code != 200:
+        print(f"\n[ERROR] check_firestore failed with {response.status_code}")
+        print(f"Response body: {response.text}")
         try:
-            # Test hello_world function
-            response = requests.get(
-                "http://127.0.0.1:5001/demo-python-functions/us-central1/hello_world", timeout=5)
-            assert response.status_code == 200
-            assert "Hello from Python" in response.text
-            print("[OK] hello_world function is responding")
-
-            # Test echo function
-            test_data = "Test message"
-            response = requests.post("http://127.0.0.1:5001/demo-python-functions/us-central1/echo",
-                                     data=test_data, timeout=5)
-            assert response.status_code == 200
-            assert test_data in response.text
-            print("[OK] echo function is responding")
-
-            # Test Firestore access from function
-            response = requests.get(
-                "http://127.0.0.1:5001/demo-python-functions/us-central1/check_firestore",
-                timeout=5)
-            if response.status_code != 200:
-                print(f"\n[ERROR] check_firestore failed with {response.status_code}")
-                print(f"Response body: {response.text}")
-                try:
-                    error_data = response.json()
-                    print(f"Error type: {error_data.get('type')}")
-                    print(f"Error message: {error_data.get('message')}")
-                    print(f"Environment variables received by Python:")
-                    for k, v in error_data.get('env', {}).items():
-                        print(f"  {k}={v}")
-                    print(f"\nFull traceback:\n{error_data.get('traceback')}")
-                except:
-                    pass
-            assert response.status_code == 200, f"check_firestore failed: {response.text}"
-            print("[OK] check_firestore function is responding")
-
-            break
-        except (requests.exceptions.ConnectionError, AssertionError) as e:
-            if attempt < max_retries - 1:
-                print(f"Attempt {attempt + 1} failed, retrying in {retry_delay}s...")
-                time.sleep(retry_delay)
-            else:
-                pytest.fail(f"Python Functions not accessible after {max_retries} attempts: {e}")
-
-
-def test_firestore_emulator():
+            error_data = response.json()
+            print(f"Error type: {error_data.get('type')}")
+            print(f"Error message: {error_data.get('message')}")
+            print(f"Environment variables received by Python:")
+            for k, v in error_data.get('env', {}).items():
+                print(f"  {k}={v}")
+            print(f"\nFull traceback:\n{error_data.get('traceback')}")
+        except ValueError:
+            pass
+    assert response.status_code == 200, f"check_firestore failed: {response.text}"
+    print("[OK] check_firestore function is responding")
+
+
+def test_firestore_emulator(emulator_http):
     """Test Firestore emulator accessibility."""
-    try:
-        response = requests.get("http://127.0.0.1:8080/", timeout=5)
-        assert response.status_code == 200
-        print("[OK] Firestore Emulator is responding")
-    except Exception as e:
-        pytest.fail(f"Firestore Emulator not accessible: {e}")
+    response = emulator_http("firestore").get("/", timeout=5)
+    assert response.status_code == 200
+    print("[OK] Firestore Emulator is responding")
 
 
-def test_auth_and_firestore_integration():
+def test_auth_and_firestore_integration(firebase_app, emulator_http, clean_emulators):
     """
     Test Auth + Firestore integration like StA2BLE-Cloud does.
     This mimics the getAccountInfo flow: create user, get token, call function that reads Firestore.
+    State is cleared by clean_emulators before the test, so no per-object cleanup is needed.
     """
-    import os
-    import tempfile
-    import json
-
-    # Set emulator environment variables FIRST, before importing firebase modules
-    os.environ['FIRESTORE_EMULATOR_HOST'] = '127.0.0.1:8080'
-    os.environ['FIREBASE_AUTH_EMULATOR_HOST'] = '127.0.0.1:9099'
-    os.environ['FIREBASE_USE_EMULATOR'] = 'true'
-    os.environ['GCLOUD_PROJECT'] = 'demo-python-functions'
-
-    # Import firebase_admin after env vars are set
-    import firebase_admin
-    from firebase_admin import credentials, auth, firestore
-    from google.auth import credentials as google_credentials
-
-    # Use mock credentials approach from StA2BLE-Cloud integration tests
-    # This is the recommended way to test with Firebase emulators
-    class MockGoogleCredential(google_credentials.Credentials):
-        """Mock Google authentication credential for emulator testing."""
-
-        def __init__(self):
-            super().__init__()
-            self._token = 'mock-token'
-            self.expiry = None
-
-        @property
-        def valid(self):
-            return True
-
-        @property
-        def token(self):
-            return self._token
-
-        @token.setter
-        def token(self, value):
-            self._token = value
-
-        def refresh(self, request):
-            import time
-            self.token = f'mock-token-{int(time.time())}'
-
-        @property
-        def service_account_email(self):
-            return 'mock-email@demo-python-functions.iam.gserviceaccount.com'
-
-    class MockFirebaseCredential(credentials.Base):
-        """Mock Firebase credential for emulator testing."""
-
-        def __init__(self):
-            self._g_credential = MockGoogleCredential()
-
-        def get_credential(self):
-            return self._g_credential
-
-    # Initialize Firebase Admin with mock credentials (emulator doesn't validate them)
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app(MockFirebaseCredential(),
-                                      options={'projectId': 'demo-python-functions'})
-
-    try:
-        # Step 1: Create test user in Auth emulator
-        print("\n[TEST] Creating test user in Auth emulator...")
-        test_email = "test@example.com"
-        test_password = "testpassword123"
-
-        try:
-            # Try to delete if exists
-            user = auth.get_user_by_email(test_email)
-            auth.delete_user(user.uid)
-            print(f"  Deleted existing user: {user.uid}")
-        except:
-            pass
-
-        # Create new user
-        user = auth.create_user(email=test_email, password=test_password, email_verified=True)
-        print(f"  Created user: {user.uid}")
-
-        # Step 2: Create account document in Firestore
-        print("\n[TEST] Creating account document in Firestore...")
-        db = firestore.client()
-        account_id = "test-account-001"
-        account_ref = db.collection('accounts').document(account_id)
-        account_ref.set({
-            'accountId': account_id,
-            'tickets': 100,
-            'offlineQuota': 50,
-            'userId': user.uid,
-            'created_at': firestore.SERVER_TIMESTAMP
-        })
-        print(f"  Created account: {account_id}")
-
-        # Step 3: Get custom token for authentication
-        print("\n[TEST] Getting custom token...")
-        custom_token = auth.create_custom_token(user.uid)
-        print(f"  Got custom token (length: {len(custom_token)})")
-
-        # Step 4: Exchange custom token for ID token
-        print("\n[TEST] Exchanging custom token for ID token...")
-        api_key = "fake-api-key"  # Emulator doesn't validate this
-        token_exchange_url = f"http://127.0.0.1:9099/identitytoolkit.googleapis.com/v1/accounts:signInWithCustomToken?key={api_key}"
-
-        token_response = requests.post(
-            token_exchange_url, json={
-                "token": custom_token.decode('utf-8'),
-                "returnSecureToken": True
-            }, timeout=5)
-
-        if token_response.status_code != 200:
-            print(f"  Token exchange failed: {token_response.status_code}")
-            print(f"  Response: {token_response.text}")
-            pytest.fail(f"Failed to exchange custom token: {token_response.text}")
-
-        id_token = token_response.json()['idToken']
-        print(f"  Got ID token (length: {len(id_token)})")
-
-        # Step 5: Call getAccountInfo function with auth token (EXACT name as StA2BLE-Cloud)
-        print("\n[TEST] Calling getAccountInfo function with auth...")
-        function_url = "http://127.0.0.1:5001/demo-python-functions/us-central1/getAccountInfo"
-
-        function_response = requests.post(function_url, json={"data": {
-            "accountId": account_id
-        }}, headers={"Authorization": f"Bearer {id_token}"}, timeout=10)
-
-        if function_response.status_code != 200:
-            print(f"  Function call failed: {function_response.status_code}")
-            print(f"  Response: {function_response.text}")
-            pytest.fail(f"Function call failed: {function_response.text}")
-
-        result = function_response.json()
-        print(f"  Function response: {result}")
-
-        # Verify the response
-        assert 'result' in result, "Response should contain 'result'"
-        result_data = result['result']
-
-        assert result_data[
-            'accountId'] == account_id, f"Expected accountId={account_id}, got {result_data.get('accountId')}"
-        assert result_data[
-            'tickets'] == 100, f"Expected tickets=100, got {result_data.get('tickets')}"
-        assert result_data[
-            'offlineQuota'] == 50, f"Expected offlineQuota=50, got {result_data.get('offlineQuota')}"
-        assert result_data[
-            'authUid'] == user.uid, f"Expected authUid={user.uid}, got {result_data.get('authUid')}"
-
-        print("[OK] Auth + Firestore integration test passed!")
-        print(f"  ✓ User authentication works")
-        print(f"  ✓ Python function receives auth context")
-        print(f"  ✓ Function can read from Firestore")
-        print(f"  ✓ Data matches expected values")
-
-    except Exception as e:
-        import traceback
-        print(f"\n[ERROR] Test failed: {str(e)}")
-        print(traceback.format_exc())
-        pytest.fail(f"Auth + Firestore integration test failed: {e}")
-    finally:
-        # Cleanup
-        try:
-            if 'user' in locals():
-                auth.delete_user(user.uid)
-                print(f"\n[CLEANUP] Deleted test user: {user.uid}")
-            if 'account_ref' in locals():
-                account_ref.delete()
-                print(f"[CLEANUP] Deleted test account: {account_id}")
-        except Exception as e:
-            print(f"[WARN] Cleanup failed: {e}")
+    # Step 1: Create test user in Auth emulator
+    print("\n[TEST] Creating test user in Auth emulator...")
+    user = auth.create_user(email="test@example.com", password="testpassword123", email_verified=True)
+    print(f"  Created user: {user.uid}")
+
+    # Step 2: Create account document in Firestore
+    print("\n[TEST] Creating account document in Firestore...")
+    db = firestore.client()
+    account_id = "test-account-001"
+    db.collection('accounts').document(account_id).set({
+        'accountId': account_id,
+        'tickets': 100,
+        'offlineQuota': 50,
+        'userId': user.uid,
+        'created_at': firestore.SERVER_TIMESTAMP
+    })
+    print(f"  Created account: {account_id}")
+
+    # Step 3: Get custom token for authentication
+    print("\n[TEST] Getting custom token...")
+    custom_token = auth.create_custom_token(user.uid)
+    print(f"  Got custom token (length: {len(custom_token)})")
+
+    # Step 4: Exchange custom token for ID token
+    print("\n[TEST] Exchanging custom token for ID token...")
+    api_key = "fake-api-key"  # Emulator doesn't validate this
+    token_response = emulator_http("auth").post(
+        f"/identitytoolkit.googleapis.com/v1/accounts:signInWithCustomToken?key={api_key}",
+        json={"token": custom_token.decode('utf-8'), "returnSecureToken": True}, timeout=5)
+    if token_response.status_code != 200:
+        print(f"  Token exchange failed: {token_response.status_code}")
+        print(f"  Response: {token_response.text}")
+        pytest.fail(f"Failed to exchange custom token: {token_response.text}")
+
+    id_token = token_response.json()['idToken']
+    print(f"  Got ID token (length: {len(id_token)})")
+
+    # Step 5: Call getAccountInfo function with auth token (EXACT name as StA2BLE-Cloud)
+    print("\n[TEST] Calling getAccountInfo function with auth...")
+    function_response = emulator_http("functions").post(
+        f"/{PROJECT}/us-central1/getAccountInfo", json={"data": {"accountId": account_id}},
+        headers={"Authorization": f"Bearer {id_token}"}, timeout=10)
+    if function_response.status_code != 200:
+        print(f"  Function call failed: {function_response.status_code}")
+        print(f"  Response: {function_response.text}")
+        pytest.fail(f"Function call failed: {function_response.text}")
+
+    result = function_response.json()
+    print(f"  Function response: {result}")
+
+    # Verify the response
+    assert 'result' in result, "Response should contain 'result'"
+    result_data = result['result']
+
+    assert result_data[
+        'accountId'] == account_id, f"Expected accountId={account_id}, got {result_data.get('accountId')}"
+    assert result_data[
+        'tickets'] == 100, f"Expected tickets=100, got {result_data.get('tickets')}"
+    assert result_data[
+        'offlineQuota'] == 50, f"Expected offlineQuota=50, got {result_data.get('offlineQuota')}"
+    assert result_data[
+        'authUid'] == user.uid, f"Expected authUid={user.uid}, got {result_data.get('authUid')}"
+
+    print("[OK] Auth + Firestore integration test passed!")
+    print(f"  ✓ User authentication works")
+    print(f"  ✓ Python function receives auth context")
+    print(f"  ✓ Function can read from Firestore")
+    print(f"  ✓ Data matches expected values")